@@ -20,13 +20,96 @@ def init_extensions(app):
     migrate.init_app(app, db)
     bcrypt.init_app(app)
     jwt.init_app(app)
-    socketio.init_app(app)
+    from app.utils.pubsub import create_client_manager
+    # Always pass a client manager, since init_app keeps options from earlier calls
+    socketio.init_app(app, client_manager=create_client_manager(
+        app.config.get('SOCKETIO_MESSAGE_QUEUE'),
+        app.config.get('SOCKETIO_CHANNEL', 'flask-socketio'),
+        heartbeat_interval=app.config.get('SOCKETIO_PRESENCE_HEARTBEAT'),
+        host_ttl=app.config.get('SOCKETIO_PRESENCE_TTL')
+    ))
+
+def init_caches(app):
+    """Reset process-wide caches with the configured limits."""
+    from app.utils.cache import task_snapshot_cache, task_tile_cache
+    task_snapshot_cache.configure(
+        max_entries=app.config.get('TASK_SNAPSHOT_CACHE_ENTRIES', 8),
+        max_bytes=app.config.get('TASK_SNAPSHOT_CACHE_BYTES', 32 * 1024 * 1024)
+    )
+    task_tile_cache.configure(
+        max_entries=app.config.get('TASK_TILE_CACHE_ENTRIES', 1024),
+        max_bytes=app.config.get('TASK_TILE_CACHE_BYTES', 16 * 1024 * 1024)
+    )
+
+def init_version_oracle(app):
+    """Create the task version oracle shared between processes, if a file is configured.
+
+    Without a shared file an oracle would miss commits made by other workers
+    and scripts, so versions are then read from the change journal.
+    """
+    path = app.config.get('VERSION_ORACLE_PATH')
+    if path:
+        from app.utils.version_oracle import VersionOracle
+        app.extensions['version_oracle'] = VersionOracle(path)
+
+def init_job_queue(app):
+    """Create the bounded background job queue used for report generation."""
+    from app.utils.job_queue import JobQueue
+    app.extensions['report_jobs'] = JobQueue(
+        app,
+        max_workers=app.config.get('REPORT_JOB_WORKERS', 2),
+        max_pending=app.config.get('REPORT_JOB_MAX_PENDING', 20),
+        history=app.config.get('REPORT_JOB_HISTORY', 100)
+    )
+
+def init_report_pool(app):
+    """Create the process pool formatting range reports, if more than one process is configured.
+
+    The pool uses the spawn start method: forking the eventlet server or a
+    job thread copies its locks and hubs into the workers.
+    """
+    processes = app.config.get('REPORT_RANGE_PROCESSES', 0)
+    if processes > 1:
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        app.extensions['report_pool'] = ProcessPoolExecutor(
+            max_workers=processes, mp_context=multiprocessing.get_context('spawn')
+        )
+
+def init_notifications(app):
+    """Create the notification history and, when a window is configured, the coalescing buffer."""
+    from app.utils.notification_history import NotificationHistory
+    from app.services.websocket_service import WebSocketService
+    seed = None
+    if app.config.get('NOTIFICATION_PERSIST', False):
+        from app.models import NotificationLog
+        seed = NotificationLog.last_seq
+    app.extensions['notification_history'] = NotificationHistory(
+        size=app.config.get('NOTIFICATION_HISTORY_SIZE', 100),
+        seed=seed
+    )
+
+    window = app.config.get('NOTIFICATION_COALESCE_WINDOW', 0)
+    if not window:
+        return
+    from app.utils.notification_buffer import NotificationCoalescer, flush_on_shutdown
+    coalescer = NotificationCoalescer(
+        app,
+        WebSocketService.deliver_notifications,
+        window=window,
+        max_pending=app.config.get('NOTIFICATION_COALESCE_MAX', 20),
+        merge_key=WebSocketService.notification_key
+    )
+    app.extensions['notification_coalescer'] = coalescer
+    flush_on_shutdown(coalescer)
 
 def register_blueprints(app):
     """Register Flask blueprints."""
-    from app.routes import bp as api_bp
+    from app.routes import bp as api_bp, register_socket_handlers
     from app.auth import auth_bp
     
+    register_socket_handlers()
+
     app.register_blueprint(api_bp, url_prefix='/api')
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
 
@@ -37,6 +120,12 @@ def init_database(app):
         from app.models import GlobalCounter
         try:
             GlobalCounter.initialize()
+            oracle = app.extensions.get('version_oracle')
+            if oracle is not None:
+                # The shared file may hold the version of a recreated or restored database,
+                # so force it to this one; the second read covers commits made in between
+                oracle.reset(GlobalCounter.current_value())
+                oracle.seed(GlobalCounter.current_value())
         except Exception as e:
             app.logger.error(f"Failed to initialize GlobalCounter: {e}")
 
@@ -61,6 +150,11 @@ def create_app(config_class=None):
     
     # Initialize application components
     init_extensions(app)
+    init_caches(app)
+    init_version_oracle(app)
+    init_job_queue(app)
+    init_report_pool(app)
+    init_notifications(app)
     register_blueprints(app)
     init_database(app)
     
@@ -1,10 +1,17 @@
 from app import db
-from datetime import datetime
+from datetime import datetime, timedelta
 import os
 import hashlib
+from flask import current_app, has_app_context
 from sqlalchemy import event, text
+from sqlalchemy.orm import Session, object_session
 from enum import Enum
 from config import Config
+from app.utils.cache import invalidate_task_caches
+from app.utils.geo import encode_geohash
+
+# 64-bit sequence numbers; SQLite only autoincrements INTEGER primary keys (which are 64-bit there)
+SEQUENCE_TYPE = db.BigInteger().with_variant(db.Integer, 'sqlite')
 
 class UserRole(str, Enum):
     """User role enumeration."""
@@ -90,6 +97,11 @@ class Task(db.Model):
     __table_args__ = (
         db.Index('idx_task_status', 'status'),  # Index for status queries
         db.Index('idx_task_location', 'location_lat', 'location_lon'),  # Index for location queries
+        db.Index('idx_task_change_version', 'change_version'),  # Index for delta sync queries
+        db.Index('idx_task_assigned_to', 'assigned_to'),  # Index for assignee filters
+        db.Index('idx_task_created_by', 'created_by'),  # Index for creator filters
+        db.Index('idx_task_created_at', 'created_at'),  # Index for time window filters
+        db.Index('idx_task_geohash', 'geohash'),  # Spatial index for nearby queries
         db.CheckConstraint('-90 <= location_lat AND location_lat <= 90', name='check_lat'),
         db.CheckConstraint('-180 <= location_lon AND location_lon <= 180', name='check_lon'),
     )
@@ -102,17 +114,24 @@ class Task(db.Model):
     assigned_to = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)  # ID of the user assigned to the task
     location_lat = db.Column(db.Float, nullable=False)  # Latitude of the task location
     location_lon = db.Column(db.Float, nullable=False)  # Longitude of the task location
+    geohash = db.Column(db.String(12), nullable=True)  # Geohash of the location, maintained by listeners
     created_at = db.Column(db.DateTime(timezone=True), default=lambda: datetime.now(Config.SERVER_TIMEZONE))
     updated_at = db.Column(db.DateTime(timezone=True), onupdate=lambda: datetime.now(Config.SERVER_TIMEZONE))
     creator = db.relationship('User', foreign_keys=[created_by], backref='created_tasks')
     assignee = db.relationship('User', foreign_keys=[assigned_to], backref='assigned_tasks')
     logs = db.relationship('TaskLog', backref='task', lazy='dynamic', cascade='all, delete-orphan')
     historical_assignees = db.Column(db.JSON, default=list)  # Store historical assignees as JSON array
+    change_version = db.Column(SEQUENCE_TYPE, default=0, nullable=False)  # Journal sequence number of the last change, stamped by listeners
 
-    def to_dict(self, include_logs=False):
-        """Convert task to dictionary."""
-        # Get current global counter
-        counter = GlobalCounter.query.first()
+    def to_dict(self, include_logs=False, global_version=None):
+        """Convert task to dictionary.
+
+        Args:
+            include_logs: Whether to include the task logs
+            global_version: Current global version, read from the change journal if not given
+        """
+        if global_version is None:
+            global_version = GlobalCounter.current_value()
         data = {
             'id': self.id,
             'title': self.title,
@@ -129,12 +148,27 @@ class Task(db.Model):
             },
             'created_at': self.created_at.isoformat(),
             'updated_at': self.updated_at.isoformat() if self.updated_at else None,
-            'global_version': counter.task_counter if counter else 0  
+            'global_version': global_version
         }
         if include_logs:
             data['logs'] = [log.to_dict() for log in self.logs]
         return data
 
+    @classmethod
+    def with_users(cls):
+        """Query tasks with creator and assignee loaded in the same query."""
+        return cls.query.options(db.joinedload(cls.creator), db.joinedload(cls.assignee))
+
+    @classmethod
+    def serialize_many(cls, tasks, global_version=None):
+        """Convert tasks to dictionaries reading the global version only once.
+
+        Load the tasks through ``with_users`` to avoid per-row user lookups.
+        """
+        if global_version is None:
+            global_version = GlobalCounter.current_value()
+        return [task.to_dict(global_version=global_version) for task in tasks]
+
     @staticmethod
     def validate_location(lat, lon):
         """Validate geographic coordinates."""
@@ -162,6 +196,7 @@ class TaskLog(db.Model):
     
     __table_args__ = (
         db.Index('idx_tasklog_task_time', 'task_id', 'timestamp'),  # Index for efficient log retrieval
+        db.Index('idx_tasklog_assigned_to', 'assigned_to'),  # Index for per-user scope queries
     )
     
     id = db.Column(db.Integer, primary_key=True)  # Unique log ID
@@ -189,6 +224,11 @@ class TaskLog(db.Model):
         db.session.add(log)
         return log
 
+    @classmethod
+    def with_users(cls):
+        """Query logs with modifier and assignee loaded in the same query."""
+        return cls.query.options(db.joinedload(cls.modifier), db.joinedload(cls.assignee))
+
     def to_dict(self, include_users=False):
         """Convert TaskLog to dictionary with optional user details."""
         data = {
@@ -215,11 +255,306 @@ class TaskLog(db.Model):
         """String representation of TaskLog."""
         return f'<TaskLog {self.id} Task:{self.task_id} Status:{self.status}>'
 
-# GlobalCounter model for maintaining a global task counter
+# TaskChange model: append-only journal of task changes
+class TaskChange(db.Model):
+    """Journal entry recording one insert, update or delete of a task.
+
+    Sequence numbers increase monotonically, so the latest visible sequence
+    number is the global task version and delete entries double as sync tombstones.
+    """
+
+    __table_args__ = (
+        db.Index('idx_taskchange_task_seq', 'task_id', 'seq'),  # Index for compaction
+        db.Index('idx_taskchange_op_seq', 'op', 'seq'),  # Index for tombstone queries
+        {'sqlite_autoincrement': True},  # Never reuse sequence numbers, even after compaction
+    )
+
+    INSERT = 'insert'
+    UPDATE = 'update'
+    DELETE = 'delete'
+
+    seq = db.Column(SEQUENCE_TYPE, primary_key=True, autoincrement=True)
+    task_id = db.Column(db.Integer, nullable=False)  # No FK, deleted tasks keep their entries
+    op = db.Column(db.String(10), nullable=False)
+    changed_at = db.Column(db.DateTime(timezone=True), default=lambda: datetime.now(Config.SERVER_TIMEZONE))
+
+    @staticmethod
+    def current_seq():
+        """Get the latest committed sequence number, or 0 if the journal is empty."""
+        return db.session.query(db.func.max(TaskChange.seq)).scalar() or 0
+
+    @staticmethod
+    def visible_seq():
+        """Get the latest sequence number below which every change has committed.
+
+        Sequence numbers are allocated when a change is flushed but become
+        visible at commit, so concurrent writers can commit out of order. The
+        version is capped below the changes pending writers may still commit,
+        so a client that has seen a sequence number never misses a lower one.
+        """
+        latest = TaskChange.current_seq()  # Read before the pending writers, see PendingTaskChange
+        floor = PendingTaskChange.lowest_floor()
+        return latest if floor is None else min(latest, floor)
+
+    def to_dict(self):
+        """Convert journal entry to dictionary."""
+        return {
+            'seq': self.seq,
+            'task_id': self.task_id,
+            'op': self.op,
+            'changed_at': self.changed_at.isoformat() if self.changed_at else None
+        }
+
+    def to_tombstone(self):
+        """Convert a delete entry to the tombstone sent by delta syncs."""
+        return {
+            'id': self.task_id,
+            'version': self.seq,
+            'deleted': True
+        }
+
+    def __repr__(self):
+        """String representation of TaskChange."""
+        return f'<TaskChange {self.seq} Task:{self.task_id} {self.op}>'
+
+# PendingTaskChange model: transactions that may still commit journal entries
+class PendingTaskChange(db.Model):
+    """A transaction writing task changes that has not committed yet.
+
+    Writers register in their own, immediately committed transaction before
+    their first change is flushed, and are removed once they commit or roll
+    back. floor_seq is the latest committed sequence number at registration,
+    so every change of the writer gets a higher one. A writer that allocated
+    a sequence number below a committed one was therefore already registered
+    when that one committed. Registrations older than
+    CHANGE_JOURNAL_PENDING_TTL seconds, left behind by crashed workers, are
+    ignored. SQLite admits a single writer, which commits in order, so
+    writers are only tracked on other databases.
+    """
+
+    __tablename__ = 'pending_task_change'
+
+    id = db.Column(db.Integer, primary_key=True)
+    floor_seq = db.Column(SEQUENCE_TYPE, nullable=False)  # Latest committed sequence number at registration
+    created_at = db.Column(db.DateTime(timezone=True), nullable=False)
+
+    @staticmethod
+    def tracked():
+        """Check whether writers are tracked on this database."""
+        return db.engine.dialect.name != 'sqlite'
+
+    @staticmethod
+    def register():
+        """Register a writer about to flush task changes.
+
+        Returns:
+            int: Registration ID to release once the writer's transaction ends
+        """
+        table = PendingTaskChange.__table__
+        with db.engine.begin() as connection:
+            floor = connection.execute(db.select(db.func.max(TaskChange.seq))).scalar() or 0
+            result = connection.execute(table.insert().values(
+                floor_seq=floor, created_at=datetime.now(Config.SERVER_TIMEZONE)
+            ))
+            return result.inserted_primary_key[0]
+
+    @staticmethod
+    def release(pending_id):
+        """Remove the registration of a writer whose transaction ended."""
+        table = PendingTaskChange.__table__
+        with db.engine.begin() as connection:
+            connection.execute(table.delete().where(table.c.id == pending_id))
+
+    @staticmethod
+    def lowest_floor():
+        """Get the lowest floor of the live registrations, or None if no writer is pending."""
+        if not PendingTaskChange.tracked():
+            return None
+        return db.session.query(db.func.min(PendingTaskChange.floor_seq)).filter(
+            PendingTaskChange.created_at > PendingTaskChange._expiry()
+        ).scalar()
+
+    @staticmethod
+    def prune():
+        """Delete expired registrations; returns how many were deleted."""
+        return PendingTaskChange.query.filter(
+            PendingTaskChange.created_at <= PendingTaskChange._expiry()
+        ).delete(synchronize_session=False)
+
+    @staticmethod
+    def _expiry():
+        ttl = current_app.config.get('CHANGE_JOURNAL_PENDING_TTL', Config.CHANGE_JOURNAL_PENDING_TTL)
+        return datetime.now(Config.SERVER_TIMEZONE) - timedelta(seconds=ttl)
+
+# TaskDailyStats model: per day task counts, maintained by the Task listeners
+class TaskDailyStats(db.Model):
+    """Daily task counts per status, updated in the same transaction as the tasks.
+
+    Counts are keyed by the local day: created_count and current_count by
+    the day the tasks were created, entered_count by the day of the change.
+    """
+
+    __tablename__ = 'task_daily_stats'
+
+    day = db.Column(db.Date, primary_key=True)
+    status = db.Column(db.String(20), primary_key=True)
+    created_count = db.Column(db.Integer, default=0, nullable=False)  # Tasks created this day with this status
+    current_count = db.Column(db.Integer, default=0, nullable=False)  # Tasks created this day that now have this status
+    entered_count = db.Column(db.Integer, default=0, nullable=False)  # Status changes into this status on this day
+
+    @staticmethod
+    def day_of(value):
+        """Get the local day a timestamp falls on, today if it is None.
+
+        Naive timestamps (as read back from SQLite) are already local.
+        """
+        if value is None:
+            value = datetime.now(Config.SERVER_TIMEZONE)
+        if value.tzinfo is not None:
+            value = value.astimezone(Config.SERVER_TIMEZONE)
+        return value.date()
+
+    def __repr__(self):
+        """String representation of TaskDailyStats."""
+        return f'<TaskDailyStats {self.day} {self.status}>'
+
+# ReportFile model: manifest of generated report files
+class ReportFile(db.Model):
+    """Report catalog entry: a file in REPORTS_DIR with the date (or range) and data version it was built from."""
+
+    __table_args__ = (
+        db.Index('idx_reportfile_date_version', 'report_date', 'end_date', 'format', 'data_version'),  # Index for cache lookups and date filters
+        db.Index('idx_reportfile_created_at', 'created_at'),  # Index for listing by modification time
+        db.Index('idx_reportfile_accessed_at', 'accessed_at'),  # Index for least recently used eviction
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    filename = db.Column(db.String(255), unique=True, nullable=False)  # File name inside REPORTS_DIR
+    report_date = db.Column(db.Date, nullable=True)  # Report date, or first day of a range report; unknown for foreign files
+    end_date = db.Column(db.Date, nullable=True)  # Last day of a range report
+    format = db.Column(db.String(20), default='txt', nullable=False)  # 'txt', 'csv', 'ndjson' or 'columnar'
+    data_version = db.Column(db.String(64), default='', nullable=False)  # Hash of the task data the report was built from
+    size = db.Column(db.Integer, nullable=False)  # File size in bytes
+    created_at = db.Column(db.DateTime(timezone=True), default=lambda: datetime.now(Config.SERVER_TIMEZONE))  # Last write of the file
+    accessed_at = db.Column(db.DateTime(timezone=True), default=lambda: datetime.now(Config.SERVER_TIMEZONE))  # Last download or cache hit
+
+    def to_dict(self):
+        """Convert catalog entry to dictionary."""
+        return {
+            'name': self.filename,
+            'size': self.size,
+            'modified_time': self.created_at.strftime('%Y-%m-%d %H:%M:%S') if self.created_at else None,
+            'report_date': self.report_date.isoformat() if self.report_date else None,
+            'end_date': self.end_date.isoformat() if self.end_date else None,
+            'format': self.format
+        }
+
+    def __repr__(self):
+        """String representation of ReportFile."""
+        return f'<ReportFile {self.filename}>'
+
+class BackgroundJob(db.Model):
+    """Status of a background job, so every worker process can report jobs queued by another."""
+
+    __table_args__ = (
+        db.Index('idx_backgroundjob_status_finished', 'status', 'finished_at'),  # Index for pruning finished jobs
+    )
+
+    FINISHED_STATUSES = ('completed', 'failed')
+
+    id = db.Column(db.String(32), primary_key=True)  # Job ID handed to clients
+    kind = db.Column(db.String(50), nullable=False)  # Job type, e.g. 'report'
+    params = db.Column(db.JSON, default=dict)
+    owner = db.Column(db.Integer, nullable=True)  # Requesting user; no FK so jobs outlive deleted users
+    status = db.Column(db.String(20), nullable=False)
+    progress = db.Column(db.Integer, default=0, nullable=False)
+    result = db.Column(db.JSON, nullable=True)
+    error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime(timezone=True), nullable=False)
+    finished_at = db.Column(db.DateTime(timezone=True), nullable=True)
+
+    @property
+    def finished(self):
+        return self.status in self.FINISHED_STATUSES
+
+    @staticmethod
+    def prune(history):
+        """Delete finished jobs beyond the newest ``history`` of them."""
+        finished = BackgroundJob.status.in_(BackgroundJob.FINISHED_STATUSES)
+        kept = db.session.query(BackgroundJob.id).filter(finished).order_by(
+            BackgroundJob.finished_at.desc()
+        ).limit(history).subquery()
+        removed = BackgroundJob.query.filter(finished, BackgroundJob.id.not_in(db.select(kept.c.id))).delete(
+            synchronize_session=False
+        )
+        db.session.commit()
+        return removed
+
+    def to_dict(self):
+        """Convert job to dictionary."""
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'params': self.params,
+            'status': self.status,
+            'progress': self.progress,
+            'result': self.result,
+            'error': self.error,
+            'created_at': self.created_at.isoformat(),
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+
+    def __repr__(self):
+        """String representation of BackgroundJob."""
+        return f'<BackgroundJob {self.id} {self.status}>'
+
+class NotificationLog(db.Model):
+    """Persisted notification, replayed to clients reconnecting after the in-memory buffer rolled over."""
+
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'seq', name='uq_notificationlog_user_seq'),  # One notification per user sequence number
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, nullable=False)  # Recipient; no FK so history outlives deleted users
+    seq = db.Column(SEQUENCE_TYPE, nullable=False)  # Per-user notification sequence number
+    type = db.Column(db.String(50), nullable=False)
+    message = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime(timezone=True), default=lambda: datetime.now(Config.SERVER_TIMEZONE))
+
+    @staticmethod
+    def last_seq(user_id):
+        """Get the latest sequence number of a user, or 0."""
+        return db.session.query(db.func.max(NotificationLog.seq)).filter(
+            NotificationLog.user_id == int(user_id)
+        ).scalar() or 0
+
+    @staticmethod
+    def prune(keep):
+        """Delete each user's notifications older than their latest ``keep``.
+
+        Returns:
+            int: Number of notifications deleted
+        """
+        newer = db.aliased(NotificationLog)
+        latest = db.select(db.func.max(newer.seq)).where(newer.user_id == NotificationLog.user_id).scalar_subquery()
+        removed = NotificationLog.query.filter(NotificationLog.seq <= latest - keep).delete(synchronize_session=False)
+        db.session.commit()
+        return removed
+
+    def to_notification(self):
+        """Convert to the notification payload sent to clients."""
+        return {'seq': self.seq, 'message': self.message, 'type': self.type}
+
+    def __repr__(self):
+        """String representation of NotificationLog."""
+        return f'<NotificationLog {self.user_id}:{self.seq}>'
+
+# GlobalCounter model, kept for compatibility; the task version now comes from the change journal
 class GlobalCounter(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    task_counter = db.Column(db.Integer, default=0, nullable=False)  # Global task counter
-    MAX_COUNTER = 2**31 - 1
+    task_counter = db.Column(db.Integer, default=0, nullable=False)  # Legacy global task counter, no longer written
+    journal_floor = db.Column(SEQUENCE_TYPE, default=0, nullable=False)  # Highest sequence number lost to compaction
 
     @staticmethod
     def initialize():
@@ -232,45 +567,189 @@ class GlobalCounter(db.Model):
             db.session.commit()
 
     @staticmethod
-    def increment_counter():
+    def current_value():
+        """
+        Get the current global task version, the latest change journal sequence
+        number below which every change has committed.
+        """
+        return TaskChange.visible_seq()
+
+    @staticmethod
+    def floor_value():
         """
-        Increment the global task counter with overflow check.
+        Get the journal floor; every change after it is still in the journal.
         """
         counter = GlobalCounter.query.first()
-        if counter:
-            counter.task_counter = (counter.task_counter + 1) % GlobalCounter.MAX_COUNTER
-            db.session.commit()
+        return counter.journal_floor if counter else 0
 
     @staticmethod
     def reset_counter():
         """
-        Reset the global task counter to zero.
+        Clear the change journal. Sequence numbers keep increasing afterwards,
+        and the floor moves up so existing clients resync from scratch.
         """
+        floor = TaskChange.current_seq()
+        TaskChange.query.delete()
         counter = GlobalCounter.query.first()
         if counter:
             counter.task_counter = 0
-            db.session.commit()
+            counter.journal_floor = floor
+        db.session.commit()
+        oracle = _version_oracle()
+        if oracle is not None:
+            oracle.reset()
 
 # Event listeners for the Task table
+def _record_change(connection, target, op):
+    """Append a task change to the journal and return its sequence number.
+
+    The sequence number is kept on the session so the version oracle can be
+    advanced once the transaction commits.
+    """
+    invalidate_task_caches()
+    result = connection.execute(TaskChange.__table__.insert().values(task_id=target.id, op=op))
+    seq = result.inserted_primary_key[0]
+    session = object_session(target)
+    if session is not None:
+        session.info['task_version'] = max(session.info.get('task_version', 0), seq)
+    return seq
+
+def _version_oracle():
+    """Get the current app's version oracle, if there is one."""
+    return current_app.extensions.get('version_oracle') if has_app_context() else None
+
+def _stamp_task(connection, task_id, version):
+    """Record the sequence number of the latest change on the task row."""
+    connection.execute(
+        text("UPDATE task SET change_version = :version WHERE id = :id"),
+        {"version": version, "id": task_id}
+    )
+
+def _status_value(status):
+    """Get the plain string of a status that may be a TaskStatus member."""
+    return getattr(status, 'value', status)
+
+def _add_daily_stats(connection, day, status, created=0, current=0, entered=0):
+    """Add to the daily statistics row of a day and status, creating it if needed."""
+    connection.execute(
+        text(
+            "INSERT INTO task_daily_stats (day, status, created_count, current_count, entered_count) "
+            "VALUES (:day, :status, :created, :current, :entered) "
+            "ON CONFLICT (day, status) DO UPDATE SET "
+            "created_count = task_daily_stats.created_count + excluded.created_count, "
+            "current_count = task_daily_stats.current_count + excluded.current_count, "
+            "entered_count = task_daily_stats.entered_count + excluded.entered_count"
+        ).bindparams(db.bindparam('day', type_=db.Date)),
+        {"day": day, "status": _status_value(status), "created": created, "current": current, "entered": entered}
+    )
+
+def _previous_values(connection, target, status_history, created_history):
+    """Get the status and creation time of a task before the pending update."""
+    if (status_history.deleted or status_history.unchanged) and (created_history.deleted or created_history.unchanged):
+        return (
+            (status_history.deleted or status_history.unchanged)[0],
+            (created_history.deleted or created_history.unchanged)[0]
+        )
+    table = Task.__table__
+    return connection.execute(
+        db.select(table.c.status, table.c.created_at).where(table.c.id == target.id)
+    ).one()
+
+@event.listens_for(Task, 'before_insert')
+@event.listens_for(Task, 'before_update')
+def update_geohash(mapper, connection, target):
+    """
+    Keep the geohash spatial index column in sync with the task location.
+    """
+    if target.location_lat is not None and target.location_lon is not None:
+        geohash = encode_geohash(target.location_lat, target.location_lon)
+        if target.geohash != geohash:
+            target.geohash = geohash
+
+@event.listens_for(Task, 'before_update')
+def update_daily_stats(mapper, connection, target):
+    """
+    Move the task between daily statistics rows when its status changes,
+    counting the status change on today's row.
+    """
+    state = db.inspect(target)
+    status_history = state.attrs.status.history
+    created_history = state.attrs.created_at.history
+    if not (status_history.has_changes() or created_history.has_changes()):
+        return
+
+    old_status, old_created_at = _previous_values(connection, target, status_history, created_history)
+    old_status, new_status = _status_value(old_status), _status_value(target.status)
+    old_day, new_day = TaskDailyStats.day_of(old_created_at), TaskDailyStats.day_of(target.created_at)
+    if (old_day, old_status) != (new_day, new_status):
+        _add_daily_stats(connection, old_day, old_status, current=-1)
+        _add_daily_stats(connection, new_day, new_status, current=1)
+    if old_status != new_status:
+        _add_daily_stats(connection, TaskDailyStats.day_of(None), new_status, entered=1)
+
 @event.listens_for(Task, 'after_insert')
 def after_insert(mapper, connection, target):
     """
-    Increment the global task counter after a new task is inserted.
+    Journal a new task, stamp it with the change's sequence number and
+    count it in the daily statistics.
     """
-    connection.execute(text("UPDATE global_counter SET task_counter = (task_counter + 1) % 2147483647"))
+    _stamp_task(connection, target.id, _record_change(connection, target, TaskChange.INSERT))
+    _add_daily_stats(connection, TaskDailyStats.day_of(target.created_at), target.status, created=1, current=1)
 
 @event.listens_for(Task, 'after_update')
 def after_update(mapper, connection, target):
     """
-    Increment the global task counter after a task is updated.
-    Only increment when there are actual changes to the task.
+    Journal a task update and stamp it with the change's sequence number.
+    Only journal when there are actual changes to the task.
     """
     if db.session.is_modified(target):
-        connection.execute(text("UPDATE global_counter SET task_counter = (task_counter + 1) % 2147483647"))
+        _stamp_task(connection, target.id, _record_change(connection, target, TaskChange.UPDATE))
 
 @event.listens_for(Task, 'after_delete')
 def after_delete(mapper, connection, target):
     """
-    Increment the global task counter after a task is deleted.
+    Journal a task deletion; the entry is the tombstone for delta syncs
+    until compaction removes it. The task no longer counts in the daily statistics.
+    """
+    _record_change(connection, target, TaskChange.DELETE)
+    _add_daily_stats(connection, TaskDailyStats.day_of(target.created_at), target.status, current=-1)
+
+# Event listeners for sessions
+@event.listens_for(Session, 'before_flush')
+def register_pending_writer(session, flush_context, instances):
+    """
+    Register the transaction as a pending writer before it flushes its first task change.
+    """
+    if 'pending_change_id' in session.info or not PendingTaskChange.tracked():
+        return
+    if any(isinstance(obj, Task) for obj in (*session.new, *session.dirty, *session.deleted)):
+        session.info['pending_change_id'] = PendingTaskChange.register()
+
+def _release_pending_writer(session):
+    """Remove the transaction's pending writer registration, if any."""
+    pending_id = session.info.pop('pending_change_id', None)
+    if pending_id is not None:
+        try:
+            PendingTaskChange.release(pending_id)
+        except Exception as e:
+            # The registration expires after CHANGE_JOURNAL_PENDING_TTL seconds
+            current_app.logger.error(f"Failed to release pending task change {pending_id}: {e}")
+
+@event.listens_for(Session, 'after_commit')
+def advance_version_oracle(session):
+    """
+    Publish the latest committed task version to the version oracle.
+    """
+    _release_pending_writer(session)
+    version = session.info.pop('task_version', None)
+    oracle = _version_oracle()
+    if version is not None and oracle is not None:
+        oracle.advance(version)
+
+@event.listens_for(Session, 'after_rollback')
+def discard_task_version(session):
+    """
+    Forget task versions and the pending writer registration of a rolled back transaction.
     """
-    connection.execute(text("UPDATE global_counter SET task_counter = (task_counter + 1) % 2147483647"))
\ No newline at end of file
+    _release_pending_writer(session)
+    session.info.pop('task_version', None)
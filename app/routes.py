@@ -6,9 +6,11 @@ from app.services.report_service import ReportService
 from app.services.websocket_service import WebSocketService
 from app.services.task_service import TaskService
 from app.utils.decorators import handle_api_error, admin_required
-from app.utils.response import success_response, error_response, redirect_response, AuthError, NotFoundError
+from app.utils.response import success_response, success_body, raw_json_response, error_response, redirect_response, wants_ndjson, ndjson_response, gzip_file_response, etag_matches, set_etag, not_modified_response, AuthError, NotFoundError
+from app.utils.report_formats import mimetype_for
+from app.utils.cache import task_snapshot_cache, task_tile_cache
 import os
-from datetime import datetime, date
+from itertools import chain
 
 bp = Blueprint('api', __name__)
 
@@ -16,16 +18,34 @@ bp = Blueprint('api', __name__)
 # WebSocket Routes
 # ----------------------
 
-@socketio.on('connect')
 def handle_connect(auth):
     """Handle WebSocket connection."""
     WebSocketService.handle_connect(auth)
 
-@socketio.on('disconnect')
 def handle_disconnect():
     """Handle WebSocket disconnection."""
     WebSocketService.handle_disconnect()
 
+def handle_subscribe_task_changes():
+    """Subscribe to structured task change events."""
+    return WebSocketService.handle_subscribe_task_changes()
+
+def handle_unsubscribe_task_changes():
+    """Unsubscribe from structured task change events."""
+    return WebSocketService.handle_unsubscribe_task_changes()
+
+def register_socket_handlers():
+    """Register WebSocket event handlers on the current Socket.IO server.
+
+    Called for every app instance, since each ``socketio.init_app`` call
+    creates a new server that does not keep handlers registered earlier.
+    """
+    socketio.on_event('connect', handle_connect)
+    socketio.on_event('disconnect', handle_disconnect)
+    socketio.on_event('subscribe_task_changes', handle_subscribe_task_changes)
+    socketio.on_event('unsubscribe_task_changes', handle_unsubscribe_task_changes)
+    WebSocketService.attach_cluster()
+
 # ----------------------
 # Task Routes
 # ----------------------
@@ -52,7 +72,7 @@ def add_task():
         return success_response(
             data={
                 "task_id": task.id,
-                "task": task.to_dict()
+                "task": TaskService.serialize_task(task.id)
             },
             message="Task created successfully",
             status_code=201
@@ -122,7 +142,7 @@ def update_task(task_id):
                 )
 
         return success_response(
-            data={"task": task.to_dict()},
+            data={"task": TaskService.serialize_task(task.id)},
             message="Task updated successfully"
         )
 
@@ -148,80 +168,286 @@ def update_task(task_id):
 @jwt_required()
 @handle_api_error
 def get_task(task_id):
-    """Get single task details endpoint."""
+    """Get single task details endpoint.
+
+    Supports conditional requests with a weak ETag derived from the task's
+    change version and its logs. The embedded global_version is not part
+    of the ETag, as it changes whenever any other task does.
+    """
+    stamp = TaskService.get_task_stamp(task_id)
+    etag = "task-{}-{}-{}-{}".format(task_id, *stamp) if stamp else None
+    if etag and etag_matches(etag):
+        return not_modified_response(etag, weak=True)
+
     current_user = db.session.get(User, int(get_jwt_identity()))
     if not current_user:
         return error_response("User not found", status_code=404)
 
-    task = db.session.get(Task, task_id)
-    if not task:
+    task_data = TaskService.serialize_task(task_id)
+    if not task_data:
         return error_response(
             message="Task not found",
             error=f"Task with ID {task_id} does not exist",
             status_code=404
         )
 
-    task_data = task.to_dict()
-    task_data['logs'] = [log.to_dict() for log in task.logs.order_by(TaskLog.timestamp.desc()).all()]
+    task_data['logs'] = [log.to_dict() for log in TaskService.get_task_logs(task_id)]
 
-    return success_response(
+    return set_etag(success_response(
         data={"task": task_data},
         message="Task retrieved successfully"
-    )
+    ), etag, weak=True)
 
 @bp.route('/tasks/<int:task_id>/logs', methods=['GET'])
 @jwt_required()
 @handle_api_error
 def get_task_logs(task_id):
-    """Get task logs endpoint."""
-    task = db.session.get(Task, task_id)
-    if not task:
+    """Get task logs endpoint.
+
+    Supports conditional requests with an ETag derived from the log count
+    and latest log ID.
+    """
+    stamp = TaskService.get_task_stamp(task_id)
+    if not stamp:
         return error_response(f"Task with ID {task_id} not found", status_code=404)
+    etag = f"task-logs-{task_id}-{stamp[1]}-{stamp[2]}"
+    if etag_matches(etag):
+        return not_modified_response(etag)
 
-    logs = task.logs.order_by(TaskLog.timestamp.desc()).all()
+    logs = TaskService.get_task_logs(task_id)
     if not logs:
         return error_response(f"No logs found for task ID {task_id}", status_code=404)
 
-    return success_response(
+    return set_etag(success_response(
         data=[log.to_dict(include_users=True) for log in logs],
         message="Task logs retrieved successfully"
-    )
+    ), etag)
 
 @bp.route('/tasks', methods=['GET'])
 @jwt_required()
 @handle_api_error
 def get_all_tasks():
-    """Get all tasks endpoint."""
-    current_user = db.session.get(User, int(get_jwt_identity()))
+    """Get all tasks endpoint.
+
+    Filters (status, assigned_to, created_by, created_after, created_before,
+    scope) narrow the list. Passing limit or cursor switches to keyset
+    pagination. Requesting NDJSON streams one task per line instead.
+    Responses carry an ETag derived from the global version (or, for scoped
+    lists, the scope version and user) and the request arguments.
+    """
+    current_user_id = int(get_jwt_identity())
+    scopes = TaskService.parse_scopes(request.args.get('scope'))
+    streaming = wants_ndjson()
+    current_version = GlobalCounter.current_value()
+    if scopes:
+        # Scoped lists embed the global version, which may move without the scope changing
+        scope_version = TaskService.scope_version(scopes, current_user_id)
+        etag = TaskService.list_etag(scope_version, request.args, streaming, current_user_id)
+    else:
+        etag = TaskService.list_etag(current_version, request.args, streaming)
+    weak = bool(scopes)
+    if etag_matches(etag):
+        return not_modified_response(etag, weak=weak)
+
+    current_user = db.session.get(User, current_user_id)
     if not current_user:
         return error_response("User not found", status_code=404)
         
-    tasks = Task.query.all()
+    if 'limit' in request.args or 'cursor' in request.args:
+        tasks, next_cursor = TaskService.list_tasks_page(request.args, current_user_id)
+        return set_etag(success_response(
+            data={
+                "tasks": Task.serialize_many(tasks, current_version),
+                "next_cursor": next_cursor
+            },
+            message="Tasks retrieved successfully"
+        ), etag, weak=weak)
+    if streaming:
+        query = TaskService.filter_tasks(Task.with_users(), request.args, current_user_id).order_by(Task.id)
+        return set_etag(
+            ndjson_response(TaskService.iter_task_dicts(query, current_version, _stream_batch_size())),
+            etag, weak=weak
+        )
+    if any(name in request.args for name in TaskService.FILTER_ARGS):
+        tasks = TaskService.filter_tasks(Task.with_users(), request.args, current_user_id).all()
+        return set_etag(success_response(
+            data=Task.serialize_many(tasks, current_version),
+            message="Tasks retrieved successfully"
+        ), etag, weak=weak)
+
+    body = task_snapshot_cache.get_or_build(
+        ('tasks', current_version),
+        lambda: success_body(
+            data=Task.serialize_many(Task.with_users().all(), current_version),
+            message="Tasks retrieved successfully"
+        )
+    )
+    return set_etag(raw_json_response(body), etag)
+
+@bp.route('/tasks/nearby', methods=['GET'])
+@jwt_required()
+@handle_api_error
+def get_nearby_tasks():
+    """Get tasks closest to a location endpoint."""
+    results = TaskService.find_nearby(request.args)
+    current_version = GlobalCounter.current_value()
+    data = []
+    for task, distance in results:
+        task_data = task.to_dict(global_version=current_version)
+        task_data['distance_m'] = round(distance, 1)
+        data.append(task_data)
+
     return success_response(
-        data=[task.to_dict() for task in tasks],
-        message="Tasks retrieved successfully"
+        data=data,
+        message="Nearby tasks retrieved successfully"
     )
 
+@bp.route('/tasks/tiles/<int:z>/<int:x>/<int:y>', methods=['GET'])
+@jwt_required()
+@handle_api_error
+def get_task_tile(z, x, y):
+    """Get clustered task counts for a map tile endpoint."""
+    status = request.args.get('status') or None
+    current_version = GlobalCounter.current_value()
+    grid_size = current_app.config.get('TASK_TILE_GRID_SIZE', 8)
+    body = task_tile_cache.get_or_build(
+        ('tile', z, x, y, status, grid_size, current_version),
+        lambda: success_body(
+            data={
+                "z": z,
+                "x": x,
+                "y": y,
+                "version": current_version,
+                "grid_size": grid_size,
+                "cells": TaskService.get_tile_clusters(z, x, y, status, grid_size)
+            },
+            message="Tile retrieved successfully"
+        )
+    )
+    return raw_json_response(body)
+
 @bp.route('/tasks/sync', methods=['GET'])
 @jwt_required()
 @handle_api_error
 def sync_tasks():
-    """Sync tasks with version check."""
+    """Sync tasks with version check.
+
+    With ``mode=delta`` only tasks changed since the client's version are
+    returned, plus tombstones for deleted tasks. Clients too far behind get
+    a full snapshot instead, flagged by ``mode: full`` in the response.
+
+    When NDJSON is requested, the first line holds the sync metadata and
+    every following line is a task or a tombstone (``"deleted": true``).
+
+    With ``scope`` (mine, open) the sync covers only the user's view and is
+    versioned by its own token, see ``_sync_scoped_tasks``.
+    """
+    scopes = TaskService.parse_scopes(request.args.get('scope'))
+    if scopes:
+        return _sync_scoped_tasks(scopes, int(get_jwt_identity()))
+
     client_version = request.args.get('version', type=int, default=0)
-    current_version = GlobalCounter.query.first().task_counter
-    
+    # With a shared version oracle, up-to-date clients are answered without a database query
+    if 'version_oracle' in current_app.extensions and client_version == TaskService.cached_version():
+        return redirect_response(status_code=304)
+
+    current_version = GlobalCounter.current_value()
     if client_version == current_version:
         return redirect_response(status_code=304)
     
-    tasks = Task.query.all()
+    delta = request.args.get('mode') == 'delta' and TaskService.can_sync_delta(client_version, current_version)
+    if wants_ndjson():
+        if delta:
+            tasks, tombstones = TaskService.query_changes_since(client_version, current_version)
+        else:
+            tasks, tombstones = Task.with_users().order_by(Task.id), []
+        header = {"version": current_version, "needs_sync": True, "mode": "delta" if delta else "full"}
+        return ndjson_response(chain(
+            [header],
+            (tombstone.to_tombstone() for tombstone in tombstones),
+            TaskService.iter_task_dicts(tasks, current_version, _stream_batch_size())
+        ))
+
+    if delta:
+        tasks, tombstones = TaskService.query_changes_since(client_version, current_version)
+        return success_response(
+            data={
+                "version": current_version,
+                "needs_sync": True,
+                "mode": "delta",
+                "tasks": Task.serialize_many(tasks.all(), current_version),
+                "deleted": [tombstone.to_tombstone() for tombstone in tombstones.all()]
+            }
+        )
+    
+    body = task_snapshot_cache.get_or_build(
+        ('sync', current_version),
+        lambda: success_body(
+            data={
+                "version": current_version,
+                "needs_sync": True,
+                "mode": "full",
+                "tasks": Task.serialize_many(Task.with_users().all(), current_version),
+                "deleted": []
+            }
+        )
+    )
+    return raw_json_response(body)
+
+def _sync_scoped_tasks(scopes, user_id):
+    """Sync a scoped view of the tasks for one user.
+
+    The version is the scope's own token, so the client keeps getting 304
+    while unrelated tasks change. Scoped syncs always send the full scoped
+    set, which is small for field users.
+    """
+    scope_version = TaskService.scope_version(scopes, user_id)
+    if request.args.get('version') == scope_version:
+        return redirect_response(status_code=304)
+
+    current_version = GlobalCounter.current_value()
+    query = TaskService.filter_tasks(Task.with_users(), {'scope': ','.join(scopes)}, user_id).order_by(Task.id)
+    header = {"version": scope_version, "needs_sync": True, "mode": "full", "scope": ",".join(scopes)}
+    if wants_ndjson():
+        return ndjson_response(chain(
+            [header],
+            TaskService.iter_task_dicts(query, current_version, _stream_batch_size())
+        ))
     return success_response(
         data={
-            "version": current_version,
-            "needs_sync": True,
-            "tasks": [task.to_dict() for task in tasks]
+            **header,
+            "tasks": Task.serialize_many(query.all(), current_version),
+            "deleted": []
         }
     )
 
+@bp.route('/changes', methods=['GET'])
+@jwt_required()
+@handle_api_error
+def get_changes():
+    """Task change feed endpoint.
+
+    Returns journal entries after the ``after`` sequence number. Resume with
+    ``next_after`` until ``has_more`` is false; a 410 means the requested
+    entries were compacted and the client must resync the full task list.
+    """
+    after = request.args.get('after', 0)
+    limit = request.args.get('limit')
+    try:
+        after = int(after)
+        limit = int(limit) if limit is not None else None
+    except ValueError:
+        return error_response("after and limit must be integers", 400)
+
+    return success_response(
+        data=TaskService.list_changes(after, limit),
+        message="Changes retrieved successfully"
+    )
+
+def _stream_batch_size():
+    """Rows fetched per batch for streamed responses."""
+    return current_app.config.get('STREAM_BATCH_SIZE', 500)
+
 # ----------------------
 # Report Routes
 # ----------------------
@@ -231,22 +457,40 @@ def sync_tasks():
 @admin_required
 @handle_api_error
 def generate_report():
-    """Generate report endpoint with optional date parameter."""
-    date_str = request.args.get('date')
-    today = date.today()
-    
-    if date_str:
-        try:
-            report_date = datetime.strptime(date_str, '%Y-%m-%d').date()
-            # Check if date is in the future
-            if report_date > today:
-                return error_response("Cannot generate report for future dates", 400)
-        except ValueError:
-            return error_response("Invalid date format. Please use YYYY-MM-DD format.", 400)
-    else:
-        report_date = today
-        
-    filename, report_text = ReportService.generate_report(report_date=report_date)
+    """Generate report endpoint with optional date or start_date/end_date range and format parameters.
+
+    Only plain text daily reports are echoed in the response; other reports
+    are downloaded from their download_url.
+    """
+    report_format = ReportService.parse_report_format(request.args.get('format'))
+    if 'start_date' in request.args or 'end_date' in request.args:
+        start_date, end_date = ReportService.parse_report_range(
+            request.args.get('start_date'), request.args.get('end_date')
+        )
+        filename, size = ReportService.generate_range_report(start_date, end_date, report_format=report_format)
+        return success_response(
+            data={
+                "filename": filename,
+                "format": report_format,
+                "start_date": start_date.isoformat(),
+                "end_date": end_date.isoformat(),
+                "size": size,
+                "download_url": f"/api/reports/{filename}"
+            },
+            message="Report generated successfully"
+        )
+
+    report_date = ReportService.parse_report_date(request.args.get('date'))
+    filename, report_text = ReportService.generate_report(report_date=report_date, report_format=report_format)
+    if report_text is None:
+        return success_response(
+            data={
+                "filename": filename,
+                "format": report_format,
+                "download_url": f"/api/reports/{filename}"
+            },
+            message="Report generated successfully"
+        )
     return success_response(
         data={
             "filename": filename,
@@ -255,17 +499,56 @@ def generate_report():
         message="Report generated successfully"
     )
 
+@bp.route("/reports/jobs", methods=["POST"])
+@jwt_required()
+@admin_required
+@handle_api_error
+def create_report_job():
+    """Queue background report generation endpoint.
+
+    Returns 202 with the job; poll it or wait for the report_job_completed
+    WebSocket event.
+    """
+    data = {**request.args.to_dict(), **(request.get_json(silent=True) or {})}
+    report_format = ReportService.parse_report_format(data.get('format'))
+    if 'start_date' in data or 'end_date' in data:
+        report_date, end_date = ReportService.parse_report_range(data.get('start_date'), data.get('end_date'))
+    else:
+        report_date, end_date = ReportService.parse_report_date(data.get('date')), None
+    job, created = ReportService.enqueue_report_job(report_date, get_jwt_identity(), end_date, report_format)
+    return success_response(
+        data=job.to_dict(),
+        message="Report job queued" if created else "Report job already pending",
+        status_code=202
+    )
+
+@bp.route("/reports/jobs/<string:job_id>", methods=["GET"])
+@jwt_required()
+@admin_required
+@handle_api_error
+def get_report_job(job_id):
+    """Report job status endpoint."""
+    job = ReportService.get_report_job(job_id)
+    return success_response(
+        data=job.to_dict(),
+        message="Report job retrieved successfully"
+    )
+
 @bp.route("/reports", methods=["GET"])
 @jwt_required()
 @handle_api_error
 def list_reports():
-    """List reports endpoint."""
-    files = ReportService.list_reports()
-    if not files:
+    """List reports endpoint.
+
+    Reads the report catalog; start_date/end_date, format, sort, order,
+    limit and offset filter and page the list.
+    """
+    files, total = ReportService.list_reports(request.args)
+    if not total:
         return error_response("No reports found", status_code=404)
         
     return success_response(
-        data={"files": files},
+        data={"files": files, "total": total},
         message="Reports retrieved successfully"
     )
 
@@ -273,9 +556,19 @@ def list_reports():
 @jwt_required()
 @handle_api_error
 def get_report(filename):
-    """Download report endpoint."""
+    """Download report endpoint.
+
+    Clients accepting gzip get a compressed stream; Range requests are
+    served uncompressed so byte offsets refer to the file.
+    """
     file_path = ReportService.get_report_file(filename)
-    return send_file(file_path, as_attachment=True)
+    ReportService.touch_report(filename)
+    mimetype = mimetype_for(filename)
+    if 'Range' not in request.headers and request.accept_encodings['gzip']:
+        return gzip_file_response(file_path, filename, mimetype)
+    response = send_file(file_path, as_attachment=True, mimetype=mimetype, conditional=True)
+    response.vary.add('Accept-Encoding')
+    return response
 
 @bp.route("/reports/<string:filename>", methods=["DELETE"])
 @jwt_required()
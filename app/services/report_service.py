@@ -1,94 +1,170 @@
 from datetime import datetime, timedelta, date
 from app import db
-from app.models import Task, TaskLog, User
+from app.models import Task, TaskLog, User, TaskDailyStats, ReportFile, GlobalCounter
+from itertools import groupby
 import pytz
 import os
+import re
+import time
+import hashlib
 from flask import current_app
+from sqlalchemy import func
 from app.utils.response import AuthError
+from app.services.websocket_service import WebSocketService
+from app.utils.report_formats import REPORT_FORMATS, encode_day, iter_total_records
 from config import Config
 
 class ReportService:
     """Service class for report-related operations."""
     
     @staticmethod
-    def get_task_statistics(target_date=None):
+    def get_day_bounds(target_date):
+        """Get the start and end of a local day as UTC datetimes."""
+        local_tz = Config.SERVER_TIMEZONE
+        local_start_of_day = local_tz.localize(datetime.combine(target_date, datetime.min.time()))
+        local_end_of_day = local_start_of_day + timedelta(days=1)
+        return local_start_of_day.astimezone(pytz.utc), local_end_of_day.astimezone(pytz.utc)
+
+    @classmethod
+    def get_task_statistics(cls, target_date=None):
         """Get task statistics for the specified date.
+
+        Runs a fixed number of queries however many issues are reported.
         
         Args:
             target_date (date, optional): The date to get statistics for. Defaults to today.
         """
-        # Define timezone and get target date
-        local_tz = Config.SERVER_TIMEZONE
-        utc_tz = pytz.utc
-        
         if target_date is None:
-            target_date = datetime.now(local_tz).date()
-            
-        # Calculate start and end of the target date in local time, then convert to UTC
-        local_start_of_day = local_tz.localize(datetime.combine(target_date, datetime.min.time()))
-        local_end_of_day = local_start_of_day + timedelta(days=1)
-        start_of_day_utc = local_start_of_day.astimezone(utc_tz)
-        end_of_day_utc = local_end_of_day.astimezone(utc_tz)
+            target_date = datetime.now(Config.SERVER_TIMEZONE).date()
+        _, end_of_day_utc = cls.get_day_bounds(target_date)
 
-        # Query task statistics
-        tasks_created_today = Task.query.filter(Task.created_at.between(start_of_day_utc, end_of_day_utc)).count()
+        # Read task counts from the daily statistics table
+        tasks_created_today = db.session.query(
+            db.func.coalesce(db.func.sum(TaskDailyStats.current_count), 0)
+        ).filter(TaskDailyStats.day == target_date).scalar()
 
-        # Query task status distribution for tasks that exist on the target date
+        # Status distribution of the tasks created on or before the target date
         task_status_distribution = dict(
-            db.session.query(Task.status, db.func.count(Task.id))
-            .filter(Task.created_at <= end_of_day_utc)  # Tasks that were created on or before the end of target date
-            .group_by(Task.status)
+            db.session.query(TaskDailyStats.status, db.func.sum(TaskDailyStats.current_count))
+            .filter(TaskDailyStats.day <= target_date)
+            .group_by(TaskDailyStats.status)
+            .having(db.func.sum(TaskDailyStats.current_count) > 0)
+            .order_by(TaskDailyStats.status)
             .all()
         )
 
-        # Query tasks with status 'issue_reported' that exist on the target date
+        return {
+            'tasks_created_today': tasks_created_today,
+            'task_status_distribution': task_status_distribution,
+            'reported_issues': [issue for _, issue in cls.get_reported_issues(end_of_day_utc)]
+        }
+
+    @staticmethod
+    def get_reported_issues(end_of_day_utc):
+        """Get the 'issue_reported' tasks created before a time, with their logs.
+
+        Creator, assignee and log user names are joined in, so this runs two
+        queries however many issues there are.
+
+        Returns:
+            list: (created_at, issue) pairs ordered by task ID, issue in report format
+        """
+        creator = db.aliased(User)
+        assignee = db.aliased(User)
+        reported_filter = (
+            Task.status == 'issue_reported',
+            Task.created_at <= end_of_day_utc
+        )
         reported_tasks = db.session.query(
             Task.id,
             Task.title,
             Task.description,
-            Task.created_by,
-            Task.assigned_to,
+            db.func.coalesce(creator.username, 'Unknown'),
+            db.func.coalesce(assignee.username, 'Unassigned'),
             Task.location_lat,
-            Task.location_lon
+            Task.location_lon,
+            Task.created_at
+        ).outerjoin(
+            creator, creator.id == Task.created_by
+        ).outerjoin(
+            assignee, assignee.id == Task.assigned_to
+        ).filter(*reported_filter).order_by(Task.id).all()
+
+        # Get the logs of all reported tasks in one query, grouped by task
+        log_assignee = db.aliased(User)
+        reported_ids = db.session.query(Task.id).filter(*reported_filter)
+        task_logs = db.session.query(
+            TaskLog.task_id,
+            TaskLog.note,
+            TaskLog.status,
+            TaskLog.timestamp,
+            log_assignee.username
+        ).outerjoin(
+            log_assignee, log_assignee.id == TaskLog.assigned_to
         ).filter(
-            Task.status == 'issue_reported',
-            Task.created_at <= end_of_day_utc
-        ).all()
+            TaskLog.task_id.in_(reported_ids)
+        ).order_by(TaskLog.task_id, TaskLog.timestamp.asc(), TaskLog.id).all()
+
+        logs_by_task = {}
+        for task_id, note, status, timestamp, assignee_name in task_logs:
+            logs_by_task.setdefault(task_id, []).append((note, status, timestamp, assignee_name))
 
-        # Get logs for each task
         reported_issues = []
         for task in reported_tasks:
-            task_logs = TaskLog.query.filter(
-                TaskLog.task_id == task[0]  # task[0] is Task.id
-            ).order_by(TaskLog.timestamp.asc()).all()
-            
-            # Get user names for the task
-            task_creator = db.session.get(User, task[3]) if task[3] is not None else None
-            task_assignee = db.session.get(User, task[4]) if task[4] is not None else None
-            
-            # Convert task tuple to list and append logs
-            task_data = list(task)
-            task_data[3] = task_creator.username if task_creator else "Unknown"
-            task_data[4] = task_assignee.username if task_assignee else "Unassigned"
-            
-            # Get logs with user names
+            task_data = list(task[:-1])
+            task_creator = task_data[3]
+            # New logs name the task creator, other logs the assignee at that point
             task_data.append([
                 {
-                    'note': log.note,
-                    'status': log.status,
-                    'timestamp': log.timestamp.strftime('%Y-%m-%d %H:%M:%S'),
-                    'assigned_to': (task_creator.username if task_creator else "Unknown") 
-                        if log.status == 'new' 
-                        else (db.session.get(User, log.assigned_to).username if log.assigned_to is not None else "Unassigned")
-                } for log in task_logs
+                    'note': note,
+                    'status': status,
+                    'timestamp': timestamp.strftime('%Y-%m-%d %H:%M:%S'),
+                    'assigned_to': task_creator if status == 'new' else (assignee_name or "Unassigned")
+                } for note, status, timestamp, assignee_name in logs_by_task.get(task_data[0], [])
             ])
-            reported_issues.append(task_data)
+            reported_issues.append((task[-1], task_data))
+        return reported_issues
 
-        return {
-            'tasks_created_today': tasks_created_today,
-            'task_status_distribution': task_status_distribution,
-            'reported_issues': reported_issues
-        }
+    @staticmethod
+    def rebuild_daily_stats(batch_size=1000):
+        """Rebuild the daily statistics table from the tasks and their logs.
+
+        A task's initial status is taken from its first log, and status
+        changes between consecutive logs count as entered on the log's day.
+
+        Returns:
+            int: Number of statistics rows written
+        """
+        counts = {}
+        def add(day, status, column):
+            row = counts.setdefault((day, status), {'created_count': 0, 'current_count': 0, 'entered_count': 0})
+            row[column] += 1
+
+        rows = db.session.query(
+            Task.id, Task.status, Task.created_at, TaskLog.status, TaskLog.timestamp
+        ).outerjoin(
+            TaskLog, TaskLog.task_id == Task.id
+        ).order_by(Task.id, TaskLog.timestamp, TaskLog.id).yield_per(batch_size)
+
+        for _, task_rows in groupby(rows, key=lambda row: row[0]):
+            task_rows = list(task_rows)
+            _, status, created_at, first_status, _ = task_rows[0]
+            day = TaskDailyStats.day_of(created_at)
+            previous = first_status or status
+            add(day, previous, 'created_count')
+            add(day, status, 'current_count')
+            for _, _, _, log_status, timestamp in task_rows[1:]:
+                if log_status != previous:
+                    add(TaskDailyStats.day_of(timestamp), log_status, 'entered_count')
+                    previous = log_status
+
+        TaskDailyStats.query.delete()
+        if counts:
+            db.session.execute(db.insert(TaskDailyStats), [
+                {'day': day, 'status': status, **row} for (day, status), row in counts.items()
+            ])
+        db.session.commit()
+        return len(counts)
 
     @staticmethod
     def format_statistics_report(statistics, report_date=None):
@@ -140,45 +216,415 @@ class ReportService:
 
         return "\n".join(report)
 
+    # Separator line written before the report text in report files
+    FILE_HEADER = "-" * 40 + "\n"
+
+    # Plain text reports; machine-readable formats are in REPORT_FORMATS
+    TEXT_FORMAT = 'txt'
+
+    # Report catalog listing options
+    CATALOG_SORT_COLUMNS = {
+        'name': ReportFile.filename,
+        'date': ReportFile.report_date,
+        'size': ReportFile.size,
+        'modified': ReportFile.created_at
+    }
+    DEFAULT_CATALOG_PAGE_SIZE = 50
+    MAX_CATALOG_PAGE_SIZE = 500
+
+    # Dates in generated report file names: daily_task_report_<date>_... / range_task_report_<start>_<end>_...
+    FILENAME_DATES = re.compile(r'^(?:daily|range)_task_report_(\d{4}-\d{2}-\d{2})(?:_(\d{4}-\d{2}-\d{2}))?_')
+
+    # A directory modified this recently may change again within the same mtime tick
+    CATALOG_RACY_NS = 2 * 10**9
+
+    @staticmethod
+    def get_data_version():
+        """Hash the markers of all data a report is built from.
+
+        Any task change advances the change journal, and log or user changes
+        move their counts or latest IDs. Daily statistics can also be rebuilt
+        without a task change, so their row count, latest day and count totals
+        are included. An unchanged hash means an unchanged report.
+        """
+        log_count, last_log = db.session.query(db.func.count(TaskLog.id), db.func.max(TaskLog.id)).one()
+        user_count, last_user = db.session.query(db.func.count(User.id), db.func.max(User.id)).one()
+        stats = db.session.query(
+            db.func.count(),
+            db.func.max(TaskDailyStats.day),
+            db.func.sum(TaskDailyStats.created_count),
+            db.func.sum(TaskDailyStats.current_count),
+            db.func.sum(TaskDailyStats.entered_count)
+        ).select_from(TaskDailyStats).one()
+        markers = ":".join(str(marker) for marker in (
+            GlobalCounter.current_value(), log_count, last_log, user_count, last_user, *stats
+        ))
+        return hashlib.sha1(markers.encode('utf-8')).hexdigest()
+
+    @classmethod
+    def find_cached_report(cls, report_date, data_version, end_date=None, report_format=TEXT_FORMAT):
+        """Find a still valid report file for a date (or range), format and data version.
+
+        Manifest entries whose file has gone missing are dropped.
+
+        Returns:
+            ReportFile: Manifest entry, or None if the report must be generated
+        """
+        entry = ReportFile.query.filter_by(
+            report_date=report_date,
+            end_date=end_date,
+            format=report_format,
+            data_version=data_version
+        ).order_by(ReportFile.id.desc()).first()
+        if entry is None:
+            return None
+
+        if not os.path.isfile(os.path.join(cls.get_reports_dir(), entry.filename)):
+            db.session.delete(entry)
+            db.session.commit()
+            return None
+        cls.touch_report(entry.filename)
+        return entry
+
     @classmethod
-    def generate_report(cls, report_date=None):
+    def generate_report(cls, report_date=None, progress=None, report_format=TEXT_FORMAT):
         """Generate a report file from task statistics for specified date.
+
+        Reports are cached by date and data version: when a report was
+        already generated from the current data, its file is returned.
         
         Args:
             report_date (date, optional): The date to generate report for. Defaults to today.
+            progress (callable, optional): Called with the completed percentage after each step
+            report_format (str, optional): 'txt' or a machine-readable format from REPORT_FORMATS
             
         Returns:
-            tuple: (filename, report_text)
+            tuple: (filename, report_text), report_text is None for machine-readable formats
             
         Raises:
             AuthError: If report generation fails
         """
         try:
+            # Return the existing report if the data did not change
+            data_version = cls.get_data_version()
+            cached = cls.find_cached_report(report_date, data_version, report_format=report_format)
+            if cached is not None:
+                if report_format != cls.TEXT_FORMAT:
+                    return cached.filename, None
+                with open(os.path.join(cls.get_reports_dir(), cached.filename), "r", encoding="utf-8") as file:
+                    return cached.filename, file.read()[len(cls.FILE_HEADER):]
+
             # Get statistics for the specified date
+            if progress:
+                progress(10)
             statistics = cls.get_task_statistics(report_date)
                 
-            # Format the report
-            report_text = cls.format_statistics_report(statistics, report_date)
-            
             # Generate filename with current timestamp
             current_time = datetime.now()
-            filename = f"daily_task_report_{report_date.strftime('%Y-%m-%d')}_{current_time.strftime('%H-%M-%S')}.txt"
+            filename = (
+                f"daily_task_report_{report_date.strftime('%Y-%m-%d')}_{current_time.strftime('%H-%M-%S')}"
+                f".{cls.get_extension(report_format)}"
+            )
             
             # Get and validate reports directory
             reports_dir = cls.get_reports_dir()
-            
-            # Write report to file
             file_path = os.path.join(reports_dir, filename)
-            with open(file_path, "w", encoding="utf-8") as file:
-                file.write("-" * 40 + "\n")
-                file.write(report_text)
-                
+            if progress:
+                progress(60)
+
+            if report_format == cls.TEXT_FORMAT:
+                # Format the report and write it to file
+                report_text = cls.format_statistics_report(statistics, report_date)
+                with open(file_path, "w", encoding="utf-8") as file:
+                    file.write(cls.FILE_HEADER)
+                    file.write(report_text)
+            else:
+                report_text = None
+                with open(file_path, "w", encoding="utf-8", newline="") as file:
+                    file.write(REPORT_FORMATS[report_format].header())
+                    file.write(encode_day((statistics, report_date, report_format)))
+            if progress:
+                progress(90)
+
+            cls.record_report_file(filename, report_date, data_version, report_format=report_format)
+
             return filename, report_text
             
         except Exception as e:
+            db.session.rollback()
             current_app.logger.error(f"Error generating report: {str(e)}")
             raise AuthError(f"Failed to generate report: {str(e)}")
 
+    @classmethod
+    def get_range_statistics(cls, start_date, end_date):
+        """Get per-day statistics for a date range and totals over it.
+
+        Reads the daily statistics and the reported issues once for the whole
+        range and walks the days in a single pass, so the cost does not grow
+        with one query set per day.
+
+        Returns:
+            tuple: (list of (statistics, day) pairs, totals dict)
+        """
+        _, end_utc = cls.get_day_bounds(end_date)
+        issues = cls.get_reported_issues(end_utc)
+        rows = db.session.query(
+            TaskDailyStats.day,
+            TaskDailyStats.status,
+            TaskDailyStats.current_count,
+            TaskDailyStats.entered_count
+        ).filter(TaskDailyStats.day <= end_date).order_by(TaskDailyStats.day).all()
+
+        distribution = {}
+        totals = {'days': 0, 'tasks_created': 0, 'status_changes': {}, 'issue_days': 0}
+        days = []
+        row_index = 0
+        day = start_date
+        while day <= end_date:
+            # Fold in the rows up to this day; earlier rows only feed the distribution
+            tasks_created = 0
+            while row_index < len(rows) and rows[row_index][0] <= day:
+                row_day, status, current_count, entered_count = rows[row_index]
+                distribution[status] = distribution.get(status, 0) + current_count
+                if row_day == day:
+                    tasks_created += current_count
+                    totals['status_changes'][status] = totals['status_changes'].get(status, 0) + entered_count
+                row_index += 1
+
+            _, end_of_day_utc = cls.get_day_bounds(day)
+            reported_issues = [issue for created_at, issue in issues if _created_before(created_at, end_of_day_utc)]
+            days.append(({
+                'tasks_created_today': tasks_created,
+                'task_status_distribution': {status: count for status, count in sorted(distribution.items()) if count > 0},
+                'reported_issues': reported_issues
+            }, day))
+
+            totals['days'] += 1
+            totals['tasks_created'] += tasks_created
+            totals['issue_days'] += 1 if reported_issues else 0
+            day += timedelta(days=1)
+
+        totals['status_changes'] = {status: count for status, count in sorted(totals['status_changes'].items()) if count}
+        return days, totals
+
+    @staticmethod
+    def format_range_summary(totals, start_date, end_date):
+        """Format the cross-day totals written at the top of a range report."""
+        summary = [
+            f"Task Statistics ({start_date} to {end_date})",
+            "=" * 40,
+            f"Days: {totals['days']}",
+            f"Tasks Created: {totals['tasks_created']}",
+            "",
+            "Status Changes:",
+            *[f"  - {status}: {count}" for status, count in totals['status_changes'].items()],
+            *([] if totals['status_changes'] else ["  No status changes"]),
+            "",
+            f"Days With Reported Issues: {totals['issue_days']}",
+            "=" * 40
+        ]
+        return "\n".join(summary) + "\n"
+
+    @classmethod
+    def generate_range_report(cls, start_date, end_date, progress=None, report_format=TEXT_FORMAT):
+        """Generate one report file with a section per day of a date range.
+
+        Day sections are formatted inline, or in the report process pool when
+        REPORT_RANGE_PROCESSES is above 1, and written to the file in order as
+        they complete, so the report is never held in memory as one string.
+        Range reports are cached like daily reports. Machine-readable
+        formats start with the cross-day total records.
+
+        Returns:
+            tuple: (filename, file size in bytes)
+
+        Raises:
+            AuthError: If report generation fails
+        """
+        try:
+            data_version = cls.get_data_version()
+            cached = cls.find_cached_report(start_date, data_version, end_date, report_format)
+            if cached is not None:
+                return cached.filename, cached.size
+
+            if progress:
+                progress(5)
+            days, totals = cls.get_range_statistics(start_date, end_date)
+
+            filename = (
+                f"range_task_report_{start_date.strftime('%Y-%m-%d')}_{end_date.strftime('%Y-%m-%d')}"
+                f"_{datetime.now().strftime('%H-%M-%S')}.{cls.get_extension(report_format)}"
+            )
+            file_path = os.path.join(cls.get_reports_dir(), filename)
+            pool = current_app.extensions.get('report_pool') if len(days) > 1 else None
+
+            payloads = [(statistics, day, report_format) for statistics, day in days]
+
+            with open(file_path, "w", encoding="utf-8", newline="") as file:
+                if report_format == cls.TEXT_FORMAT:
+                    file.write(cls.FILE_HEADER)
+                    file.write(cls.format_range_summary(totals, start_date, end_date))
+                else:
+                    fmt = REPORT_FORMATS[report_format]
+                    file.write(fmt.header())
+                    file.write(fmt.encode(iter_total_records(totals, start_date, end_date)))
+
+                def write_sections(sections):
+                    for index, section in enumerate(sections, start=1):
+                        file.write(section)
+                        if progress:
+                            progress(10 + 85 * index // len(days))
+
+                if pool is not None:
+                    chunksize = max(1, len(days) // ((current_app.config.get('REPORT_RANGE_PROCESSES') or 1) * 4))
+                    write_sections(pool.map(_format_day_section, payloads, chunksize=chunksize))
+                else:
+                    write_sections(map(_format_day_section, payloads))
+
+            size = cls.record_report_file(filename, start_date, data_version, end_date, report_format)
+            return filename, size
+
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.error(f"Error generating range report: {str(e)}")
+            raise AuthError(f"Failed to generate report: {str(e)}")
+
+    @classmethod
+    def record_report_file(cls, filename, report_date, data_version, end_date=None, report_format=TEXT_FORMAT):
+        """Record a written report file in the manifest, replacing an entry for an overwritten file.
+
+        Returns:
+            int: File size in bytes
+        """
+        reports_dir = cls.get_reports_dir()
+        size = os.path.getsize(os.path.join(reports_dir, filename))
+        ReportFile.query.filter_by(filename=filename).delete()
+        db.session.add(ReportFile(
+            filename=filename,
+            report_date=report_date,
+            end_date=end_date,
+            format=report_format,
+            data_version=data_version,
+            size=size
+        ))
+        db.session.commit()
+        cls.mark_catalog_written(reports_dir)
+        return size
+
+    @classmethod
+    def parse_report_format(cls, value):
+        """Parse a report format, defaulting to plain text.
+
+        Raises:
+            AuthError: If the format is unknown (400)
+        """
+        if not value:
+            return cls.TEXT_FORMAT
+        if value != cls.TEXT_FORMAT and value not in REPORT_FORMATS:
+            formats = ", ".join([cls.TEXT_FORMAT, *REPORT_FORMATS])
+            raise AuthError(f"Invalid report format. Use one of: {formats}", 400)
+        return value
+
+    @classmethod
+    def get_extension(cls, report_format):
+        """Get the file extension of a report format."""
+        return "txt" if report_format == cls.TEXT_FORMAT else REPORT_FORMATS[report_format].extension
+
+    @staticmethod
+    def parse_report_date(date_str):
+        """Parse a YYYY-MM-DD report date, defaulting to today.
+
+        Raises:
+            AuthError: If the date is malformed or in the future (400)
+        """
+        today = date.today()
+        if not date_str:
+            return today
+        try:
+            report_date = datetime.strptime(date_str, '%Y-%m-%d').date()
+        except ValueError:
+            raise AuthError("Invalid date format. Please use YYYY-MM-DD format.", 400)
+        if report_date > today:
+            raise AuthError("Cannot generate report for future dates", 400)
+        return report_date
+
+    @classmethod
+    def parse_report_range(cls, start_str, end_str):
+        """Parse a start_date/end_date report range.
+
+        Returns:
+            tuple: (start date, end date)
+
+        Raises:
+            AuthError: If a date is missing, malformed or in the future, or the range is invalid (400)
+        """
+        if not start_str or not end_str:
+            raise AuthError("Both start_date and end_date are required for range reports", 400)
+        start_date = cls.parse_report_date(start_str)
+        end_date = cls.parse_report_date(end_str)
+        if start_date > end_date:
+            raise AuthError("start_date must not be after end_date", 400)
+        max_days = current_app.config.get('REPORT_RANGE_MAX_DAYS', 366)
+        if (end_date - start_date).days + 1 > max_days:
+            raise AuthError(f"Range reports cover at most {max_days} days", 400)
+        return start_date, end_date
+
+    @classmethod
+    def enqueue_report_job(cls, report_date, user_id, end_date=None, report_format=TEXT_FORMAT):
+        """Queue report generation on the background job queue.
+
+        With an end_date a range report from report_date to end_date is
+        generated. An unfinished job for the same dates is returned instead
+        of queuing another one.
+
+        Returns:
+            tuple: (job, whether a new job was created)
+
+        Raises:
+            AuthError: If too many report jobs are pending (429)
+        """
+        jobs = current_app.extensions['report_jobs']
+
+        def run(job):
+            def progress(percent):
+                jobs.set_progress(job, percent)
+            if end_date is None:
+                filename, _ = cls.generate_report(report_date, progress=progress, report_format=report_format)
+            else:
+                filename, _ = cls.generate_range_report(report_date, end_date, progress, report_format)
+            return {"filename": filename, "download_url": f"/api/reports/{filename}"}
+
+        def notify(job):
+            WebSocketService.notify_user(job.owner, 'report_job_completed', job.to_dict())
+
+        job, created = jobs.submit(
+            kind='report',
+            key=('report', report_date, end_date, report_format),
+            params={
+                **({"date": report_date.isoformat()} if end_date is None
+                   else {"start_date": report_date.isoformat(), "end_date": end_date.isoformat()}),
+                **({} if report_format == cls.TEXT_FORMAT else {"format": report_format})
+            },
+            run=run,
+            owner=user_id,
+            on_finish=notify
+        )
+        if job is None:
+            raise AuthError("Too many pending report jobs, try again later", 429)
+        return job, created
+
+    @staticmethod
+    def get_report_job(job_id):
+        """Get a report job by ID.
+
+        Raises:
+            AuthError: If the job is unknown or expired (404)
+        """
+        job = current_app.extensions['report_jobs'].get(job_id)
+        if job is None or job.kind != 'report':
+            raise AuthError(f"Report job '{job_id}' not found", 404)
+        return job
+
     @staticmethod
     def get_reports_dir():
         """Get and ensure reports directory exists.
@@ -197,34 +643,159 @@ class ReportService:
             raise AuthError(f"Cannot access reports directory: {str(e)}")
 
     @classmethod
-    def list_reports(cls):
-        """List all available reports with metadata.
-        
+    def list_reports(cls, args=None):
+        """List reports from the report catalog.
+
+        Args:
+            args: Request arguments with optional start_date/end_date (reports
+                overlapping the range), format, sort ('name', 'date', 'size' or
+                'modified'), order ('asc' or 'desc'), limit and offset
+
         Returns:
-            list: List of report file information
-            
+            tuple: (list of report file information, total number of matching reports)
+
+        Raises:
+            AuthError: If arguments are invalid or the reports directory cannot be accessed
+        """
+        args = args or {}
+        sort = args.get('sort', 'modified')
+        if sort not in cls.CATALOG_SORT_COLUMNS:
+            raise AuthError(f"Invalid sort. Allowed values are: {', '.join(cls.CATALOG_SORT_COLUMNS)}")
+        order = args.get('order', 'desc')
+        if order not in ('asc', 'desc'):
+            raise AuthError("Invalid order. Allowed values are: asc, desc")
+        try:
+            limit = int(args['limit']) if args.get('limit') else None
+            offset = max(int(args.get('offset', 0)), 0)
+        except ValueError:
+            raise AuthError("Invalid limit or offset: expected integer")
+        if limit is not None:
+            limit = max(1, min(limit, cls.MAX_CATALOG_PAGE_SIZE))
+        try:
+            start_date, end_date = (
+                datetime.strptime(args[name], '%Y-%m-%d').date() if args.get(name) else None
+                for name in ('start_date', 'end_date')
+            )
+        except ValueError:
+            raise AuthError("Invalid date format. Please use YYYY-MM-DD format.", 400)
+
+        cls.sync_catalog()
+
+        query = ReportFile.query
+        if start_date:
+            query = query.filter(func.coalesce(ReportFile.end_date, ReportFile.report_date) >= start_date)
+        if end_date:
+            query = query.filter(ReportFile.report_date <= end_date)
+        if args.get('format'):
+            query = query.filter(ReportFile.format == cls.parse_report_format(args['format']))
+
+        total = query.count()
+        column = cls.CATALOG_SORT_COLUMNS[sort]
+        if order == 'asc':
+            query = query.order_by(column.asc(), ReportFile.id.asc())
+        else:
+            query = query.order_by(column.desc(), ReportFile.id.desc())
+        if limit is not None:
+            query = query.limit(limit)
+        entries = query.offset(offset).all()
+        return [entry.to_dict() for entry in entries], total
+
+    @classmethod
+    def sync_catalog(cls, full=False):
+        """Reconcile the report catalog with files added or removed outside the service.
+
+        Generation and deletion keep the catalog current and move the scan
+        marker along, so the directory is only rescanned when its modification
+        time changed since (or was too recent to trust), costing one stat call
+        otherwise. Changes made by hand within the same modification time tick
+        as a service write are only found by a full rescan, which report
+        maintenance runs.
+
+        Args:
+            full: Rescan even if the directory looks unchanged
+
         Raises:
-            AuthError: If reports directory cannot be accessed
+            AuthError: If the reports directory cannot be accessed
         """
         reports_dir = cls.get_reports_dir()
-        
+        scans = current_app.extensions.setdefault('report_catalog_scans', {})
+        key = os.path.abspath(reports_dir)
         try:
-            files = []
-            for filename in os.listdir(reports_dir):
-                file_path = os.path.join(reports_dir, filename)
-                if os.path.isfile(file_path):
-                    files.append({
-                        "name": filename,
-                        "size": os.path.getsize(file_path),
-                        "modified_time": datetime.fromtimestamp(
-                            os.path.getmtime(file_path)
-                        ).strftime("%Y-%m-%d %H:%M:%S")
-                    })
-            return files
-            
-        except Exception as e:
+            mtime = os.stat(reports_dir).st_mtime_ns
+            if not full and scans.get(key) == (mtime, True):
+                return
+
+            scanned_at = time.time_ns()
+            files = {}
+            with os.scandir(reports_dir) as entries:
+                for entry in entries:
+                    if entry.is_file():
+                        files[entry.name] = entry.stat()
+        except OSError as e:
             raise AuthError(f"Error listing reports: {str(e)}")
 
+        for entry in ReportFile.query.all():
+            stat = files.pop(entry.filename, None)
+            if stat is None:
+                db.session.delete(entry)
+            elif stat.st_size != entry.size:
+                entry.size = stat.st_size
+                entry.created_at = datetime.fromtimestamp(stat.st_mtime, Config.SERVER_TIMEZONE)
+        for filename, stat in files.items():
+            report_date, end_date = cls.parse_filename_dates(filename)
+            db.session.add(ReportFile(
+                filename=filename,
+                report_date=report_date,
+                end_date=end_date,
+                format=cls.get_format(filename),
+                size=stat.st_size,
+                created_at=datetime.fromtimestamp(stat.st_mtime, Config.SERVER_TIMEZONE)
+            ))
+        db.session.commit()
+        scans[key] = (mtime, scanned_at - mtime > cls.CATALOG_RACY_NS)
+
+    @classmethod
+    def mark_catalog_written(cls, reports_dir):
+        """Move the scan marker past a change the service made to the directory and the catalog.
+
+        The directory keeps counting as scanned, or as in need of a scan, as it
+        did before the change.
+        """
+        scans = current_app.extensions.get('report_catalog_scans', {})
+        key = os.path.abspath(reports_dir)
+        if key in scans:
+            try:
+                scans[key] = (os.stat(reports_dir).st_mtime_ns, scans[key][1])
+            except OSError:
+                scans.pop(key, None)
+
+    @classmethod
+    def parse_filename_dates(cls, filename):
+        """Get the report date and range end date encoded in a report file name.
+
+        Returns:
+            tuple: (report date or None, end date or None)
+        """
+        match = cls.FILENAME_DATES.match(filename)
+        if not match:
+            return None, None
+        try:
+            return tuple(
+                datetime.strptime(value, '%Y-%m-%d').date() if value else None
+                for value in match.groups()
+            )
+        except ValueError:
+            return None, None
+
+    @classmethod
+    def get_format(cls, filename):
+        """Get the report format of a file from its extension (the extension itself if unknown)."""
+        for fmt in sorted(REPORT_FORMATS.values(), key=lambda fmt: -len(fmt.extension)):
+            if filename.endswith('.' + fmt.extension):
+                return fmt.name
+        extension = os.path.splitext(filename)[1].lstrip('.')
+        return (extension or cls.TEXT_FORMAT)[:20]
+
     @classmethod
     def get_report_file(cls, filename):
         """Get a specific report file path.
@@ -246,11 +817,136 @@ class ReportService:
             
         return file_path
 
+    @staticmethod
+    def touch_report(filename):
+        """Record an access to a report, keeping it from least recently used eviction."""
+        ReportFile.query.filter_by(filename=filename).update(
+            {'accessed_at': datetime.now(Config.SERVER_TIMEZONE)}
+        )
+        db.session.commit()
+
+    @classmethod
+    def pregenerate_reports(cls, report_date=None, formats=None):
+        """Generate the reports of a past day ahead of demand.
+
+        Args:
+            report_date (date, optional): Day to generate. Defaults to yesterday.
+            formats (list, optional): Report formats. Defaults to REPORT_PREGENERATE_FORMATS.
+
+        Returns:
+            list: Generated (or already cached) report file names
+        """
+        if report_date is None:
+            report_date = datetime.now(Config.SERVER_TIMEZONE).date() - timedelta(days=1)
+        if formats is None:
+            formats = current_app.config.get('REPORT_PREGENERATE_FORMATS', [cls.TEXT_FORMAT])
+        return [cls.generate_report(report_date, report_format=report_format)[0] for report_format in formats]
+
+    @classmethod
+    def enforce_retention(cls, max_age_days=None, max_bytes=None):
+        """Delete old reports, then least recently used ones until the total size fits.
+
+        Args:
+            max_age_days (int, optional): Delete reports written longer ago.
+                Defaults to REPORT_RETENTION_DAYS; 0 keeps reports of any age.
+            max_bytes (int, optional): Largest total size of all reports.
+                Defaults to REPORT_RETENTION_MAX_BYTES; 0 for no limit.
+
+        Returns:
+            list: Names of the deleted report files
+        """
+        if max_age_days is None:
+            max_age_days = current_app.config.get('REPORT_RETENTION_DAYS', 0)
+        if max_bytes is None:
+            max_bytes = current_app.config.get('REPORT_RETENTION_MAX_BYTES', 0)
+        cls.sync_catalog(full=True)
+
+        expired = []
+        if max_age_days:
+            cutoff = datetime.now(Config.SERVER_TIMEZONE) - timedelta(days=max_age_days)
+            expired = ReportFile.query.filter(ReportFile.created_at < cutoff).all()
+        if max_bytes:
+            total = (db.session.query(func.sum(ReportFile.size)).scalar() or 0) - sum(entry.size for entry in expired)
+            if total > max_bytes:
+                expired_ids = {entry.id for entry in expired}
+                candidates = ReportFile.query.order_by(
+                    func.coalesce(ReportFile.accessed_at, ReportFile.created_at).asc(), ReportFile.id.asc()
+                )
+                for entry in candidates:
+                    if total <= max_bytes:
+                        break
+                    if entry.id not in expired_ids:
+                        expired.append(entry)
+                        total -= entry.size
+
+        reports_dir = cls.get_reports_dir()
+        deleted = []
+        for entry in expired:
+            try:
+                os.remove(os.path.join(reports_dir, entry.filename))
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                current_app.logger.error(f"Failed to delete report file '{entry.filename}': {e}")
+                continue
+            db.session.delete(entry)
+            deleted.append(entry.filename)
+        db.session.commit()
+        cls.mark_catalog_written(reports_dir)
+        return deleted
+
+    @classmethod
+    def run_report_maintenance(cls):
+        """Pre-generate yesterday's reports and enforce report retention.
+
+        Returns:
+            tuple: (generated report file names, deleted report file names)
+        """
+        generated = cls.pregenerate_reports()
+        deleted = cls.enforce_retention()
+        current_app.logger.info(f"Report maintenance generated {len(generated)} and deleted {len(deleted)} reports")
+        return generated, deleted
+
+    @staticmethod
+    def seconds_until(time_of_day, now=None):
+        """Get the seconds until the next occurrence of a local HH:MM time of day."""
+        if now is None:
+            now = datetime.now(Config.SERVER_TIMEZONE)
+        hour, minute = (int(part) for part in time_of_day.split(':'))
+        target = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        if target <= now:
+            target += timedelta(days=1)
+        return (target - now).total_seconds()
+
     @classmethod
     def delete_report(cls, filename):
         """Delete a specific report file."""
         try:
             file_path = cls.get_report_file(filename)
             os.remove(file_path)
+            ReportFile.query.filter_by(filename=filename).delete()
+            db.session.commit()
+            cls.mark_catalog_written(os.path.dirname(file_path))
         except Exception as e:
-            raise AuthError(f"Error deleting report file '{filename}': {str(e)}")
\ No newline at end of file
+            raise AuthError(f"Error deleting report file '{filename}': {str(e)}")
+
+
+def _created_before(created_at, bound):
+    """Compare a task creation time with a UTC bound the way the database does.
+
+    SQLite returns naive timestamps and compares them with the bound's wall
+    clock time, so naive values are compared against the naive bound.
+    """
+    if created_at is None:
+        return False
+    if created_at.tzinfo is None:
+        bound = bound.replace(tzinfo=None)
+    return created_at <= bound
+
+
+def _format_day_section(payload):
+    """Format one day of a range report; runs in the report process pool."""
+    statistics, day, report_format = payload
+    if report_format != ReportService.TEXT_FORMAT:
+        return encode_day(payload)
+    return ReportService.format_statistics_report(statistics, day) + "\n" + "=" * 40 + "\n"
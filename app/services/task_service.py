@@ -1,11 +1,43 @@
 from flask import jsonify, current_app
-from app.models import db, Task, TaskLog, User, TaskStatus
+from app.models import db, Task, TaskLog, User, TaskStatus, TaskChange, GlobalCounter, PendingTaskChange
 from app.utils.response import AuthError, NotFoundError
+from app.services.websocket_service import WebSocketService
+from app.utils.geo import covering_prefixes, bounding_box, haversine_many, tile_bounds, encode_geohash
+from sqlalchemy import and_, or_, update
 from datetime import datetime
+import base64
+import hashlib
+import json
+from config import Config
 
 class TaskService:
     """Service class for task-related operations."""
     
+    # Keyset pagination settings; 'updated_at' orders by last change
+    SORT_COLUMNS = {
+        'id': Task.id,
+        'updated_at': Task.change_version
+    }
+    FILTER_ARGS = ('status', 'assigned_to', 'created_by', 'created_after', 'created_before', 'scope')
+
+    # Scoped views; 'mine' covers created, assigned and historically assigned tasks
+    SCOPES = ('mine', 'open')
+    OPEN_STATUSES = (TaskStatus.NEW, TaskStatus.IN_PROGRESS, TaskStatus.ISSUE_REPORTED)
+    DEFAULT_PAGE_SIZE = 100
+    MAX_PAGE_SIZE = 500
+
+    # Nearby search settings
+    DEFAULT_NEARBY_RADIUS_M = 1000
+    MAX_NEARBY_RADIUS_M = 50000
+    DEFAULT_NEARBY_LIMIT = 20
+
+    # Map tile settings
+    MAX_TILE_ZOOM = 22
+
+    # Change feed page sizes
+    DEFAULT_CHANGES_LIMIT = 500
+    MAX_CHANGES_LIMIT = 5000
+    
     @staticmethod
     def validate_location(location):
         """Validate location data."""
@@ -105,12 +137,14 @@ class TaskService:
 
             # Commit all changes
             db.session.commit()
-            return task
 
         except Exception as e:
             db.session.rollback()
             raise e 
 
+        cls.publish_task_change(task.id)
+        return task
+
     @staticmethod
     def update_task(task_id, data, current_user):
         """Update task based on user role and permissions."""
@@ -194,12 +228,521 @@ class TaskService:
             db.session.add(task_log)
             db.session.commit()
 
-            return task
-
         except (ValueError, AuthError, NotFoundError) as e:  
             db.session.rollback()
             raise e
         except Exception as e:
             db.session.rollback()
             current_app.logger.error(f"Error updating task: {str(e)}")
-            raise e 
\ No newline at end of file
+            raise e
+
+        TaskService.publish_task_change(task.id)
+        return task
+
+    @staticmethod
+    def cached_version():
+        """Get the global task version from the shared version oracle.
+
+        Falls back to the change journal when the app has no oracle, i.e.
+        when no ``VERSION_ORACLE_PATH`` is configured.
+        """
+        oracle = current_app.extensions.get('version_oracle')
+        if oracle is None:
+            return GlobalCounter.current_value()
+        return oracle.current(GlobalCounter.current_value)
+
+    @staticmethod
+    def can_sync_delta(client_version, current_version, max_lag=None, floor=None):
+        """Check whether a client version is recent enough for a delta sync.
+
+        Clients that never synced (version 0), fell further behind than the
+        allowed lag or the compacted part of the change journal, or hold a
+        version ahead of the server (journal reset) need a full snapshot instead.
+        """
+        if max_lag is None:
+            max_lag = current_app.config.get('SYNC_DELTA_MAX_LAG', Config.SYNC_DELTA_MAX_LAG)
+        if floor is None:
+            floor = GlobalCounter.floor_value()
+        return (
+            max(floor, 0) < client_version <= current_version
+            and current_version - client_version <= max_lag
+        )
+
+    @staticmethod
+    def query_changes_since(client_version, current_version):
+        """Query tasks changed and deleted after the client's version.
+
+        Args:
+            client_version: Last version the client synced
+            current_version: Current global task version
+
+        Returns:
+            tuple: (query of changed tasks, query of delete entries in the change journal)
+        """
+        tasks = Task.with_users().filter(
+            Task.change_version > client_version,
+            Task.change_version <= current_version
+        ).order_by(Task.change_version.asc())
+        tombstones = TaskChange.query.filter(
+            TaskChange.op == TaskChange.DELETE,
+            TaskChange.seq > client_version,
+            TaskChange.seq <= current_version
+        ).order_by(TaskChange.seq.asc())
+        return tasks, tombstones
+
+    @classmethod
+    def list_changes(cls, after, limit=None):
+        """Get a page of the change journal after a sequence number.
+
+        Args:
+            after: Last sequence number the client has seen
+            limit: Maximum number of entries to return
+
+        Returns:
+            dict: Changes, the sequence number to resume after, and whether more entries follow
+
+        Raises:
+            AuthError: If entries after ``after`` were already compacted away (410)
+        """
+        if limit is None:
+            limit = cls.DEFAULT_CHANGES_LIMIT
+        if not 1 <= limit <= cls.MAX_CHANGES_LIMIT:
+            raise AuthError(f"limit must be between 1 and {cls.MAX_CHANGES_LIMIT}", 400)
+        if after < GlobalCounter.floor_value():
+            raise AuthError("Changes after this sequence number were compacted, resync the full task list", 410)
+
+        current_version = GlobalCounter.current_value()
+        changes = TaskChange.query.filter(
+            TaskChange.seq > after,
+            TaskChange.seq <= current_version
+        ).order_by(TaskChange.seq.asc()).limit(limit + 1).all()
+        has_more = len(changes) > limit
+        changes = changes[:limit]
+        return {
+            "changes": [change.to_dict() for change in changes],
+            "next_after": changes[-1].seq if has_more else max(after, current_version),
+            "has_more": has_more,
+            "version": current_version
+        }
+
+    @staticmethod
+    def compact_change_journal(retention=None):
+        """Compact the change journal.
+
+        Entries superseded by a newer entry for the same task are dropped,
+        since only the latest change of a task matters to syncing clients.
+        Delete entries older than ``retention`` versions are dropped too,
+        raising the journal floor; clients behind it must resync in full.
+        The latest entry is always kept so the global version never moves back.
+        Expired pending writer registrations are removed as well.
+
+        Returns:
+            int: Number of entries removed
+        """
+        if retention is None:
+            retention = current_app.config.get('SYNC_DELTA_MAX_LAG', Config.SYNC_DELTA_MAX_LAG)
+        PendingTaskChange.prune()
+        current_version = GlobalCounter.current_value()
+        if not current_version:
+            db.session.commit()
+            return 0
+
+        newer = db.aliased(TaskChange)
+        superseded = db.session.query(newer.seq).filter(
+            newer.task_id == TaskChange.task_id,
+            newer.seq > TaskChange.seq
+        ).exists()
+        removed = TaskChange.query.filter(
+            TaskChange.seq < current_version,
+            superseded
+        ).delete(synchronize_session=False)
+
+        expired = TaskChange.query.filter(
+            TaskChange.op == TaskChange.DELETE,
+            TaskChange.seq < min(current_version - retention, current_version)
+        )
+        floor = expired.with_entities(db.func.max(TaskChange.seq)).scalar()
+        if floor is not None:
+            removed += expired.delete(synchronize_session=False)
+            counter = GlobalCounter.query.first()
+            if counter is None:
+                counter = GlobalCounter(task_counter=0)
+                db.session.add(counter)
+            counter.journal_floor = max(counter.journal_floor or 0, floor)
+        db.session.commit()
+        return removed
+
+    @staticmethod
+    def iter_task_dicts(query, global_version, batch_size=500):
+        """Serialize tasks from a query in batches of batch_size rows.
+
+        Rows are fetched with ``yield_per`` so only one batch is held in
+        memory at a time.
+        """
+        for task in query.yield_per(batch_size):
+            yield task.to_dict(global_version=global_version)
+
+    @staticmethod
+    def serialize_task(task_id, global_version=None):
+        """Serialize a single task with its users loaded in one query.
+
+        Returns:
+            dict: Task data, or None if the task does not exist
+        """
+        task = Task.with_users().filter(Task.id == task_id).first()
+        if not task:
+            return None
+        return Task.serialize_many([task], global_version)[0]
+
+    @staticmethod
+    def get_task_logs(task_id):
+        """Get task logs, most recent first, with their users loaded in one query."""
+        return TaskLog.with_users().filter(
+            TaskLog.task_id == task_id
+        ).order_by(TaskLog.timestamp.desc()).all()
+
+    @staticmethod
+    def parse_datetime(value, name):
+        """Parse an ISO 8601 query parameter, assuming server time when naive."""
+        try:
+            parsed = datetime.fromisoformat(value)
+        except (TypeError, ValueError):
+            raise AuthError(f"Invalid {name}: expected ISO 8601 datetime")
+        if parsed.tzinfo is None:
+            return Config.SERVER_TIMEZONE.localize(parsed)
+        # Stored timestamps are server-local wall clock times
+        return parsed.astimezone(Config.SERVER_TIMEZONE)
+
+    @staticmethod
+    def encode_cursor(sort_value, task_id):
+        """Encode the position after the last returned task as an opaque cursor."""
+        raw = json.dumps([sort_value, task_id]).encode('utf-8')
+        return base64.urlsafe_b64encode(raw).decode('ascii')
+
+    @staticmethod
+    def decode_cursor(cursor):
+        """Decode a cursor into (sort value, task ID)."""
+        try:
+            sort_value, task_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+            return int(sort_value), int(task_id)
+        except (ValueError, TypeError):
+            raise AuthError("Invalid cursor")
+
+    @classmethod
+    def parse_scopes(cls, value):
+        """Parse a comma separated scope argument; 'all' or empty means no scope."""
+        scopes = sorted({scope.strip() for scope in (value or '').split(',') if scope.strip()} - {'all'})
+        invalid = [scope for scope in scopes if scope not in cls.SCOPES]
+        if invalid:
+            raise AuthError(f"Invalid scope. Allowed values are: all, {', '.join(cls.SCOPES)}")
+        return scopes
+
+    @classmethod
+    def scope_criteria(cls, scopes, user_id):
+        """Build filter criteria for scopes, combined with AND.
+
+        The 'mine' scope matches historical assignees through TaskLog, since
+        every assignment is logged, so it stays an indexed lookup instead of
+        a scan of the historical_assignees JSON column.
+        """
+        criteria = []
+        if 'mine' in scopes:
+            assigned_before = db.session.query(TaskLog.task_id).filter(TaskLog.assigned_to == user_id)
+            criteria.append(or_(
+                Task.created_by == user_id,
+                Task.assigned_to == user_id,
+                Task.id.in_(assigned_before)
+            ))
+        if 'open' in scopes:
+            criteria.append(Task.status.in_([status.value for status in cls.OPEN_STATUSES]))
+        return criteria
+
+    @classmethod
+    def scope_version(cls, scopes, user_id):
+        """Get the version token of a scoped view.
+
+        The token combines the highest change version and the number of
+        tasks in scope: any change inside the scope raises the maximum, and
+        tasks leaving the scope (or being deleted) lower the count, while
+        changes to unrelated tasks leave the token untouched.
+        """
+        max_version, count = db.session.query(
+            db.func.max(Task.change_version), db.func.count(Task.id)
+        ).filter(*cls.scope_criteria(scopes, user_id)).one()
+        return f"{max_version or 0}.{count}"
+
+    @classmethod
+    def filter_tasks(cls, query, args, user_id=None):
+        """Apply list filters from request arguments to a task query.
+
+        Supported filters: status (comma separated), assigned_to, created_by,
+        created_after, created_before and scope (requires user_id).
+        """
+        scopes = cls.parse_scopes(args.get('scope'))
+        if scopes:
+            query = query.filter(*cls.scope_criteria(scopes, user_id))
+
+        status = args.get('status')
+        if status:
+            statuses = [value.strip() for value in status.split(',') if value.strip()]
+            query = query.filter(Task.status.in_(statuses))
+
+        for name, column in (('assigned_to', Task.assigned_to), ('created_by', Task.created_by)):
+            value = args.get(name)
+            if value is not None:
+                try:
+                    query = query.filter(column == int(value))
+                except ValueError:
+                    raise AuthError(f"Invalid {name}: expected integer user ID")
+
+        if args.get('created_after'):
+            query = query.filter(Task.created_at >= cls.parse_datetime(args['created_after'], 'created_after'))
+        if args.get('created_before'):
+            query = query.filter(Task.created_at < cls.parse_datetime(args['created_before'], 'created_before'))
+        return query
+
+    @classmethod
+    def list_tasks_page(cls, args, user_id=None):
+        """Get one page of tasks using keyset pagination.
+
+        Args:
+            args: Request arguments with filters plus sort ('id' or
+                'updated_at'), order ('asc' or 'desc'), limit and cursor
+
+        Returns:
+            tuple: (tasks, next cursor or None when there are no more pages)
+        """
+        sort = args.get('sort', 'id')
+        if sort not in cls.SORT_COLUMNS:
+            raise AuthError(f"Invalid sort. Allowed values are: {', '.join(cls.SORT_COLUMNS)}")
+        order = args.get('order', 'asc')
+        if order not in ('asc', 'desc'):
+            raise AuthError("Invalid order. Allowed values are: asc, desc")
+        try:
+            limit = int(args.get('limit', cls.DEFAULT_PAGE_SIZE))
+        except ValueError:
+            raise AuthError("Invalid limit: expected integer")
+        limit = max(1, min(limit, cls.MAX_PAGE_SIZE))
+
+        column = cls.SORT_COLUMNS[sort]
+        query = cls.filter_tasks(Task.with_users(), args, user_id)
+
+        if args.get('cursor'):
+            sort_value, last_id = cls.decode_cursor(args['cursor'])
+            if column is Task.id:
+                condition = Task.id > last_id if order == 'asc' else Task.id < last_id
+            elif order == 'asc':
+                condition = or_(column > sort_value, and_(column == sort_value, Task.id > last_id))
+            else:
+                condition = or_(column < sort_value, and_(column == sort_value, Task.id < last_id))
+            query = query.filter(condition)
+
+        if order == 'asc':
+            query = query.order_by(column.asc(), Task.id.asc())
+        else:
+            query = query.order_by(column.desc(), Task.id.desc())
+
+        tasks = query.limit(limit + 1).all()
+        next_cursor = None
+        if len(tasks) > limit:
+            tasks = tasks[:limit]
+            last = tasks[-1]
+            next_cursor = cls.encode_cursor(getattr(last, column.key), last.id)
+        return tasks, next_cursor
+
+    @classmethod
+    def find_nearby(cls, args):
+        """Find tasks within a radius, closest first.
+
+        Candidates are selected through the geohash index (plus a latitude
+        range on idx_task_location), then ranked by exact haversine distance
+        computed over plain (id, lat, lon) rows before any task is loaded.
+        Tasks without a geohash yet (created before the column existed) are
+        found through the latitude range until backfill_geohashes has run.
+
+        Args:
+            args: Request arguments with lat, lon and optional radius_m,
+                status (comma separated) and limit
+
+        Returns:
+            list: (task, distance in meters) tuples sorted by distance
+        """
+        try:
+            lat = float(args['lat'])
+            lon = float(args['lon'])
+            radius_m = float(args.get('radius_m', cls.DEFAULT_NEARBY_RADIUS_M))
+            limit = int(args.get('limit', cls.DEFAULT_NEARBY_LIMIT))
+            Task.validate_location(lat, lon)
+        except KeyError:
+            raise AuthError("Missing required parameters: lat, lon")
+        except (ValueError, TypeError):
+            raise AuthError("Invalid nearby search parameters")
+        if not 0 < radius_m <= cls.MAX_NEARBY_RADIUS_M:
+            raise AuthError(f"radius_m must be between 0 and {cls.MAX_NEARBY_RADIUS_M}")
+        limit = max(1, min(limit, cls.MAX_PAGE_SIZE))
+
+        query = db.session.query(Task.id, Task.location_lat, Task.location_lon)
+        prefixes = covering_prefixes(lat, lon, radius_m)
+        if prefixes:
+            # Prefix matches as index range scans: every geohash starting with
+            # the prefix sorts between the prefix and prefix + '~'
+            query = query.filter(or_(*[
+                and_(Task.geohash >= prefix, Task.geohash < prefix + '~') for prefix in prefixes
+            ], Task.geohash.is_(None)))
+        min_lat, max_lat, _ = bounding_box(lat, lon, radius_m)
+        query = query.filter(Task.location_lat.between(min_lat, max_lat))
+
+        status = args.get('status')
+        if status:
+            query = query.filter(Task.status.in_([value.strip() for value in status.split(',') if value.strip()]))
+
+        candidates = query.all()
+        distances = haversine_many(lat, lon, [(row[1], row[2]) for row in candidates])
+        ranked = sorted(
+            (distance, row[0]) for distance, row in zip(distances, candidates) if distance <= radius_m
+        )[:limit]
+        if not ranked:
+            return []
+
+        tasks = {task.id: task for task in Task.with_users().filter(Task.id.in_([task_id for _, task_id in ranked]))}
+        return [(tasks[task_id], distance) for distance, task_id in ranked if task_id in tasks]
+
+    @staticmethod
+    def backfill_geohashes(batch_size=1000):
+        """Set the geohash of tasks stored before it was maintained.
+
+        Uses bulk updates, which leave the change journal and task versions
+        untouched since the task data itself does not change.
+
+        Returns:
+            int: Number of tasks updated
+        """
+        updated = 0
+        last_id = 0
+        while True:
+            rows = db.session.query(Task.id, Task.location_lat, Task.location_lon).filter(
+                Task.id > last_id,
+                Task.geohash.is_(None),
+                Task.location_lat.isnot(None),
+                Task.location_lon.isnot(None)
+            ).order_by(Task.id).limit(batch_size).all()
+            if not rows:
+                return updated
+            db.session.execute(update(Task), [
+                {'id': task_id, 'geohash': encode_geohash(lat, lon)} for task_id, lat, lon in rows
+            ])
+            db.session.commit()
+            updated += len(rows)
+            last_id = rows[-1][0]
+
+    @classmethod
+    def get_tile_clusters(cls, z, x, y, status=None, grid_size=8):
+        """Cluster the tasks inside a Web Mercator map tile.
+
+        The tile is split into grid_size x grid_size cells of equal degree
+        size and tasks are counted per cell in a single grouped query over
+        the (lat, lon) index, so no task rows are loaded.
+
+        Args:
+            z, x, y: Tile coordinates
+            status: Optional comma separated status filter
+            grid_size: Number of cells per tile side
+
+        Returns:
+            list: Cell dictionaries with count, mean location and a representative task ID
+        """
+        if not 0 <= z <= cls.MAX_TILE_ZOOM or not (0 <= x < 2 ** z and 0 <= y < 2 ** z):
+            raise AuthError("Invalid tile coordinates", 400)
+
+        west, south, east, north = tile_bounds(z, x, y)
+        cell_lon = (east - west) / grid_size
+        cell_lat = (north - south) / grid_size
+
+        # Half-open bounds so a task on a shared edge belongs to one tile only
+        last_column = x == 2 ** z - 1
+        last_row = y == 2 ** z - 1
+        lon_filter = Task.location_lon <= east if last_column else Task.location_lon < east
+        lat_filter = Task.location_lat >= south if last_row else Task.location_lat > south
+
+        cell_x = cls._clamp_cell(db.cast((Task.location_lon - west) / cell_lon, db.Integer), grid_size)
+        cell_y = cls._clamp_cell(db.cast((north - Task.location_lat) / cell_lat, db.Integer), grid_size)
+        query = db.session.query(
+            cell_x.label('cell_x'),
+            cell_y.label('cell_y'),
+            db.func.count(Task.id),
+            db.func.avg(Task.location_lat),
+            db.func.avg(Task.location_lon),
+            db.func.min(Task.id)
+        ).filter(
+            Task.location_lon >= west, lon_filter,
+            Task.location_lat <= north, lat_filter
+        )
+        if status:
+            query = query.filter(Task.status.in_([value.strip() for value in status.split(',') if value.strip()]))
+
+        rows = query.group_by('cell_x', 'cell_y').order_by('cell_y', 'cell_x').all()
+        return [
+            {
+                'cell': [row[0], row[1]],
+                'count': row[2],
+                'location': {'latitude': row[3], 'longitude': row[4]},
+                'task_id': row[5]
+            } for row in rows
+        ]
+
+    @staticmethod
+    def _clamp_cell(cell, grid_size):
+        """Clamp a cell index expression to the grid, so tasks on the far tile edge fall in the last cell.
+
+        Uses CASE rather than the two-argument MIN, which only SQLite supports.
+        """
+        return db.case((cell > grid_size - 1, grid_size - 1), else_=cell)
+
+    @staticmethod
+    def get_task_stamp(task_id):
+        """Get the change markers of a task and its logs in one query.
+
+        Reads only indexed columns so conditional requests can be answered
+        without loading the task.
+
+        Returns:
+            tuple: (change_version, log count, latest log ID), or None if the task does not exist
+        """
+        log_count = db.session.query(db.func.count(TaskLog.id)).filter(
+            TaskLog.task_id == task_id
+        ).scalar_subquery()
+        last_log = db.session.query(db.func.max(TaskLog.id)).filter(
+            TaskLog.task_id == task_id
+        ).scalar_subquery()
+        row = db.session.query(Task.change_version, log_count, last_log).filter(Task.id == task_id).first()
+        return tuple(row) if row else None
+
+    @staticmethod
+    def list_etag(current_version, args, streaming=False, user_id=None):
+        """Build the ETag of a task list for a version and its request arguments.
+
+        Scoped lists pass their scope version and the user they belong to.
+        """
+        digest = hashlib.sha1(
+            json.dumps([sorted(args.items(multi=True)), streaming, user_id]).encode('utf-8')
+        ).hexdigest()[:16]
+        return f"tasks-{current_version}-{digest}"
+
+    @staticmethod
+    def publish_task_change(task_id):
+        """Push a committed task change to clients subscribed to task_changed events.
+
+        Errors are logged rather than raised, since the change is already saved;
+        clients missing the event catch up through the change feed.
+        """
+        try:
+            task = Task.with_users().filter(Task.id == task_id).first()
+            if task is None:
+                return
+            WebSocketService.broadcast_task_change(
+                version=task.change_version,
+                task=Task.serialize_many([task])[0]
+            )
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.error(f"Failed to publish change of task {task_id}: {str(e)}")
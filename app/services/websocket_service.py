@@ -1,13 +1,20 @@
 from flask_socketio import emit, join_room, leave_room, disconnect
 from flask_jwt_extended import decode_token
-from flask import request
-from app.models import GlobalCounter
+from flask import request, current_app
+from sqlalchemy.exc import IntegrityError
+from app.models import GlobalCounter, User, NotificationLog
+from app import db, socketio
+from app.utils.session_registry import SessionRegistry
 
 class WebSocketService:
     """Service class for WebSocket operations."""
     
     TASK_UPDATES_ROOM = 'task_updates'
-    user_sessions = {}  # Store user_id and request.sid mapping
+    TASK_CHANGES_ROOM = 'task_changes'  # Clients receiving structured task_changed events
+    USER_ROOM_PREFIX = 'user:'  # Room of every connection of one user
+    ROLE_ROOM_PREFIX = 'role:'  # Room of every connection of users with one role
+    sessions = SessionRegistry()  # Connected sessions by sid and by user
+    NOTIFICATION_STORE_ATTEMPTS = 3  # Tries at storing a notification while other workers take the same numbers
     
     @classmethod
     def handle_connect(cls, auth):
@@ -31,14 +38,27 @@ class WebSocketService:
             # Join the global task updates room
             join_room(cls.TASK_UPDATES_ROOM)
             
-            # Update user session
-            if user_identity not in cls.user_sessions:
-                cls.user_sessions[user_identity] = []
-            cls.user_sessions[user_identity].append(request.sid)
+            # Register the session with the user's role
+            user = db.session.get(User, int(user_identity))
+            role = user.role if user else None
+            session = cls.sessions.add(request.sid, user_identity, role)
+            cls.publish_presence('add', session)
+
+            # Join the rooms notifications are addressed to
+            rooms = [cls.user_room(user_identity)]
+            if role and current_app.config.get('WEBSOCKET_ROLE_ROOMS', True):
+                rooms.append(cls.role_room(role))
+            for room in rooms:
+                join_room(room)
+
+            # Replay notifications missed since the client's last acknowledged sequence number
+            last_seq = auth.get("last_seq")
+            if last_seq is not None:
+                emit("task_notification_replay", cls.replay_notifications(user_identity, last_seq), to=request.sid)
             
             print(f"Authenticated user: {user_identity}")
-            print(f"Joined room: {cls.TASK_UPDATES_ROOM}")
-            print(f"User sessions: {cls.user_sessions}")
+            print(f"Joined rooms: {', '.join([cls.TASK_UPDATES_ROOM, *rooms])}")
+            print(f"Active sessions: {len(cls.sessions)} ({cls.sessions.user_count()} users)")
             print("=" * 50 + "\n")
             
             return True
@@ -55,20 +75,41 @@ class WebSocketService:
         """Handle WebSocket disconnection."""
         print("\n" + "=" * 50)
         print("【WebSocket Disconnect】")
-        # Remove disconnected session from user_sessions
-        for user_id, sids in list(cls.user_sessions.items()):
-            if request.sid in sids:
-                sids.remove(request.sid)
-                if not sids:  # If the list is empty, remove the entire key
-                    del cls.user_sessions[user_id]
-                break
+        # Remove disconnected session from the registry
+        session = cls.sessions.remove(request.sid)
+        if session is not None:
+            cls.publish_presence('remove', session)
         
         leave_room(cls.TASK_UPDATES_ROOM)
         print(f"Left room: {cls.TASK_UPDATES_ROOM}")
-        print(f"User sessions after disconnect: {cls.user_sessions}")
+        print(f"Active sessions after disconnect: {len(cls.sessions)}")
         print("=" * 50 + "\n")
     
 
+    @classmethod
+    def user_room(cls, user_id):
+        """Get the room joined by every connection of a user."""
+        return f"{cls.USER_ROOM_PREFIX}{user_id}"
+
+    @classmethod
+    def role_room(cls, role):
+        """Get the room joined by every connection of users with a role."""
+        return f"{cls.ROLE_ROOM_PREFIX}{role}"
+
+    @classmethod
+    def attach_cluster(cls):
+        """Share the session registry with other servers when a message queue is configured."""
+        manager = socketio.server.manager
+        if hasattr(manager, 'attach_registry'):
+            manager.attach_registry(cls.sessions)
+
+    @staticmethod
+    def publish_presence(op, session):
+        """Announce a local session change to other servers, if any."""
+        manager = socketio.server.manager
+        if hasattr(manager, 'publish_presence'):
+            manager.publish_presence(op, session)
+
     @classmethod
     def send_notification_to_users(cls, user_ids, notification_type, message):
         """Send a notification to specific users.
@@ -83,24 +124,179 @@ class WebSocketService:
         print(f"Target users: {user_ids}")
         print(f"Type: {notification_type}")
         print(f"Message: {message}")
-        print(f"Current user_sessions: {cls.user_sessions}")
+        print(f"Active sessions: {len(cls.sessions)}")
         
         # Make sure user_ids is a list of strings
         user_ids = [str(uid) for uid in user_ids]
         
-        for user_id in user_ids:
-            print(f"Processing user ID: {user_id} (type: {type(user_id)})")
-            if user_id in cls.user_sessions:
-                sessions = cls.user_sessions[user_id]
-                print(f"Found {len(sessions)} active session(s) for user {user_id}")
-                for sid in sessions:
-                    print(f"Sending notification to SID: {sid}")
-                    emit('task_notification', {
-                        "message": message,
-                        "type": notification_type,
-                        "user_id": user_id,
-                    }, to=sid, room=cls.TASK_UPDATES_ROOM, namespace='/')
+        # One emit per user room; the server (or message queue) fans out to the user's sessions
+        # Number each user's copy, so offline users get it replayed on reconnect
+        notifications = cls.record_notifications(user_ids, {"message": message, "type": notification_type})
+        coalescer = current_app.extensions.get('notification_coalescer')
+        for user_id in notifications:
+            if not cls.sessions.is_online(user_id):
+                print(f"No active sessions found for user {user_id}, kept for replay")
+            if coalescer is not None:
+                coalescer.add(user_id, notifications[user_id])
             else:
-                print(f"No active sessions found for user {user_id}")
+                cls.deliver_notifications(user_id, [notifications[user_id]])
         
-        print("=" * 50 + "\n")
\ No newline at end of file
+        print("=" * 50 + "\n")
+
+    @staticmethod
+    def notification_key(notification):
+        """Key under which notifications to one user are duplicates."""
+        return notification["type"], notification["message"]
+
+    @classmethod
+    def record_notifications(cls, user_ids, notification):
+        """Give a notification the next sequence number of each recipient.
+
+        With NOTIFICATION_PERSIST the numbered notifications are also stored.
+        When another worker stored the same numbers first, numbering continues
+        after the stored ones and storing is retried; notifications that still
+        cannot be stored are not sent.
+
+        Returns:
+            dict: Numbered notification by user ID, empty if it could not be stored
+        """
+        history = current_app.extensions['notification_history']
+        if not current_app.config.get('NOTIFICATION_PERSIST', False):
+            return {user_id: history.record(user_id, notification) for user_id in user_ids}
+
+        for _ in range(cls.NOTIFICATION_STORE_ATTEMPTS):
+            notifications = {user_id: {**notification, 'seq': history.allocate(user_id)} for user_id in user_ids}
+            db.session.add_all([
+                NotificationLog(
+                    user_id=int(user_id),
+                    seq=numbered['seq'],
+                    type=numbered['type'],
+                    message=numbered['message']
+                )
+                for user_id, numbered in notifications.items()
+            ])
+            try:
+                db.session.commit()
+            except IntegrityError:
+                # Another worker used the same numbers; continue after the stored ones
+                db.session.rollback()
+                current_app.logger.warning(f"Notification sequence conflict for users {list(notifications)}")
+                for user_id, numbered in notifications.items():
+                    history.release(user_id, numbered['seq'])
+                    history.resync(user_id, NotificationLog.last_seq(user_id))
+                continue
+            for user_id, numbered in notifications.items():
+                history.remember(user_id, numbered)
+            return notifications
+
+        current_app.logger.error(f"Notification to users {list(user_ids)} not sent, it could not be stored")
+        return {}
+
+    @staticmethod
+    def prune_notifications(keep=None):
+        """Delete stored notifications beyond the replay window of each user.
+
+        Args:
+            keep: Latest notifications kept per user, defaults to NOTIFICATION_REPLAY_MAX
+
+        Returns:
+            int: Number of notifications deleted
+        """
+        if keep is None:
+            keep = current_app.config.get('NOTIFICATION_REPLAY_MAX', 500)
+        return NotificationLog.prune(keep)
+
+    @staticmethod
+    def replay_notifications(user_id, last_seq):
+        """Get the notifications a user missed after an acknowledged sequence number.
+
+        Served from the in-memory history of this worker, or with
+        NOTIFICATION_PERSIST from the stored notifications, which hold the
+        notifications sent by every worker.
+
+        Returns:
+            dict: Replay payload; complete is false if notifications were lost
+            and the client should resync its tasks
+        """
+        try:
+            last_seq = max(int(last_seq), 0)
+        except (TypeError, ValueError):
+            last_seq = 0
+        if not current_app.config.get('NOTIFICATION_PERSIST', False):
+            history = current_app.extensions['notification_history']
+            notifications, complete = history.since(user_id, last_seq)
+            current = history.current(user_id)
+        else:
+            limit = current_app.config.get('NOTIFICATION_REPLAY_MAX', 500)
+            current = NotificationLog.last_seq(user_id)
+            rows = NotificationLog.query.filter(
+                NotificationLog.user_id == int(user_id),
+                NotificationLog.seq > last_seq
+            ).order_by(NotificationLog.seq).limit(limit).all()
+            notifications = [row.to_notification() for row in rows]
+            complete = len(notifications) >= current - last_seq
+        return {
+            "user_id": str(user_id),
+            "notifications": notifications,
+            "last_seq": current,
+            "complete": complete
+        }
+
+    @classmethod
+    def deliver_notifications(cls, user_id, notifications):
+        """Emit notifications to a user's room.
+
+        A single notification is sent as a task_notification event; several
+        coalesced ones as one task_notification_batch event.
+        """
+        if len(notifications) == 1:
+            socketio.emit('task_notification', {
+                **notifications[0],
+                "user_id": user_id,
+            }, to=cls.user_room(user_id), namespace='/')
+        else:
+            socketio.emit('task_notification_batch', {
+                "user_id": user_id,
+                "count": len(notifications),
+                "notifications": notifications,
+            }, to=cls.user_room(user_id), namespace='/')
+
+    @classmethod
+    def handle_subscribe_task_changes(cls):
+        """Subscribe the current connection to task_changed events."""
+        join_room(cls.TASK_CHANGES_ROOM)
+        return {"subscribed": True, "room": cls.TASK_CHANGES_ROOM}
+
+    @classmethod
+    def handle_unsubscribe_task_changes(cls):
+        """Unsubscribe the current connection from task_changed events."""
+        leave_room(cls.TASK_CHANGES_ROOM)
+        return {"subscribed": False, "room": cls.TASK_CHANGES_ROOM}
+
+    @classmethod
+    def broadcast_task_change(cls, version, task=None, task_id=None):
+        """Broadcast a committed task change to subscribed clients.
+
+        Args:
+            version: Change version of the task after the commit
+            task: Serialized task, or None to send a tombstone
+            task_id: ID of the deleted task when sending a tombstone
+        """
+        if task is not None:
+            payload = {"version": version, "task": task}
+        else:
+            payload = {"version": version, "task_id": task_id, "deleted": True}
+        socketio.emit('task_changed', payload, to=cls.TASK_CHANGES_ROOM, namespace='/')
+
+    @classmethod
+    def notify_user(cls, user_id, event, payload):
+        """Emit an event to every connected session of a user.
+
+        Safe to call outside a Socket.IO request, e.g. from background jobs.
+        """
+        socketio.emit(event, payload, to=cls.user_room(user_id), namespace='/')
+
+    @classmethod
+    def notify_role(cls, role, event, payload):
+        """Emit an event to every connected session of users with a role (requires WEBSOCKET_ROLE_ROOMS)."""
+        socketio.emit(event, payload, to=cls.role_room(role), namespace='/')
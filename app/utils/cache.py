@@ -0,0 +1,96 @@
+import threading
+from collections import OrderedDict
+
+
+class VersionedCache:
+    """Process-wide LRU cache for serialized payloads keyed by data version.
+
+    Entries are bounded both by count and by total size in bytes. Builds are
+    serialized per key so concurrent requests for the same version wait for
+    the first builder instead of each re-running the query and serializer.
+    """
+
+    def __init__(self, max_entries=8, max_bytes=32 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._build_locks = {}
+
+    def configure(self, max_entries=None, max_bytes=None):
+        """Update the size limits and drop all cached entries."""
+        with self._lock:
+            if max_entries is not None:
+                self.max_entries = max_entries
+            if max_bytes is not None:
+                self.max_bytes = max_bytes
+            self._clear()
+
+    def get(self, key):
+        """Get a cached payload, or None if it is not cached."""
+        with self._lock:
+            body = self._entries.get(key)
+            if body is not None:
+                self._entries.move_to_end(key)
+            return body
+
+    def put(self, key, body):
+        """Store a payload, evicting least recently used entries to stay in bounds."""
+        with self._lock:
+            if len(body) > self.max_bytes or self.max_entries <= 0:
+                return
+            if key in self._entries:
+                self._size -= len(self._entries.pop(key))
+            self._entries[key] = body
+            self._size += len(body)
+            while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def get_or_build(self, key, build):
+        """Get a cached payload, building and caching it on a miss.
+
+        Args:
+            key: Cache key, which must include the data version
+            build: Callable returning the payload as bytes
+        """
+        body = self.get(key)
+        if body is not None:
+            return body
+
+        with self._lock:
+            build_lock = self._build_locks.setdefault(key, threading.Lock())
+        with build_lock:
+            body = self.get(key)
+            if body is None:
+                body = build()
+                self.put(key, body)
+        with self._lock:
+            self._build_locks.pop(key, None)
+        return body
+
+    def invalidate(self):
+        """Drop all cached entries."""
+        with self._lock:
+            self._clear()
+
+    def _clear(self):
+        self._entries.clear()
+        self._size = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# Shared cache for serialized task list and sync payloads
+task_snapshot_cache = VersionedCache()
+
+# Shared cache for serialized map tile payloads
+task_tile_cache = VersionedCache(max_entries=1024, max_bytes=16 * 1024 * 1024)
+
+
+def invalidate_task_caches():
+    """Drop all cached payloads derived from the task table."""
+    task_snapshot_cache.invalidate()
+    task_tile_cache.invalidate()
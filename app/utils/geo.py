@@ -0,0 +1,125 @@
+import math
+
+EARTH_RADIUS_M = 6371008.8  # Mean Earth radius in meters
+GEOHASH_ALPHABET = '0123456789bcdefghjkmnpqrstuvwxyz'
+GEOHASH_PRECISION = 9  # ~5m cells, stored on each task
+
+
+def encode_geohash(lat, lon, precision=GEOHASH_PRECISION):
+    """Encode coordinates as a geohash string."""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True  # Geohash bits alternate, starting with longitude
+
+    while len(chars) < precision:
+        value, value_range = (lon, lon_range) if even else (lat, lat_range)
+        mid = (value_range[0] + value_range[1]) / 2
+        if value >= mid:
+            bits = (bits << 1) | 1
+            value_range[0] = mid
+        else:
+            bits <<= 1
+            value_range[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(GEOHASH_ALPHABET[bits])
+            bits = 0
+            bit_count = 0
+    return ''.join(chars)
+
+
+def geohash_cell_size(precision):
+    """Get the (latitude, longitude) size in degrees of a geohash cell."""
+    lon_bits = (5 * precision + 1) // 2
+    lat_bits = (5 * precision) // 2
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lon_bits
+
+
+def bounding_box(lat, lon, radius_m):
+    """Get the (min_lat, max_lat, delta_lon) box around a point.
+
+    delta_lon is None when the box covers every longitude (near the poles).
+    """
+    delta_lat = math.degrees(radius_m / EARTH_RADIUS_M)
+    min_lat = max(lat - delta_lat, -90.0)
+    max_lat = min(lat + delta_lat, 90.0)
+    cos_lat = math.cos(math.radians(max(abs(min_lat), abs(max_lat))))
+    if min_lat <= -90.0 or max_lat >= 90.0 or cos_lat < 1e-9:
+        return min_lat, max_lat, None
+    delta_lon = delta_lat / cos_lat
+    return min_lat, max_lat, (delta_lon if delta_lon < 180.0 else None)
+
+
+def covering_prefixes(lat, lon, radius_m):
+    """Get geohash prefixes whose cells together cover a circle.
+
+    Picks the finest precision whose cells are at least as large as the
+    circle's bounding box, so the box overlaps at most four cells, one per
+    corner. Returns an empty list when the circle needs the whole index.
+    """
+    min_lat, max_lat, delta_lon = bounding_box(lat, lon, radius_m)
+    if delta_lon is None:
+        return []
+
+    precision = 0
+    for candidate in range(GEOHASH_PRECISION, 0, -1):
+        cell_lat, cell_lon = geohash_cell_size(candidate)
+        if cell_lat >= max_lat - min_lat and cell_lon >= 2 * delta_lon:
+            precision = candidate
+            break
+    if precision == 0:
+        return []
+
+    corners = [
+        (corner_lat, _normalize_lon(lon + sign * delta_lon))
+        for corner_lat in (min_lat, max_lat)
+        for sign in (-1, 1)
+    ]
+    return sorted({encode_geohash(corner_lat, corner_lon, precision) for corner_lat, corner_lon in corners})
+
+
+def haversine_m(lat1, lon1, lat2, lon2):
+    """Great-circle distance in meters between two points."""
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+
+def haversine_many(lat, lon, points):
+    """Distances in meters from one point to many (lat, lon) points in one pass.
+
+    The origin's trigonometry is computed once and reused for every point.
+    """
+    phi1 = math.radians(lat)
+    cos_phi1 = math.cos(phi1)
+    lambda1 = math.radians(lon)
+    radians, sin, cos, asin, sqrt = math.radians, math.sin, math.cos, math.asin, math.sqrt
+    diameter = 2 * EARTH_RADIUS_M
+    distances = []
+    for point_lat, point_lon in points:
+        phi2 = radians(point_lat)
+        a = sin((phi2 - phi1) / 2) ** 2 + cos_phi1 * cos(phi2) * sin((radians(point_lon) - lambda1) / 2) ** 2
+        distances.append(diameter * asin(min(1.0, sqrt(a))))
+    return distances
+
+
+def tile_bounds(z, x, y):
+    """Get the (west, south, east, north) bounds of a Web Mercator map tile."""
+    n = 2 ** z
+    west = x / n * 360.0 - 180.0
+    east = (x + 1) / n * 360.0 - 180.0
+    north = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * y / n))))
+    south = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * (y + 1) / n))))
+    return west, south, east, north
+
+
+def _normalize_lon(lon):
+    """Wrap a longitude into [-180, 180)."""
+    return (lon + 180.0) % 360.0 - 180.0
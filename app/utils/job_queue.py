@@ -0,0 +1,196 @@
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+import eventlet
+from eventlet import tpool
+from eventlet.semaphore import Semaphore
+from config import Config
+
+
+class Job:
+    """A unit of background work and its progress."""
+
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    COMPLETED = 'completed'
+    FAILED = 'failed'
+
+    def __init__(self, kind, key, params, owner=None):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.key = key
+        self.params = params
+        self.owner = owner
+        self.status = self.QUEUED
+        self.progress = 0
+        self.result = None
+        self.error = None
+        self.created_at = datetime.now(Config.SERVER_TIMEZONE)
+        self.finished_at = None
+        self.thread = None
+
+    @property
+    def finished(self):
+        return self.status in (self.COMPLETED, self.FAILED)
+
+    def to_dict(self):
+        """Convert job to dictionary."""
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'params': self.params,
+            'status': self.status,
+            'progress': self.progress,
+            'result': self.result,
+            'error': self.error,
+            'created_at': self.created_at.isoformat(),
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+
+
+class JobQueue:
+    """Bounded background worker pool running jobs inside an app context.
+
+    At most ``max_workers`` jobs run at once and at most ``max_pending`` are
+    queued or running; identical unfinished jobs (same key) are shared.
+    Limits and sharing are per process. Job status is stored in the database
+    on every change, so any worker process can answer status polls; finished
+    jobs are kept up to ``history`` of them.
+
+    Each job is driven by a green thread of the Socket.IO hub: the work runs
+    in eventlet's OS thread pool, and the completion handler runs back in the
+    green thread, where it can emit events.
+    """
+
+    def __init__(self, app, max_workers=2, max_pending=20, history=100):
+        self.app = app
+        self.max_pending = max_pending
+        self.history = history
+        self._slots = Semaphore(max_workers)
+        self._jobs = OrderedDict()
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def submit(self, kind, key, params, run, owner=None, on_finish=None):
+        """Queue a job, or return the unfinished job with the same key.
+
+        Args:
+            kind: Job type, e.g. 'report'
+            key: Deduplication key of the job
+            params: JSON-serializable job parameters
+            run: Callable taking the job, returning its JSON-serializable result
+            owner: ID of the user who requested the job
+            on_finish: Callable taking the job once it completed or failed
+
+        Returns:
+            tuple: (job, whether a new job was created), or (None, False) if the queue is full
+        """
+        with self._lock:
+            existing = self._pending.get(key)
+            if existing is not None:
+                return existing, False
+            if len(self._pending) >= self.max_pending:
+                return None, False
+
+            job = Job(kind, key, params, owner)
+            self._jobs[job.id] = job
+            self._pending[key] = job
+            self._trim()
+            self._save(job)
+            job.thread = eventlet.spawn(self._drive, job, run, on_finish)
+            return job, True
+
+    def get(self, job_id):
+        """Get a job by ID, or None if it is unknown or expired.
+
+        The stored status is returned, so every worker process answers alike;
+        jobs of this process that could not be stored are still found.
+        """
+        from app import db
+        from app.models import BackgroundJob
+        return db.session.get(BackgroundJob, job_id) or self._jobs.get(job_id)
+
+    def set_progress(self, job, percent):
+        """Record the progress of a running job."""
+        job.progress = percent
+        self._save(job)
+
+    def wait(self, job_id, timeout=None):
+        """Wait until a job of this process finished and return it.
+
+        Raises:
+            TimeoutError: If the job did not finish within ``timeout`` seconds
+        """
+        job = self._jobs.get(job_id)
+        if job is not None and job.thread is not None:
+            with eventlet.Timeout(timeout, TimeoutError):
+                job.thread.wait()
+        return job
+
+    def shutdown(self, wait=True):
+        """Wait for the unfinished jobs of this process, or cancel those not started yet."""
+        with self._lock:
+            threads = [job.thread for job in self._jobs.values() if job.thread is not None and not job.thread.dead]
+        for thread in threads:
+            if wait:
+                thread.wait()
+            else:
+                thread.cancel()
+
+    def _drive(self, job, run, on_finish):
+        """Run a job in the OS thread pool once a worker slot is free, then report its completion."""
+        with self._slots:
+            tpool.execute(self._run, job, run)
+        if on_finish is not None:
+            with self.app.app_context():
+                try:
+                    on_finish(job)
+                except Exception as e:
+                    self.app.logger.error(f"Job {job.id} completion handler failed: {e}")
+
+    def _run(self, job, run):
+        with self.app.app_context():
+            from app import db
+            job.status = Job.RUNNING
+            self._save(job)
+            try:
+                job.result = run(job)
+                job.progress = 100
+                job.status = Job.COMPLETED
+            except Exception as e:
+                self.app.logger.error(f"Job {job.id} ({job.kind}) failed: {e}")
+                job.error = getattr(e, 'message', str(e))
+                job.status = Job.FAILED
+            finally:
+                job.finished_at = datetime.now(Config.SERVER_TIMEZONE)
+                self._save(job, prune=True)
+                with self._lock:
+                    self._pending.pop(job.key, None)
+                db.session.remove()
+
+    def _save(self, job, prune=False):
+        """Store the state of a job, in its own app context so the caller's session is left alone."""
+        from app import db
+        from app.models import BackgroundJob
+        with self.app.app_context():
+            try:
+                db.session.merge(BackgroundJob(
+                    id=job.id, kind=job.kind, params=job.params, owner=job.owner,
+                    status=job.status, progress=job.progress, result=job.result, error=job.error,
+                    created_at=job.created_at, finished_at=job.finished_at
+                ))
+                db.session.commit()
+                if prune:
+                    BackgroundJob.prune(self.history)
+            except Exception as e:
+                db.session.rollback()
+                self.app.logger.error(f"Failed to store job {job.id}: {e}")
+            finally:
+                db.session.remove()
+
+    def _trim(self):
+        """Drop the oldest finished jobs beyond the history limit."""
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[:max(len(finished) - self.history, 0)]:
+            del self._jobs[job_id]
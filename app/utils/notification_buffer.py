@@ -0,0 +1,114 @@
+import os
+import signal
+import threading
+import weakref
+
+SHUTDOWN_SIGNALS = (signal.SIGINT, signal.SIGTERM)
+_shutdown_coalescers = weakref.WeakSet()
+_shutdown_handlers = {}  # signal -> handler it replaced
+
+
+class NotificationCoalescer:
+    """Per-recipient buffer merging notifications sent within a time window.
+
+    The first notification for a recipient starts a window of ``window``
+    seconds; everything queued for that recipient until it closes is
+    delivered together, with duplicates merged. A recipient's buffer
+    is flushed early once it holds ``max_pending`` notifications.
+    """
+
+    def __init__(self, app, deliver, window=0.25, max_pending=20, merge_key=None):
+        """
+        Args:
+            app: Flask app, whose context deliveries run in
+            deliver: Callable taking a recipient ID and the list of its notifications
+            window: Seconds notifications are collected for
+            max_pending: Notifications buffered per recipient before an early flush
+            merge_key: Callable giving the key under which notifications are
+                duplicates; a duplicate replaces the buffered one, moving it last. Defaults to equality.
+        """
+        self.app = app
+        self.deliver = deliver
+        self.window = window
+        self.max_pending = max_pending
+        self.merge_key = merge_key or (lambda notification: notification)
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def add(self, recipient, notification):
+        """Queue a notification for a recipient."""
+        from app import socketio
+        with self._lock:
+            batch = self._pending.get(recipient)
+            start_window = batch is None
+            if start_window:
+                batch = self._pending[recipient] = []
+            key = self.merge_key(notification)
+            for index, buffered in enumerate(batch):
+                if self.merge_key(buffered) == key:
+                    del batch[index]
+                    break
+            batch.append(notification)
+            full = len(batch) >= self.max_pending
+        if full:
+            self.flush(recipient)
+        elif start_window:
+            socketio.start_background_task(self._flush_later, recipient)
+
+    def flush(self, recipient):
+        """Deliver the buffered notifications of a recipient now."""
+        with self._lock:
+            batch = self._pending.pop(recipient, None)
+        if batch:
+            with self.app.app_context():
+                self.deliver(recipient, batch)
+
+    def flush_all(self):
+        """Deliver every buffered notification, e.g. on shutdown."""
+        with self._lock:
+            recipients = list(self._pending)
+        for recipient in recipients:
+            try:
+                self.flush(recipient)
+            except Exception as e:
+                self.app.logger.error(f"Failed to flush notifications for {recipient}: {e}")
+
+    def pending_count(self, recipient=None):
+        """Number of buffered notifications, for one recipient or in total."""
+        with self._lock:
+            if recipient is not None:
+                return len(self._pending.get(recipient, ()))
+            return sum(len(batch) for batch in self._pending.values())
+
+    def _flush_later(self, recipient):
+        from app import socketio
+        socketio.sleep(self.window)
+        try:
+            self.flush(recipient)
+        except Exception as e:
+            self.app.logger.error(f"Failed to flush notifications for {recipient}: {e}")
+
+
+def flush_on_shutdown(coalescer):
+    """Deliver a coalescer's buffered notifications when the server is asked to stop.
+
+    The signal handlers are installed once per process, from the main thread,
+    and flush every registered coalescer while the server is still running
+    before handing the signal on to the handler they replaced.
+    """
+    _shutdown_coalescers.add(coalescer)
+    if _shutdown_handlers or threading.current_thread() is not threading.main_thread():
+        return
+    for signum in SHUTDOWN_SIGNALS:
+        _shutdown_handlers[signum] = signal.signal(signum, _flush_and_stop)
+
+
+def _flush_and_stop(signum, frame):
+    for coalescer in list(_shutdown_coalescers):
+        coalescer.flush_all()
+    previous = _shutdown_handlers.get(signum)
+    if callable(previous):
+        previous(signum, frame)
+    elif previous != signal.SIG_IGN:
+        signal.signal(signum, signal.SIG_DFL)
+        os.kill(os.getpid(), signum)
@@ -0,0 +1,87 @@
+import threading
+from collections import deque
+
+
+class NotificationHistory:
+    """Per-user notification sequence numbers and ring buffers of recent notifications.
+
+    Each user's notifications are numbered 1, 2, 3, ... and the last ``size``
+    of them are kept (as compact tuples) so a reconnecting client can be sent
+    what it missed since its last acknowledged sequence number.
+    """
+
+    def __init__(self, size=100, seed=None):
+        """
+        Args:
+            size: Notifications kept per user
+            seed: Callable returning a user's last sequence number, used once
+                per user to continue numbering, e.g. from persisted notifications
+        """
+        self.size = size
+        self.seed = seed
+        self._buffers = {}  # user_id -> deque of (seq, type, message)
+        self._seqs = {}  # user_id -> last sequence number
+        self._lock = threading.Lock()
+
+    def record(self, user_id, notification):
+        """Number a notification and keep it in the user's buffer.
+
+        Returns:
+            dict: The notification with its sequence number as 'seq'
+        """
+        numbered = {**notification, 'seq': self.allocate(user_id)}
+        self.remember(user_id, numbered)
+        return numbered
+
+    def allocate(self, user_id):
+        """Take a user's next sequence number without keeping a notification."""
+        user_id = str(user_id)
+        self._last_seq(user_id)
+        with self._lock:
+            seq = self._seqs[user_id] + 1
+            self._seqs[user_id] = seq
+        return seq
+
+    def release(self, user_id, seq):
+        """Give back an allocated sequence number that was not used, unless a later one was taken."""
+        with self._lock:
+            if self._seqs.get(str(user_id)) == seq:
+                self._seqs[str(user_id)] = seq - 1
+
+    def remember(self, user_id, numbered):
+        """Keep a numbered notification in the user's buffer."""
+        with self._lock:
+            buffer = self._buffers.get(str(user_id))
+            if buffer is None:
+                buffer = self._buffers[str(user_id)] = deque(maxlen=self.size)
+            buffer.append((numbered['seq'], numbered['type'], numbered['message']))
+
+    def resync(self, user_id, seq):
+        """Continue a user's numbering after seq, e.g. when another worker used the number."""
+        with self._lock:
+            self._seqs[str(user_id)] = max(self._seqs.get(str(user_id), 0), seq)
+
+    def since(self, user_id, last_seq):
+        """Get a user's notifications after an acknowledged sequence number.
+
+        Returns:
+            tuple: (notifications in order, whether none were lost to the buffer size)
+        """
+        user_id = str(user_id)
+        current = self.current(user_id)
+        with self._lock:
+            entries = [entry for entry in self._buffers.get(user_id, ()) if entry[0] > last_seq]
+        notifications = [{'seq': seq, 'type': type_, 'message': message} for seq, type_, message in entries]
+        expected = current - last_seq if current > last_seq else 0
+        return notifications, len(notifications) >= expected
+
+    def current(self, user_id):
+        """Get a user's last sequence number."""
+        return self._last_seq(str(user_id))
+
+    def _last_seq(self, user_id):
+        if user_id not in self._seqs:
+            seq = self.seed(user_id) if self.seed else 0
+            with self._lock:
+                self._seqs.setdefault(user_id, seq)
+        return self._seqs[user_id]
@@ -0,0 +1,210 @@
+import json
+import threading
+import time
+import socketio
+
+LOCAL_SCHEME = 'local://'
+
+
+class LocalBroker:
+    """In-process stand-in for a message broker such as Redis.
+
+    Every subscriber of a channel receives every message published on it,
+    including its own. Servers sharing a broker behave like workers sharing
+    a message queue, which makes multi-worker delivery testable in one process.
+    """
+
+    def __init__(self):
+        self._channels = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, channel, queue):
+        with self._lock:
+            self._channels.setdefault(channel, []).append(queue)
+
+    def unsubscribe(self, channel, queue):
+        with self._lock:
+            subscribers = self._channels.get(channel, [])
+            if queue in subscribers:
+                subscribers.remove(queue)
+
+    def publish(self, channel, message):
+        with self._lock:
+            subscribers = list(self._channels.get(channel, ()))
+        for queue in subscribers:
+            queue.put(message)
+
+
+local_broker = LocalBroker()
+
+
+class PresenceMixin:
+    """Share the WebSocket session registry between servers over the pub/sub channel.
+
+    Sessions connected to this server are announced as ``presence`` messages
+    next to the Socket.IO messages; sessions announced by other servers are
+    added to the registry with their host ID. A starting server asks the
+    others to announce their sessions again.
+
+    Every server also sends a heartbeat each ``heartbeat_interval`` seconds.
+    Sessions of a server not heard from for ``host_ttl`` seconds, e.g. one
+    that crashed, are dropped from the registry.
+    """
+
+    sync_delay = 1  # Seconds to wait for the channel subscription before asking for sessions
+    heartbeat_interval = 10  # Seconds between heartbeats, 0 to send none
+    host_ttl = 30  # Seconds without a message after which a server's sessions expire
+    registry = None  # Session registry kept in sync, see attach_registry
+
+    def attach_registry(self, registry):
+        """Keep a session registry in sync with the other servers."""
+        self.registry = registry
+
+    def initialize(self):
+        self._host_seen = {}  # host_id -> monotonic time of its last message
+        super().initialize()
+        if not self.write_only:
+            self.server.start_background_task(self._request_sync)
+            if self.heartbeat_interval:
+                self.server.start_background_task(self._heartbeat)
+
+    def publish_presence(self, op, session=None):
+        """Announce a local session change ('add' or 'remove') to the other servers."""
+        message = {'method': 'presence', 'op': op, 'host_id': self.host_id}
+        if session is not None:
+            message['session'] = session.to_dict()
+        self._publish(message)
+
+    def expire_hosts(self, now=None):
+        """Drop the sessions of servers not heard from within host_ttl.
+
+        Returns:
+            list: Host IDs whose sessions were dropped
+        """
+        registry = self.registry
+        if now is None:
+            now = time.monotonic()
+        expired = [host_id for host_id, seen in list(self._host_seen.items()) if now - seen > self.host_ttl]
+        for host_id in expired:
+            self._host_seen.pop(host_id, None)
+            if registry is not None:
+                registry.remove_host(host_id)
+        return expired
+
+    def _heartbeat(self):
+        while True:
+            self.server.sleep(self.heartbeat_interval)
+            try:
+                self.publish_presence('heartbeat')
+                self.expire_hosts()
+            except Exception as e:
+                self._get_logger().error(f"Presence heartbeat failed: {e}")
+
+    def _request_sync(self):
+        if self.sync_delay:
+            self.server.sleep(self.sync_delay)
+        self.publish_presence('sync')
+
+    def _listen(self):
+        for message in super()._listen():
+            data = message
+            if not isinstance(data, dict):
+                try:
+                    data = json.loads(message)
+                except (TypeError, ValueError):
+                    data = None
+            if isinstance(data, dict) and data.get('method') == 'presence':
+                if data.get('host_id') != self.host_id:
+                    self._handle_presence(data)
+                continue
+            yield message
+
+    def _handle_presence(self, data):
+        self._host_seen[data.get('host_id')] = time.monotonic()
+        registry = self.registry
+        if registry is None:
+            return
+        op = data.get('op')
+        if op == 'add':
+            session = data['session']
+            registry.add(
+                session['sid'], session['user_id'], session.get('role'),
+                host_id=data['host_id'], connected_at=session.get('connected_at')
+            )
+        elif op == 'remove':
+            registry.remove(data['session']['sid'])
+        elif op == 'sync':
+            for session in registry.local_sessions():
+                self.publish_presence('add', session)
+
+
+class LocalManager(socketio.PubSubManager):
+    """Socket.IO client manager publishing through a LocalBroker."""
+
+    name = 'local'
+
+    def __init__(self, channel='flask-socketio', write_only=False, logger=None, broker=None):
+        super().__init__(channel=channel, write_only=write_only, logger=logger)
+        self.broker = broker or local_broker
+        self._queue = None
+
+    def initialize(self):
+        # Subscribe before the listener starts so no message is missed
+        if not self.write_only:
+            self._queue = self.server.eio.create_queue()
+            self.broker.subscribe(self.channel, self._queue)
+        super().initialize()
+
+    def close(self):
+        """Stop receiving messages from the broker."""
+        if self._queue is not None:
+            self.broker.unsubscribe(self.channel, self._queue)
+
+    def _publish(self, data):
+        self.broker.publish(self.channel, json.dumps(data))
+
+    def _listen(self):
+        while True:
+            yield self._queue.get()
+
+
+class LocalPresenceManager(PresenceMixin, LocalManager):
+    """In-process client manager sharing the session registry."""
+
+    sync_delay = 0  # The broker subscription is made before the listener starts
+
+
+class RedisPresenceManager(PresenceMixin, socketio.RedisManager):
+    """Redis client manager sharing the session registry; requires the redis package."""
+
+
+class KombuPresenceManager(PresenceMixin, socketio.KombuManager):
+    """Kombu (RabbitMQ, ...) client manager sharing the session registry; requires the kombu package."""
+
+
+def create_client_manager(url, channel='flask-socketio', heartbeat_interval=None, host_ttl=None):
+    """Create the Socket.IO client manager for a message queue URL.
+
+    Args:
+        url: ``local://`` for the in-process broker, ``redis://``/``rediss://``
+            for Redis, any other kombu URL, or None for a single process
+        channel: Channel shared by all servers of one deployment
+        heartbeat_interval: Seconds between presence heartbeats, defaults to the manager's
+        host_ttl: Seconds after which sessions of a silent server expire, defaults to the manager's
+
+    Returns:
+        Client manager, or None to use the default in-memory manager
+    """
+    if not url:
+        return None
+    if url.startswith(LOCAL_SCHEME):
+        manager = LocalPresenceManager(channel=channel)
+    elif url.startswith(('redis://', 'rediss://')):
+        manager = RedisPresenceManager(url, channel=channel)
+    else:
+        manager = KombuPresenceManager(url, channel=channel)
+    if heartbeat_interval is not None:
+        manager.heartbeat_interval = heartbeat_interval
+    if host_ttl is not None:
+        manager.host_ttl = host_ttl
+    return manager
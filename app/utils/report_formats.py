@@ -0,0 +1,123 @@
+import csv
+import io
+import json
+
+# Columns shared by every machine-readable report format; unused columns are empty
+REPORT_COLUMNS = (
+    'record', 'date', 'task_id', 'status', 'count', 'title', 'description',
+    'created_by', 'assigned_to', 'latitude', 'longitude', 'timestamp', 'note'
+)
+COLUMNAR_ROW_GROUP = 1000  # Rows per column block in the columnar format
+
+
+def iter_day_records(statistics, day):
+    """Flatten one day of report statistics into records.
+
+    Record types: 'day' (tasks created), 'status' (distribution), 'issue'
+    (reported issue) and 'log' (log line of the preceding issue).
+    """
+    day = day.isoformat()
+    yield {'record': 'day', 'date': day, 'count': statistics['tasks_created_today']}
+    for status, count in statistics['task_status_distribution'].items():
+        yield {'record': 'status', 'date': day, 'status': status, 'count': count}
+    for issue in statistics['reported_issues']:
+        task_id = issue[0]
+        yield {
+            'record': 'issue', 'date': day, 'task_id': task_id, 'title': issue[1], 'description': issue[2],
+            'created_by': issue[3], 'assigned_to': issue[4], 'latitude': issue[5], 'longitude': issue[6]
+        }
+        for log in issue[7]:
+            yield {
+                'record': 'log', 'date': day, 'task_id': task_id, 'status': log['status'],
+                'assigned_to': log['assigned_to'], 'timestamp': log['timestamp'], 'note': log['note']
+            }
+
+
+def iter_total_records(totals, start_date, end_date):
+    """Flatten the cross-day totals of a range report into records."""
+    span = f"{start_date.isoformat()}/{end_date.isoformat()}"
+    yield {'record': 'total_days', 'date': span, 'count': totals['days']}
+    yield {'record': 'total_created', 'date': span, 'count': totals['tasks_created']}
+    for status, count in totals['status_changes'].items():
+        yield {'record': 'total_status_changes', 'date': span, 'status': status, 'count': count}
+    yield {'record': 'total_issue_days', 'date': span, 'count': totals['issue_days']}
+
+
+class CsvFormat:
+    """Comma separated rows with a header line."""
+
+    name = 'csv'
+    extension = 'csv'
+    mimetype = 'text/csv'
+
+    @staticmethod
+    def header():
+        return CsvFormat.encode([dict(zip(REPORT_COLUMNS, REPORT_COLUMNS))])
+
+    @staticmethod
+    def encode(records):
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=REPORT_COLUMNS, lineterminator='\n')
+        writer.writerows(records)
+        return buffer.getvalue()
+
+
+class NdjsonFormat:
+    """One JSON object per record and line."""
+
+    name = 'ndjson'
+    extension = 'ndjson'
+    mimetype = 'application/x-ndjson'
+
+    @staticmethod
+    def header():
+        return ''
+
+    @staticmethod
+    def encode(records):
+        return ''.join(json.dumps(record, ensure_ascii=False) + '\n' for record in records)
+
+
+class ColumnarFormat:
+    """Column blocks as JSON lines.
+
+    The first line is the schema ``{"format": "columnar", "columns": [...]}``;
+    every following line is a block ``{"rows": n, "data": [[...], ...]}``
+    holding one array per column, in schema order, for up to
+    COLUMNAR_ROW_GROUP rows. Readers can stream blocks and skip columns.
+    """
+
+    name = 'columnar'
+    extension = 'columnar.ndjson'
+    mimetype = 'application/x-ndjson'
+
+    @staticmethod
+    def header():
+        return json.dumps({'format': 'columnar', 'version': 1, 'columns': list(REPORT_COLUMNS)}) + '\n'
+
+    @staticmethod
+    def encode(records):
+        records = list(records)
+        blocks = []
+        for start in range(0, len(records), COLUMNAR_ROW_GROUP):
+            group = records[start:start + COLUMNAR_ROW_GROUP]
+            data = [[record.get(column) for record in group] for column in REPORT_COLUMNS]
+            blocks.append(json.dumps({'rows': len(group), 'data': data}, ensure_ascii=False) + '\n')
+        return ''.join(blocks)
+
+
+REPORT_FORMATS = {fmt.name: fmt for fmt in (CsvFormat, NdjsonFormat, ColumnarFormat)}
+
+
+def encode_day(payload):
+    """Encode one day of statistics in a report format; runs in the report process pool."""
+    statistics, day, format_name = payload
+    return REPORT_FORMATS[format_name].encode(iter_day_records(statistics, day))
+
+
+def mimetype_for(filename):
+    """Get the MIME type of a report file from its extension, or None to guess."""
+    for fmt in REPORT_FORMATS.values():
+        if filename.endswith('.' + fmt.extension):
+            return fmt.mimetype
+    return None
@@ -1,5 +1,10 @@
-from typing import Any, Optional
-from flask import jsonify, make_response
+import mimetypes
+import os
+import zlib
+from typing import Any, Iterable, Optional
+from flask import jsonify, make_response, current_app, request, stream_with_context
+
+NDJSON_MIMETYPE = "application/x-ndjson"
 
 
 class AuthError(Exception):
@@ -31,6 +36,117 @@ def success_response(
     return jsonify(response), status_code
 
 
+def success_body(
+    data: Optional[Any] = None,
+    message: Optional[str] = None
+) -> bytes:
+    """Serialize a success response body for caching."""
+    response = {}
+    if message:
+        response["message"] = message
+    if data is not None:
+        response["data"] = data
+    return (current_app.json.dumps(response) + "\n").encode("utf-8")
+
+
+def raw_json_response(
+    body: bytes,
+    status_code: int = 200
+) -> tuple:
+    """Create a response from a prebuilt JSON body."""
+    return current_app.response_class(body, mimetype="application/json"), status_code
+
+
+def wants_ndjson() -> bool:
+    """Check whether the client asked for a streamed NDJSON response.
+
+    Selected with ``?stream=1`` or an ``Accept: application/x-ndjson`` header.
+    """
+    if request.args.get("stream", "").lower() in ("1", "true", "yes"):
+        return True
+    return request.accept_mimetypes.best_match(["application/json", NDJSON_MIMETYPE]) == NDJSON_MIMETYPE
+
+
+def ndjson_response(
+    records: Iterable[Any],
+    status_code: int = 200
+):
+    """Create a streamed response with one JSON document per line.
+
+    Records are serialized lazily as the response is sent, so memory stays
+    bounded by the size of one record regardless of how many are produced.
+    The response is marked as direct passthrough so after-request hooks do
+    not buffer the body.
+    """
+    def generate():
+        for record in records:
+            yield current_app.json.dumps(record) + "\n"
+
+    return current_app.response_class(
+        stream_with_context(generate()),
+        status=status_code,
+        mimetype=NDJSON_MIMETYPE,
+        direct_passthrough=True
+    )
+
+
+def gzip_file_response(
+    path: str,
+    filename: str,
+    mimetype: Optional[str] = None,
+    chunk_size: int = 64 * 1024
+):
+    """Stream a file as a gzip-encoded attachment.
+
+    The file is compressed chunk by chunk while it is sent, so neither the
+    file nor its compressed form is held in memory. The ETag is derived from
+    the file's size and modification time.
+    """
+    stat = os.stat(path)
+    etag = f"{int(stat.st_mtime)}-{stat.st_size}-gzip"
+    if etag_matches(etag):
+        response = not_modified_response(etag)
+        response.vary.add("Accept-Encoding")
+        return response
+
+    def generate():
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        with open(path, "rb") as file:
+            while chunk := file.read(chunk_size):
+                data = compressor.compress(chunk)
+                if data:
+                    yield data
+        yield compressor.flush()
+
+    response = current_app.response_class(
+        generate(),
+        mimetype=mimetype or mimetypes.guess_type(filename)[0] or "application/octet-stream",
+        direct_passthrough=True
+    )
+    response.headers["Content-Encoding"] = "gzip"
+    response.headers["Content-Disposition"] = f"attachment; filename={filename}"
+    response.vary.add("Accept-Encoding")
+    response.set_etag(etag)
+    return response
+
+
+def etag_matches(etag: str) -> bool:
+    """Check whether the request's If-None-Match header matches an ETag."""
+    return request.if_none_match.contains_weak(etag)
+
+
+def set_etag(result, etag: str, weak: bool = False):
+    """Attach an ETag to a response or (response, status) tuple."""
+    response = result[0] if isinstance(result, tuple) else result
+    response.set_etag(etag, weak=weak)
+    return result
+
+
+def not_modified_response(etag: str, weak: bool = False):
+    """Create a 304 response carrying the ETag that matched."""
+    return set_etag(redirect_response(status_code=304), etag, weak=weak)
+
+
 def redirect_response(
     status_code: int = 304,
     location: Optional[str] = None
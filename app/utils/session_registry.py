@@ -0,0 +1,123 @@
+import threading
+from datetime import datetime
+from config import Config
+
+
+class SessionInfo:
+    """Metadata of one connected socket.
+
+    host_id is None for sockets connected to this server, otherwise the
+    ID of the server holding the socket.
+    """
+
+    __slots__ = ('sid', 'user_id', 'role', 'connected_at', 'host_id')
+
+    def __init__(self, sid, user_id, role=None, connected_at=None, host_id=None):
+        self.sid = sid
+        self.user_id = user_id
+        self.role = role
+        self.connected_at = connected_at or datetime.now(Config.SERVER_TIMEZONE)
+        self.host_id = host_id
+
+    def to_dict(self):
+        """Convert session info to dictionary."""
+        return {
+            'sid': self.sid,
+            'user_id': self.user_id,
+            'role': self.role,
+            'connected_at': self.connected_at.isoformat(),
+            'host_id': self.host_id
+        }
+
+
+class SessionRegistry:
+    """Connected WebSocket sessions indexed by sid and by user.
+
+    Registering and removing a session are O(1): sessions are found through
+    the sid index and each user's sids are kept in a set. Mutations hold a
+    lock so greenlets and background threads see consistent indexes.
+    """
+
+    def __init__(self):
+        self._sessions = {}  # sid -> SessionInfo
+        self._users = {}  # user_id -> set of sids
+        self._lock = threading.Lock()
+
+    def add(self, sid, user_id, role=None, host_id=None, connected_at=None):
+        """Register a connected session; a sid registered again replaces its old entry.
+
+        Args:
+            host_id: Server holding a remote session, None for local sessions
+            connected_at: Connect time (datetime or ISO string), defaults to now
+        """
+        user_id = str(user_id)
+        if isinstance(connected_at, str):
+            connected_at = datetime.fromisoformat(connected_at)
+        info = SessionInfo(sid, user_id, role, connected_at, host_id)
+        with self._lock:
+            self._discard(sid)
+            self._sessions[sid] = info
+            self._users.setdefault(user_id, set()).add(sid)
+        return info
+
+    def remove(self, sid):
+        """Unregister a session.
+
+        Returns:
+            SessionInfo: The removed session, or None if the sid was unknown
+        """
+        with self._lock:
+            return self._discard(sid)
+
+    def get(self, sid):
+        """Get the session info of a sid, or None."""
+        return self._sessions.get(sid)
+
+    def sids_for(self, user_id):
+        """Get a snapshot of the sids connected for a user."""
+        with self._lock:
+            return tuple(self._users.get(str(user_id), ()))
+
+    def remove_host(self, host_id):
+        """Unregister every session held by a server.
+
+        Returns:
+            list: The removed sessions
+        """
+        with self._lock:
+            sids = [sid for sid, info in self._sessions.items() if info.host_id == host_id]
+            return [self._discard(sid) for sid in sids]
+
+    def local_sessions(self):
+        """Get a snapshot of the sessions connected to this server."""
+        with self._lock:
+            return [info for info in self._sessions.values() if info.host_id is None]
+
+    def is_online(self, user_id):
+        """Check whether a user has at least one connected session."""
+        return str(user_id) in self._users
+
+    def user_count(self):
+        """Number of users with at least one connected session."""
+        return len(self._users)
+
+    def clear(self):
+        with self._lock:
+            self._sessions.clear()
+            self._users.clear()
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def __contains__(self, sid):
+        return sid in self._sessions
+
+    def _discard(self, sid):
+        info = self._sessions.pop(sid, None)
+        if info is not None:
+            sids = self._users.get(info.user_id)
+            if sids is not None:
+                sids.discard(sid)
+                if not sids:
+                    del self._users[info.user_id]
+        return info
@@ -0,0 +1,107 @@
+import mmap
+import os
+import struct
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows: writers are not serialized across processes
+    fcntl = None
+
+_VERSION_FORMAT = '<Q'
+_VERSION_SIZE = struct.calcsize(_VERSION_FORMAT)
+
+
+class SharedVersionFile:
+    """Task version shared between worker processes through a memory-mapped file.
+
+    Reads are a memory access; writes take an exclusive file lock so
+    concurrent commits in different workers only ever move the version up.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        if os.fstat(self._fd).st_size < _VERSION_SIZE:
+            os.ftruncate(self._fd, _VERSION_SIZE)
+        self._map = mmap.mmap(self._fd, _VERSION_SIZE)
+
+    def read(self):
+        """Read the shared version, retrying if a write was in progress."""
+        while True:
+            first = struct.unpack_from(_VERSION_FORMAT, self._map)[0]
+            second = struct.unpack_from(_VERSION_FORMAT, self._map)[0]
+            if first == second:
+                return first
+
+    def write(self, version, force=False):
+        """Store a version unless a higher one is already stored (or force is set)."""
+        self._lock()
+        try:
+            if force or version > self.read():
+                struct.pack_into(_VERSION_FORMAT, self._map, 0, version)
+        finally:
+            self._unlock()
+
+    def close(self):
+        self._map.close()
+        os.close(self._fd)
+
+    def _lock(self):
+        if fcntl is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+
+    def _unlock(self):
+        if fcntl is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+
+class VersionOracle:
+    """In-memory copy of the global task version, advanced on commit.
+
+    The oracle is seeded from the database on first use and then kept
+    current by the session commit hook, so "is the client up to date"
+    checks are a memory comparison. Without a shared file only commits made
+    by this process are seen; multi-worker deployments must set a shared
+    file so every worker sees every commit.
+    """
+
+    def __init__(self, shared_path=None):
+        self._version = 0
+        self._seeded = False
+        self._lock = threading.Lock()
+        self._shared = SharedVersionFile(shared_path) if shared_path else None
+
+    def current(self, loader):
+        """Get the current version.
+
+        Args:
+            loader: Callable reading the version from the database, used once to seed the oracle
+        """
+        if not self._seeded:
+            self.seed(loader())
+        if self._shared is not None:
+            return self._shared.read()
+        return self._version
+
+    def seed(self, version):
+        """Initialize the oracle with the version read from the database."""
+        self.advance(version)
+        self._seeded = True
+
+    def advance(self, version):
+        """Record a committed version; older versions are ignored."""
+        with self._lock:
+            if version > self._version:
+                self._version = version
+        if self._shared is not None:
+            self._shared.write(version)
+
+    def reset(self, version=0):
+        """Force the version back, e.g. after the change journal was cleared."""
+        with self._lock:
+            self._version = version
+        if self._shared is not None:
+            self._shared.write(version, force=True)
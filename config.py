@@ -31,9 +31,46 @@ class Config:
     UPLOAD_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'uploads')
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max-limit
 
+    # Task sync configuration
+    SYNC_DELTA_MAX_LAG = 10000  # Clients further behind than this many versions get a full snapshot
+    TASK_SNAPSHOT_CACHE_ENTRIES = 8  # Max serialized task list/sync payloads kept in memory
+    TASK_SNAPSHOT_CACHE_BYTES = 32 * 1024 * 1024  # Max total size of cached payloads
+    TASK_TILE_CACHE_ENTRIES = 1024  # Max cached map tile payloads
+    TASK_TILE_CACHE_BYTES = 16 * 1024 * 1024  # Max total size of cached map tiles
+    TASK_TILE_GRID_SIZE = 8  # Cluster cells per tile side
+    STREAM_BATCH_SIZE = 500  # Rows fetched per batch for NDJSON streaming
+    CHANGE_JOURNAL_COMPACT_INTERVAL = 3600  # Seconds between change journal compactions by db_tools/db_maintenance_scheduler.py, 0 to disable
+    CHANGE_JOURNAL_PENDING_TTL = 60  # Seconds after which an uncommitted writer no longer holds the task version back
+    VERSION_ORACLE_PATH = None  # Memory-mapped task version file shared by all workers and scripts; enables 304s without queries
+    SOCKETIO_MESSAGE_QUEUE = None  # Message queue shared by workers (redis://..., amqp://... or local:// in one process), None for one worker
+    SOCKETIO_CHANNEL = 'flask-socketio'  # Message queue channel, one per deployment
+    SOCKETIO_PRESENCE_HEARTBEAT = 10  # Seconds between presence heartbeats of each worker
+    SOCKETIO_PRESENCE_TTL = 30  # Seconds without a heartbeat after which a worker's sessions are dropped
+    WEBSOCKET_ROLE_ROOMS = True  # Join connections to role:<role> rooms next to their user:<id> room
+    NOTIFICATION_COALESCE_WINDOW = 0  # Seconds notifications to one user are merged into one batch, 0 to send each at once
+    NOTIFICATION_COALESCE_MAX = 20  # Notifications buffered per user before the batch is sent early
+    NOTIFICATION_HISTORY_SIZE = 100  # Recent notifications kept in memory per user for replay on reconnect
+    NOTIFICATION_PERSIST = False  # Also store notifications in the database, for replay beyond the memory buffer and across workers
+    NOTIFICATION_REPLAY_MAX = 500  # Most notifications replayed from the database on one reconnect, and kept per user when pruning
+
     # Reports directory configuration
     REPORTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'reports')
 
+    # Range reports
+    REPORT_RANGE_PROCESSES = 0  # Processes formatting range report day sections in parallel; 0 or 1 formats inline
+    REPORT_RANGE_MAX_DAYS = 366  # Longest range a report may cover
+
+    # Background report jobs
+    REPORT_JOB_WORKERS = 2  # Reports generated concurrently, kept low to leave capacity for API traffic
+    REPORT_JOB_MAX_PENDING = 20  # Queued or running report jobs before new ones are rejected
+    REPORT_JOB_HISTORY = 100  # Finished jobs kept for status polling
+
+    # Scheduled report maintenance
+    REPORT_MAINTENANCE_TIME = None  # Off-peak local time (HH:MM) db_tools/db_maintenance_scheduler.py runs report maintenance at, e.g. '02:30'; None to disable
+    REPORT_PREGENERATE_FORMATS = ['txt']  # Formats of the previous day's report generated ahead of demand
+    REPORT_RETENTION_DAYS = 0  # Reports written longer ago are deleted by report maintenance, 0 to keep them
+    REPORT_RETENTION_MAX_BYTES = 0  # Total report size above which least recently used reports are deleted by report maintenance, 0 for no limit
+
 class TestConfig(Config):
     """Test environment configuration."""
     TESTING = True
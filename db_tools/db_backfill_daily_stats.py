@@ -0,0 +1,23 @@
+import os
+import sys
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+from app.services.report_service import ReportService
+
+def backfill_daily_stats():
+    """Rebuild the daily task statistics from existing tasks and logs."""
+    rows = ReportService.rebuild_daily_stats()
+    print(f"📊 Daily statistics rebuilt, {rows} rows written")
+
+if __name__ == "__main__":
+    # Create the Flask application instance
+    app = create_app()
+
+    with app.app_context():
+        try:
+            backfill_daily_stats()
+        except Exception as e:
+            print(f"❌ Error rebuilding daily statistics: {str(e)}")
+            raise
@@ -0,0 +1,23 @@
+import os
+import sys
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+from app.services.task_service import TaskService
+
+def backfill_geohash():
+    """Set the geohash of tasks created before it was maintained."""
+    updated = TaskService.backfill_geohashes()
+    print(f"🗺️  Geohash backfilled for {updated} tasks")
+
+if __name__ == "__main__":
+    # Create the Flask application instance
+    app = create_app()
+
+    with app.app_context():
+        try:
+            backfill_geohash()
+        except Exception as e:
+            print(f"❌ Error backfilling geohash: {str(e)}")
+            raise
@@ -4,13 +4,15 @@ import sys
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from app import create_app, db
-from app.models import User, Task, TaskLog, GlobalCounter   
+from app.models import User, Task, TaskLog, TaskDailyStats, NotificationLog, GlobalCounter   
 
 def clear_all_data():
     """Clear all data from the database."""
     # Delete records in dependency order (child tables first)
     db.session.query(TaskLog).delete()
     db.session.query(Task).delete()
+    db.session.query(TaskDailyStats).delete()
+    db.session.query(NotificationLog).delete()
     db.session.query(User).delete()
     db.session.commit()
     GlobalCounter.reset_counter()
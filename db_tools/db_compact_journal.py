@@ -0,0 +1,25 @@
+import os
+import sys
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+from app.services.task_service import TaskService
+
+def compact_journal(retention=None):
+    """Compact the task change journal."""
+    removed = TaskService.compact_change_journal(retention)
+    print(f"🧹 Compacted change journal, removed {removed} entries")
+
+if __name__ == "__main__":
+    # Optional retention (in versions) for delete entries, defaults to SYNC_DELTA_MAX_LAG
+    retention = int(sys.argv[1]) if len(sys.argv) > 1 else None
+
+    app = create_app()
+
+    with app.app_context():
+        try:
+            compact_journal(retention)
+        except Exception as e:
+            print(f"❌ Error compacting journal: {str(e)}")
+            raise
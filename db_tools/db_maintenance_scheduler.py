@@ -0,0 +1,59 @@
+import os
+import sys
+import time
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app, db
+from app.services.report_service import ReportService
+from db_compact_journal import compact_journal
+from db_prune_notifications import prune_notifications
+from db_report_maintenance import report_maintenance
+
+def run_schedule(app):
+    """Compact the change journal every CHANGE_JOURNAL_COMPACT_INTERVAL seconds, and run
+    report maintenance and prune stored notifications daily at REPORT_MAINTENANCE_TIME,
+    until interrupted.
+
+    Run one scheduler per deployment; the server processes do not run maintenance.
+    """
+    interval = app.config.get('CHANGE_JOURNAL_COMPACT_INTERVAL', 0)
+    maintenance_time = app.config.get('REPORT_MAINTENANCE_TIME')
+    if not interval and not maintenance_time:
+        print("⏸️  Nothing to schedule, set CHANGE_JOURNAL_COMPACT_INTERVAL or REPORT_MAINTENANCE_TIME")
+        return
+
+    next_compaction = time.monotonic() + interval if interval else None
+    next_maintenance = time.monotonic() + ReportService.seconds_until(maintenance_time) if maintenance_time else None
+    while True:
+        due = min(at for at in (next_compaction, next_maintenance) if at is not None)
+        time.sleep(max(due - time.monotonic(), 0))
+
+        with app.app_context():
+            if next_compaction is not None and time.monotonic() >= next_compaction:
+                try:
+                    compact_journal()
+                except Exception as e:
+                    db.session.rollback()
+                    print(f"❌ Error compacting journal: {str(e)}")
+                next_compaction = time.monotonic() + interval
+            if next_maintenance is not None and time.monotonic() >= next_maintenance:
+                try:
+                    report_maintenance()
+                except Exception as e:
+                    db.session.rollback()
+                    print(f"❌ Error running report maintenance: {str(e)}")
+                try:
+                    prune_notifications()
+                except Exception as e:
+                    db.session.rollback()
+                    print(f"❌ Error pruning notifications: {str(e)}")
+                next_maintenance = time.monotonic() + ReportService.seconds_until(maintenance_time)
+
+if __name__ == "__main__":
+    app = create_app()
+
+    try:
+        run_schedule(app)
+    except KeyboardInterrupt:
+        print("👋 Maintenance scheduler stopped")
@@ -0,0 +1,25 @@
+import os
+import sys
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+from app.services.websocket_service import WebSocketService
+
+def prune_notifications(keep=None):
+    """Delete stored notifications beyond each user's replay window."""
+    removed = WebSocketService.prune_notifications(keep)
+    print(f"🔔 Pruned {removed} stored notifications")
+
+if __name__ == "__main__":
+    # Optional number of latest notifications kept per user, defaults to NOTIFICATION_REPLAY_MAX
+    keep = int(sys.argv[1]) if len(sys.argv) > 1 else None
+
+    app = create_app()
+
+    with app.app_context():
+        try:
+            prune_notifications(keep)
+        except Exception as e:
+            print(f"❌ Error pruning notifications: {str(e)}")
+            raise
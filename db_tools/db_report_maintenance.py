@@ -0,0 +1,22 @@
+import os
+import sys
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+from app.services.report_service import ReportService
+
+def report_maintenance():
+    """Pre-generate yesterday's reports and enforce report retention."""
+    generated, deleted = ReportService.run_report_maintenance()
+    print(f"📄 Generated {len(generated)} reports, deleted {len(deleted)} old reports")
+
+if __name__ == "__main__":
+    app = create_app()
+
+    with app.app_context():
+        try:
+            report_maintenance()
+        except Exception as e:
+            print(f"❌ Error running report maintenance: {str(e)}")
+            raise
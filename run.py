@@ -51,7 +51,7 @@ def log_response_info(response):
     logger.debug('【STATUS】 %s', response.status)
     logger.debug('【HEADERS】\n%s', json.dumps(dict(response.headers), indent=2))
     
-    if response.direct_passthrough:
+    if response.direct_passthrough or response.is_streamed:
         logger.debug('【BODY】 [File or Stream Response]')
     else:
         try:
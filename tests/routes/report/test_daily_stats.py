@@ -0,0 +1,56 @@
+from datetime import datetime, timedelta
+from app import db
+from app.models import Task, TaskDailyStats
+from app.services.report_service import ReportService
+from config import Config
+
+def stats_rows():
+    """Get the non-empty daily statistics rows."""
+    return {
+        (row.day, row.status): (row.created_count, row.current_count, row.entered_count)
+        for row in TaskDailyStats.query.all()
+        if (row.created_count, row.current_count, row.entered_count) != (0, 0, 0)
+    }
+
+def test_daily_stats_maintained(app, add_user, add_task):
+    """Test task writes keep the daily statistics current and a rebuild reproduces them."""
+    ambulance_user = add_user('ambulance_user', 'password123', 'ambulance')
+    today = datetime.now(Config.SERVER_TIMEZONE).date()
+    yesterday = today - timedelta(days=1)
+
+    old_task = add_task(ambulance_user.id)
+    old_task.created_at = datetime.now(Config.SERVER_TIMEZONE) - timedelta(days=1)
+    db.session.commit()
+    task1 = add_task(ambulance_user.id).id
+    task2 = add_task(ambulance_user.id).id
+
+    # Test 1: Creations are counted per creation day and status
+    assert stats_rows() == {(yesterday, 'new'): (0, 1, 0), (today, 'new'): (3, 2, 0)}
+
+    # Test 2: Status changes move tasks and count the transition today
+    db.session.get(Task, task1).status = 'in_progress'
+    db.session.commit()
+    db.session.delete(db.session.get(Task, task2))
+    db.session.commit()
+    assert stats_rows() == {
+        (yesterday, 'new'): (0, 1, 0),
+        (today, 'new'): (3, 0, 0),
+        (today, 'in_progress'): (0, 1, 1)
+    }
+
+    # Test 3: Reports read the statistics
+    statistics = ReportService.get_task_statistics(today)
+    assert statistics['tasks_created_today'] == 1
+    assert statistics['task_status_distribution'] == {'in_progress': 1, 'new': 1}
+    statistics = ReportService.get_task_statistics(yesterday)
+    assert statistics['tasks_created_today'] == 1
+    assert statistics['task_status_distribution'] == {'new': 1}
+
+    # Test 4: The backfill rebuilds current counts from the tasks
+    TaskDailyStats.query.delete()
+    db.session.commit()
+    ReportService.rebuild_daily_stats()
+    assert {key: counts[1] for key, counts in stats_rows().items() if counts[1]} == {
+        (yesterday, 'new'): 1,
+        (today, 'in_progress'): 1
+    }
@@ -0,0 +1,72 @@
+from datetime import datetime, timedelta
+from app import db, init_report_pool
+from app.models import Task
+from app.services.report_service import ReportService
+from config import Config
+
+def test_range_report(client, add_user, login, add_task, tmp_path):
+    """Test range reports match the daily reports and include cross-day totals."""
+    admin_user = add_user('report_admin', 'password123', 'admin')
+    headers = {'Authorization': f'Bearer {login("report_admin", "password123")}'}
+    client.application.config['REPORTS_DIR'] = str(tmp_path)
+    assert 'report_pool' not in client.application.extensions  # Inline formatting by default
+    client.application.config['REPORT_RANGE_PROCESSES'] = 2
+    init_report_pool(client.application)
+    pool = client.application.extensions['report_pool']
+    assert pool._mp_context.get_start_method() == 'spawn'
+
+    today = datetime.now(Config.SERVER_TIMEZONE).date()
+    start = today - timedelta(days=2)
+    old_task = add_task(admin_user.id, status='issue_reported')
+    old_task.created_at = datetime.now(Config.SERVER_TIMEZONE) - timedelta(days=1)
+    db.session.commit()
+    task_id = add_task(admin_user.id).id
+    db.session.get(Task, task_id).status = 'in_progress'
+    db.session.commit()
+
+    try:
+        _check_range_report(client, headers, tmp_path, start, today)
+    finally:
+        pool.shutdown()
+
+def _check_range_report(client, headers, tmp_path, start, today):
+    # Test 1: One file with the totals and a section per day, generated in parallel
+    response = client.get(f'/api/generate-report?start_date={start}&end_date={today}', headers=headers)
+    assert response.status_code == 200
+    data = response.json['data']
+    assert data['filename'].startswith(f'range_task_report_{start}_{today}_')
+    content = (tmp_path / data['filename']).read_text(encoding='utf-8')
+    assert data['size'] == len(content.encode('utf-8'))
+    assert f"Task Statistics ({start} to {today})" in content
+    assert "Days: 3" in content
+    assert "Tasks Created: 2" in content
+    assert "  - in_progress: 1" in content
+    assert "Days With Reported Issues: 2" in content
+
+    # Test 2: Day sections match single-day reports, in order
+    for day in (start, start + timedelta(days=1), today):
+        section = ReportService.format_statistics_report(ReportService.get_task_statistics(day), day)
+        assert section in content
+    assert content.index(f"({start})") < content.index(f"({today})")
+
+    # Test 3: Unchanged ranges are served from the report cache
+    response = client.get(f'/api/generate-report?start_date={start}&end_date={today}', headers=headers)
+    assert response.json['data']['filename'] == data['filename']
+
+    # Test 4: Range validation
+    assert client.get(f'/api/generate-report?start_date={today}', headers=headers).status_code == 400
+    assert client.get(
+        f'/api/generate-report?start_date={today}&end_date={start}', headers=headers
+    ).status_code == 400
+    client.application.config['REPORT_RANGE_MAX_DAYS'] = 2
+    assert client.get(
+        f'/api/generate-report?start_date={start}&end_date={today}', headers=headers
+    ).status_code == 400
+
+    # Test 5: Range reports can run as background jobs
+    client.application.config['REPORT_RANGE_MAX_DAYS'] = 366
+    response = client.post('/api/reports/jobs', json={'start_date': str(start), 'end_date': str(start)}, headers=headers)
+    assert response.status_code == 202
+    job = client.application.extensions['report_jobs'].wait(response.json['data']['id'], timeout=30)
+    assert job.status == 'completed'
+    assert job.params == {'start_date': str(start), 'end_date': str(start)}
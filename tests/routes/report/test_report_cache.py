@@ -0,0 +1,48 @@
+import os
+from datetime import date
+from app import db
+from app.models import Task, TaskDailyStats, ReportFile
+from app.services.report_service import ReportService
+
+def test_report_cache(client, add_user, login, add_task, tmp_path):
+    """Test reports are reused until the underlying data changes."""
+    admin_user = add_user('report_admin', 'password123', 'admin')
+    headers = {'Authorization': f'Bearer {login("report_admin", "password123")}'}
+    reports_dir = tmp_path / "reports"
+    reports_dir.mkdir()
+    client.application.config['REPORTS_DIR'] = str(reports_dir)
+    task_id = add_task(admin_user.id, status='issue_reported').id
+
+    # Test 1: Generating again without changes returns the same file
+    first = client.get('/api/generate-report', headers=headers).json['data']
+    second = client.get('/api/generate-report', headers=headers).json['data']
+    assert second == first
+    assert os.listdir(reports_dir) == [first['filename']]
+    assert ReportFile.query.count() == 1
+
+    # Test 2: Reports for other dates are cached separately
+    client.get('/api/generate-report?date=2024-03-20', headers=headers)
+    assert len(os.listdir(reports_dir)) == 2
+
+    # Test 3: Data changes make the cached report stale
+    db.session.get(Task, task_id).status = 'in_progress'
+    db.session.commit()
+    ReportFile.query.filter_by(filename=first['filename']).update({'filename': 'renamed.txt'})
+    os.rename(reports_dir / first['filename'], reports_dir / 'renamed.txt')
+    db.session.commit()
+    third = client.get('/api/generate-report', headers=headers).json['data']
+    assert third['filename'] != 'renamed.txt'
+    assert "issue_reported: 1" not in third['report']
+
+    # Test 4: Entries whose file is gone are regenerated
+    os.remove(reports_dir / third['filename'])
+    fourth = client.get('/api/generate-report', headers=headers).json['data']
+    assert fourth['report'] == third['report']
+    assert os.path.exists(reports_dir / fourth['filename'])
+    assert ReportFile.query.filter_by(report_date=date.today()).count() == 2
+
+    # Test 5: Rebuilding the daily statistics without a task change makes the cached report stale
+    version = ReportService.get_data_version()
+    TaskDailyStats.query.update({'entered_count': TaskDailyStats.entered_count + 1})
+    db.session.commit()
+    assert ReportService.get_data_version() != version
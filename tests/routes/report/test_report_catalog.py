@@ -0,0 +1,70 @@
+import os
+from datetime import date, timedelta
+from app.models import ReportFile
+from app.services.report_service import ReportService
+
+def test_report_catalog(client, add_user, login, tmp_path):
+    """Test paginated, sorted and filtered listing from the report catalog."""
+    add_user('catalog_admin', 'password123', 'admin')
+    headers = {'Authorization': f'Bearer {login("catalog_admin", "password123")}'}
+    client.application.config['REPORTS_DIR'] = str(tmp_path)
+    today = date.today()
+    yesterday = today - timedelta(days=1)
+
+    def list_reports(**params):
+        response = client.get('/api/reports', query_string=params, headers=headers)
+        assert response.status_code == 200
+        return response.json['data']
+
+    # Test 1: Generated and deleted reports are recorded in the catalog
+    for report_date, report_format in ((yesterday, 'txt'), (today, 'txt'), (today, 'csv')):
+        response = client.get('/api/generate-report', query_string={'date': report_date.isoformat(), 'format': report_format}, headers=headers)
+        assert response.status_code == 200
+    data = list_reports()
+    assert data['total'] == 3
+    assert {file['report_date'] for file in data['files']} == {yesterday.isoformat(), today.isoformat()}
+
+    # Test 2: Filtering by date and format
+    assert [f['report_date'] for f in list_reports(start_date=today.isoformat())['files']] == [today.isoformat()] * 2
+    assert list_reports(end_date=yesterday.isoformat())['total'] == 1
+    only_csv = list_reports(format='csv')
+    assert only_csv['total'] == 1 and only_csv['files'][0]['name'].endswith('.csv')
+
+    # Test 3: Sorting and pagination
+    names = [file['name'] for file in list_reports(sort='name', order='asc')['files']]
+    assert names == sorted(names)
+    page = list_reports(sort='name', order='asc', limit=2, offset=1)
+    assert page['total'] == 3
+    assert [file['name'] for file in page['files']] == names[1:3]
+
+    # Test 4: Listing does not scan the directory while it is unchanged, or only changed by the service
+    scans = client.application.extensions['report_catalog_scans']
+    scans[os.path.abspath(tmp_path)] = (os.stat(tmp_path).st_mtime_ns, True)
+    assert client.delete(f'/api/reports/{names[0]}', headers=headers).status_code == 200
+    assert ReportFile.query.filter_by(filename=names[0]).first() is None
+    stat = os.stat(tmp_path)
+    assert scans[os.path.abspath(tmp_path)] == (stat.st_mtime_ns, True)
+    (tmp_path / names[1]).unlink()
+    os.utime(tmp_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert list_reports()['total'] == 2
+    with client.application.app_context():
+        ReportService.sync_catalog(full=True)
+    assert list_reports()['total'] == 1
+
+    # Test 5: Files added or removed by hand are picked up once the directory changes
+    (tmp_path / 'range_task_report_2024-03-01_2024-03-05_10-00-00.csv').write_text('record\n')
+    data = list_reports(start_date='2024-03-04', end_date='2024-03-10')
+    assert data['total'] == 1
+    assert data['files'][0]['end_date'] == '2024-03-05'
+    assert data['files'][0]['format'] == 'csv'
+    assert list_reports()['total'] == 2
+
+    # Test 6: Generating a report moves the scan marker along
+    scans[os.path.abspath(tmp_path)] = (os.stat(tmp_path).st_mtime_ns, True)
+    client.get('/api/generate-report', query_string={'date': yesterday.isoformat(), 'format': 'ndjson'}, headers=headers)
+    assert scans[os.path.abspath(tmp_path)] == (os.stat(tmp_path).st_mtime_ns, True)
+    assert list_reports()['total'] == 3
+
+    # Test 7: Invalid arguments are rejected
+    for params in ({'sort': 'owner'}, {'order': 'up'}, {'limit': 'x'}, {'start_date': '03/01/2024'}):
+        assert client.get('/api/reports', query_string=params, headers=headers).status_code == 400
@@ -0,0 +1,69 @@
+import csv
+import gzip
+import io
+import json
+from datetime import date, timedelta
+from app.models import TaskLog
+from app import db
+
+def test_report_formats(client, add_user, login, add_task, tmp_path):
+    """Test machine-readable report formats and their downloads."""
+    admin_user = add_user('report_admin', 'password123', 'admin')
+    headers = {'Authorization': f'Bearer {login("report_admin", "password123")}'}
+    client.application.config['REPORTS_DIR'] = str(tmp_path)
+    task = add_task(admin_user.id, status='issue_reported', title='Flooded street')
+    db.session.add(TaskLog(task_id=task.id, status='issue_reported', modified_by=admin_user.id, note='Water, deep'))
+    db.session.commit()
+
+    def generate(report_format, **params):
+        response = client.get('/api/generate-report', query_string={'format': report_format, **params}, headers=headers)
+        assert response.status_code == 200
+        data = response.json['data']
+        assert 'report' not in data
+        return (tmp_path / data['filename']).read_text(encoding='utf-8'), data
+
+    # Test 1: CSV rows share one header
+    content, data = generate('csv')
+    assert data['filename'].endswith('.csv')
+    rows = list(csv.DictReader(io.StringIO(content)))
+    assert [row['record'] for row in rows] == ['day', 'status', 'issue', 'log']
+    assert rows[2]['title'] == 'Flooded street'
+    assert rows[3]['note'] == 'Water, deep'
+
+    # Test 2: NDJSON has one record per line
+    content, data = generate('ndjson')
+    records = [json.loads(line) for line in content.splitlines()]
+    assert records[0] == {'record': 'day', 'date': date.today().isoformat(), 'count': 1}
+
+    # Test 3: Columnar files hold a schema line and column blocks
+    content, data = generate('columnar')
+    assert data['filename'].endswith('.columnar.ndjson')
+    schema, block = [json.loads(line) for line in content.splitlines()]
+    assert block['rows'] == 4
+    assert block['data'][schema['columns'].index('record')] == ['day', 'status', 'issue', 'log']
+
+    # Test 4: Range reports start with the total records
+    start = date.today() - timedelta(days=1)
+    content, data = generate('ndjson', start_date=start.isoformat(), end_date=date.today().isoformat())
+    records = [json.loads(line) for line in content.splitlines()]
+    assert records[0]['record'] == 'total_days' and records[0]['count'] == 2
+    assert [r['date'] for r in records if r['record'] == 'day'] == [start.isoformat(), date.today().isoformat()]
+
+    # Test 5: Downloads are gzip encoded for clients accepting it
+    url = data['download_url']
+    response = client.get(url, headers={**headers, 'Accept-Encoding': 'gzip'})
+    assert response.status_code == 200
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert response.headers['Content-Type'] == 'application/x-ndjson'
+    assert gzip.decompress(response.data).decode('utf-8') == content
+    etag = response.headers['ETag']
+    assert client.get(url, headers={**headers, 'Accept-Encoding': 'gzip', 'If-None-Match': etag}).status_code == 304
+
+    # Test 6: Range requests get the raw bytes
+    response = client.get(url, headers={**headers, 'Accept-Encoding': 'gzip', 'Range': 'bytes=0-9'})
+    assert response.status_code == 206
+    assert 'Content-Encoding' not in response.headers
+    assert response.data == content.encode('utf-8')[:10]
+
+    # Test 7: Unknown formats are rejected
+    assert client.get('/api/generate-report?format=xlsx', headers=headers).status_code == 400
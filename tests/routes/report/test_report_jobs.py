@@ -0,0 +1,104 @@
+import os
+import threading
+from flask_socketio import SocketIOTestClient
+from app import socketio
+from app.models import BackgroundJob
+from app.utils.job_queue import JobQueue
+
+def test_report_jobs(client, add_user, login, add_task, tmp_path):
+    """Test queuing report generation and polling its status."""
+    admin_user = add_user('report_admin', 'password123', 'admin')
+    add_user('normal_user', 'password123', 'ambulance')
+    admin_token = login('report_admin', 'password123')
+    headers = {'Authorization': f'Bearer {admin_token}'}
+    normal_headers = {'Authorization': f'Bearer {login("normal_user", "password123")}'}
+    client.application.config['REPORTS_DIR'] = str(tmp_path)
+    add_task(admin_user.id, status='issue_reported')
+    jobs = client.application.extensions['report_jobs']
+    socket_client = SocketIOTestClient(client.application, socketio, namespace='/', auth={'token': admin_token})
+
+    try:
+        # Test 1: Jobs are queued and complete in the background
+        response = client.post('/api/reports/jobs', json={'date': '2024-03-20'}, headers=headers)
+        assert response.status_code == 202
+        job_id = response.json['data']['id']
+        jobs.wait(job_id, timeout=10)
+
+        response = client.get(f'/api/reports/jobs/{job_id}', headers=headers)
+        assert response.status_code == 200
+        job = response.json['data']
+        assert job['status'] == 'completed'
+        assert job['progress'] == 100
+        assert job['params'] == {'date': '2024-03-20'}
+        assert os.listdir(tmp_path) == [job['result']['filename']]
+        assert client.get(job['result']['download_url'], headers=headers).status_code == 200
+
+        # Test 2: The requesting user is notified on completion
+        events = [e for e in socket_client.get_received('/') if e['name'] == 'report_job_completed']
+        assert [e['args'][0]['id'] for e in events] == [job_id]
+
+        # Test 3: Another worker process answers status polls from the database
+        other_worker = JobQueue(client.application)
+        try:
+            assert other_worker.get(job_id).to_dict() == job
+        finally:
+            other_worker.shutdown()
+        jobs._jobs.clear()
+        response = client.get(f'/api/reports/jobs/{job_id}', headers=headers)
+        assert response.status_code == 200
+        assert response.json['data'] == job
+
+        # Test 4: Validation and access control
+        assert client.post('/api/reports/jobs', json={'date': '2999-01-01'}, headers=headers).status_code == 400
+        assert client.post('/api/reports/jobs', json={'date': 'tomorrow'}, headers=headers).status_code == 400
+        assert client.post('/api/reports/jobs', headers=normal_headers).status_code == 403
+        assert client.get('/api/reports/jobs/unknown', headers=headers).status_code == 404
+    finally:
+        socket_client.disconnect()
+
+def test_job_queue_limits(app):
+    """Test identical pending jobs are shared and the queue is bounded."""
+    queue = JobQueue(app, max_workers=1, max_pending=2)
+    release = threading.Event()
+    try:
+        def blocked(job):
+            release.wait(10)
+            return 'done'
+
+        first, created = queue.submit('report', 'a', {}, blocked)
+        assert created
+        duplicate, created = queue.submit('report', 'a', {}, blocked)
+        assert duplicate is first and not created
+        second, created = queue.submit('report', 'b', {}, blocked)
+        assert created
+        assert queue.submit('report', 'c', {}, blocked) == (None, False)
+
+        release.set()
+        assert queue.wait(first.id, timeout=10).result == 'done'
+        assert queue.wait(second.id, timeout=10).status == 'completed'
+
+        # Finished jobs free their key
+        third, created = queue.submit('report', 'a', {}, blocked)
+        assert created and third is not first
+        queue.wait(third.id, timeout=10)
+
+        # Stored job status is pruned to the history limit
+        queue.history = 1
+        fourth, _ = queue.submit('report', 'd', {}, blocked)
+        queue.wait(fourth.id, timeout=10)
+        assert [job.id for job in BackgroundJob.query.all()] == [fourth.id]
+
+        # Work runs off the hub thread, completion handlers on it so they can emit
+        threads = {}
+        def record(job):
+            threads['run'] = threading.current_thread()
+            return 'done'
+        def on_finish(job):
+            threads['finish'] = threading.current_thread()
+        fifth, _ = queue.submit('report', 'e', {}, record, on_finish=on_finish)
+        queue.wait(fifth.id, timeout=10)
+        assert threads['run'] is not threading.main_thread()
+        assert threads['finish'] is threading.main_thread()
+    finally:
+        release.set()
+        queue.shutdown()
@@ -0,0 +1,51 @@
+import os
+from datetime import date, datetime, timedelta
+from app import db
+from app.models import ReportFile
+from app.services.report_service import ReportService
+from config import Config
+
+def test_report_maintenance(client, add_user, login, tmp_path):
+    """Test report pre-generation and retention by age and size."""
+    add_user('maintenance_admin', 'password123', 'admin')
+    headers = {'Authorization': f'Bearer {login("maintenance_admin", "password123")}'}
+    app = client.application
+    app.config.update(REPORTS_DIR=str(tmp_path), REPORT_PREGENERATE_FORMATS=['txt', 'csv'])
+    yesterday = date.today() - timedelta(days=1)
+
+    with app.app_context():
+        # Test 1: Yesterday's reports are generated once and then served from the cache
+        generated = ReportService.pregenerate_reports()
+        assert len(generated) == 2
+        assert all(name.startswith(f"daily_task_report_{yesterday.isoformat()}") for name in generated)
+        assert ReportService.pregenerate_reports() == generated
+    response = client.get('/api/generate-report', query_string={'date': yesterday.isoformat()}, headers=headers)
+    assert response.json['data']['filename'] == generated[0]
+
+    now = datetime.now(Config.SERVER_TIMEZONE)
+    with app.app_context():
+        # Test 2: Reports older than the retention period are deleted
+        old = tmp_path / 'daily_task_report_2020-01-01_10-00-00.txt'
+        old.write_text('x' * 100)
+        ReportService.sync_catalog()
+        ReportFile.query.filter_by(filename=old.name).update({'created_at': now - timedelta(days=100)})
+        db.session.commit()
+        assert ReportService.enforce_retention(max_age_days=90, max_bytes=0) == [old.name]
+        assert not old.exists()
+
+        # Test 3: Least recently used reports are evicted above the size limit
+        for index, name in enumerate(generated):
+            ReportFile.query.filter_by(filename=name).update({'accessed_at': now - timedelta(hours=2 - index)})
+        db.session.commit()
+    client.get(f'/api/reports/{generated[0]}', headers=headers)
+    with app.app_context():
+        sizes = {entry.filename: entry.size for entry in ReportFile.query.all()}
+        deleted = ReportService.enforce_retention(max_age_days=0, max_bytes=sizes[generated[0]])
+        assert deleted == [generated[1]]
+        assert os.listdir(tmp_path) == [generated[0]]
+        assert [entry.filename for entry in ReportFile.query.all()] == [generated[0]]
+
+    # Test 4: Scheduling at an off-peak time of day
+    now = Config.SERVER_TIMEZONE.localize(datetime(2024, 3, 20, 1, 0))
+    assert ReportService.seconds_until('02:30', now) == 5400
+    assert ReportService.seconds_until('00:30', now) == 23.5 * 3600
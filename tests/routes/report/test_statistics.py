@@ -0,0 +1,52 @@
+from sqlalchemy import event
+from app import db
+from app.models import Task, TaskLog
+from app.services.report_service import ReportService
+
+def test_task_statistics_queries(app, add_user, add_task):
+    """Test report statistics use a fixed number of queries and keep their content."""
+    ambulance_user = add_user('ambulance_user', 'password123', 'ambulance')
+    cleaner = add_user('cleaner', 'password123', 'cleaning_team')
+
+    def add_issue():
+        task = add_task(ambulance_user.id, status='issue_reported', assigned_to=cleaner.id)
+        db.session.add_all([
+            TaskLog(task_id=task.id, status='new', assigned_to=ambulance_user.id, modified_by=ambulance_user.id),
+            TaskLog(task_id=task.id, status='issue_reported', assigned_to=cleaner.id,
+                    modified_by=cleaner.id, note='Blocked road')
+        ])
+        db.session.commit()
+        return task.id
+
+    def count_queries():
+        statements = []
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+        db.session.expire_all()
+        event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            statistics = ReportService.get_task_statistics()
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record)
+        return statistics, len(statements)
+
+    first_issue = add_issue()
+    add_task(ambulance_user.id, status='completed')
+    statistics, queries = count_queries()
+
+    # Test 1: Content is unchanged
+    assert statistics['tasks_created_today'] == 2
+    assert statistics['task_status_distribution'] == {'issue_reported': 1, 'completed': 1}
+    issue = statistics['reported_issues'][0]
+    assert issue[:5] == [first_issue, 'Default Task Title', 'Sample description', 'ambulance_user', 'cleaner']
+    assert [(log['status'], log['assigned_to'], log['note']) for log in issue[7]] == [
+        ('new', 'ambulance_user', None),
+        ('issue_reported', 'cleaner', 'Blocked road')
+    ]
+
+    # Test 2: More issues do not add queries
+    for _ in range(10):
+        add_issue()
+    statistics, more_queries = count_queries()
+    assert len(statistics['reported_issues']) == 11
+    assert more_queries == queries
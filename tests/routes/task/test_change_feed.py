@@ -0,0 +1,178 @@
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+from app import create_app, db
+from app.models import Task, TaskChange, GlobalCounter, PendingTaskChange, User
+from config import Config
+from app.services.task_service import TaskService
+
+def test_change_feed(client, add_user, login, add_task):
+    """Test the change journal feed and its pagination."""
+    ambulance_user = add_user('ambulance_user', 'password123', 'ambulance')
+    headers = {'Authorization': f'Bearer {login("ambulance_user", "password123")}'}
+
+    task1 = add_task(ambulance_user.id).id
+    task2 = add_task(ambulance_user.id).id
+    db.session.get(Task, task1).status = 'in_progress'
+    db.session.commit()
+    db.session.delete(db.session.get(Task, task2))
+    db.session.commit()
+
+    # Test 1: Every change is journaled in order and the version is the latest sequence number
+    response = client.get('/api/changes', headers=headers)
+    assert response.status_code == 200
+    data = response.json['data']
+    assert [(c['task_id'], c['op']) for c in data['changes']] == [
+        (task1, 'insert'), (task2, 'insert'), (task1, 'update'), (task2, 'delete')
+    ]
+    seqs = [c['seq'] for c in data['changes']]
+    assert seqs == sorted(seqs)
+    assert data['version'] == seqs[-1] == GlobalCounter.current_value()
+    assert db.session.get(Task, task1).change_version == seqs[2]
+    assert data['has_more'] is False
+
+    # Test 2: Pagination resumes after next_after
+    response = client.get('/api/changes?after=0&limit=3', headers=headers)
+    data = response.json['data']
+    assert data['has_more'] is True
+    response = client.get(f'/api/changes?after={data["next_after"]}', headers=headers)
+    assert [c['op'] for c in response.json['data']['changes']] == ['delete']
+
+    # Test 3: Invalid parameters
+    assert client.get('/api/changes?after=abc', headers=headers).status_code == 400
+    assert client.get('/api/changes?limit=0', headers=headers).status_code == 400
+    assert client.get('/api/changes').status_code == 401
+
+def test_change_journal_compaction(client, add_user, login, add_task):
+    """Test compaction keeps the latest entries and raises the floor."""
+    ambulance_user = add_user('ambulance_user', 'password123', 'ambulance')
+    headers = {'Authorization': f'Bearer {login("ambulance_user", "password123")}'}
+
+    task1 = add_task(ambulance_user.id).id
+    task2 = add_task(ambulance_user.id).id
+    db.session.delete(db.session.get(Task, task2))
+    db.session.commit()
+    db.session.get(Task, task1).status = 'in_progress'
+    db.session.commit()
+    version = GlobalCounter.current_value()
+
+    # Test 1: Superseded entries go, the delete tombstone stays within retention
+    assert TaskService.compact_change_journal() == 2
+    assert [(c.task_id, c.op) for c in TaskChange.query.order_by(TaskChange.seq)] == [
+        (task2, 'delete'), (task1, 'update')
+    ]
+    assert GlobalCounter.current_value() == version
+    assert client.get('/api/changes?after=0', headers=headers).status_code == 200
+
+    # Test 2: Expired tombstones are removed and older cursors are rejected
+    assert TaskService.compact_change_journal(retention=0) == 1
+    assert GlobalCounter.current_value() == version
+    floor = GlobalCounter.floor_value()
+    assert 0 < floor < version
+    assert client.get('/api/changes?after=0', headers=headers).status_code == 410
+    assert client.get(f'/api/changes?after={floor}', headers=headers).status_code == 200
+
+    # Test 3: Delta syncs from behind the floor fall back to a full snapshot
+    response = client.get(f'/api/tasks/sync?version={floor - 1}&mode=delta', headers=headers)
+    assert response.json['data']['mode'] == 'full'
+
+    # Test 4: Sequence numbers keep increasing after compaction
+    add_task(ambulance_user.id)
+    assert GlobalCounter.current_value() > version
+
+def _journal_task(session, user_id, title):
+    """Add a task in a session and flush it, allocating its sequence number."""
+    session.add(Task(title=title, description="Sample description", created_by=user_id,
+                     status='new', location_lat=0.0, location_lon=0.0))
+    session.flush()
+    return session.info['task_version']
+
+def test_interleaved_writers_commit_in_sequence_order(tmp_path):
+    """Test that a sequence number only becomes visible after every lower one."""
+    app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'journal.db'}",
+        'SQLALCHEMY_ENGINE_OPTIONS': {'connect_args': {'timeout': 0.1}},
+        'JWT_SECRET_KEY': 'test-secret-key',
+    })
+    with app.app_context():
+        db.create_all()
+        user = User(username='ambulance_user', role='ambulance')
+        user.set_password('password123')
+        db.session.add(user)
+        db.session.commit()
+
+        first, second = Session(db.engine), Session(db.engine)
+        try:
+            # Test 1: While the first writer holds an uncommitted sequence number, the second cannot journal
+            first_seq = _journal_task(first, user.id, "First")
+            with pytest.raises(OperationalError):
+                _journal_task(second, user.id, "Second")
+            second.rollback()
+            assert TaskService.list_changes(0)['changes'] == []
+
+            # Test 2: Once the first commits, the second gets a higher sequence number
+            first.commit()
+            second_seq = _journal_task(second, user.id, "Second")
+            assert second_seq > first_seq
+            assert [c['seq'] for c in TaskService.list_changes(0)['changes']] == [first_seq]
+            second.commit()
+            page = TaskService.list_changes(0)
+            assert [c['seq'] for c in page['changes']] == [first_seq, second_seq]
+            assert page['version'] == second_seq
+        finally:
+            first.close()
+            second.close()
+            db.session.remove()
+            db.drop_all()
+
+def test_pending_writers_hold_the_version_back(tmp_path, monkeypatch):
+    """Test that the version stops below changes uncommitted writers may still commit."""
+    monkeypatch.setattr(PendingTaskChange, 'tracked', staticmethod(lambda: True))
+    app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'journal.db'}",
+        'JWT_SECRET_KEY': 'test-secret-key',
+    })
+    with app.app_context():
+        db.create_all()
+        user = User(username='ambulance_user', role='ambulance')
+        user.set_password('password123')
+        db.session.add(user)
+        db.session.commit()
+        writer = Session(db.engine)
+        try:
+            # Test 1: A writer is registered from before its first change until it commits
+            first_seq = _journal_task(writer, user.id, "First")
+            assert [p.floor_seq for p in PendingTaskChange.query.all()] == [first_seq - 1]
+            writer.commit()
+            assert PendingTaskChange.query.count() == 0
+            assert GlobalCounter.current_value() == first_seq
+
+            # Test 2: A writer of another worker holds back changes committed after its registration
+            db.session.add(PendingTaskChange(floor_seq=first_seq, created_at=datetime.now(Config.SERVER_TIMEZONE)))
+            db.session.commit()
+            second_seq = _journal_task(writer, user.id, "Second")
+            writer.commit()
+            assert second_seq > first_seq
+            assert GlobalCounter.current_value() == first_seq
+            page = TaskService.list_changes(0)
+            assert [c['seq'] for c in page['changes']] == [first_seq]
+            assert page['version'] == first_seq
+
+            # Test 3: Rolled back writers are released as well
+            _journal_task(writer, user.id, "Rolled back")
+            writer.rollback()
+            assert PendingTaskChange.query.count() == 1
+
+            # Test 4: Registrations of crashed workers expire and are pruned by compaction
+            PendingTaskChange.query.update({'created_at': datetime.now(Config.SERVER_TIMEZONE) - timedelta(minutes=5)})
+            db.session.commit()
+            assert GlobalCounter.current_value() == second_seq
+            TaskService.compact_change_journal()
+            assert PendingTaskChange.query.count() == 0
+        finally:
+            writer.close()
+            db.session.remove()
+            db.drop_all()
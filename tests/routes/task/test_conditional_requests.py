@@ -0,0 +1,71 @@
+from app import db
+from app.models import Task, TaskLog
+
+def test_task_list_etag(client, add_user, login, add_task):
+    """Test ETag handling on the task list."""
+    ambulance_user = add_user('ambulance_user', 'password123', 'ambulance')
+    headers = {'Authorization': f'Bearer {login("ambulance_user", "password123")}'}
+    task_id = add_task(ambulance_user.id).id
+
+    response = client.get('/api/tasks', headers=headers)
+    assert response.status_code == 200
+    etag = response.headers['ETag']
+
+    # Unchanged list returns 304 with an empty body
+    response = client.get('/api/tasks', headers={**headers, 'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.data == b''
+    assert response.headers['ETag'] == etag
+
+    # Different arguments produce a different ETag
+    response = client.get('/api/tasks?status=new', headers={**headers, 'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+
+    # Any task change invalidates the ETag
+    db.session.get(Task, task_id).status = 'in_progress'
+    db.session.commit()
+    response = client.get('/api/tasks', headers={**headers, 'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+
+def test_task_detail_and_logs_etag(client, add_user, login, add_task):
+    """Test ETag handling on task details and task logs."""
+    ambulance_user = add_user('ambulance_user', 'password123', 'ambulance')
+    headers = {'Authorization': f'Bearer {login("ambulance_user", "password123")}'}
+    task_id = add_task(ambulance_user.id).id
+    other_task_id = add_task(ambulance_user.id).id
+    db.session.add(TaskLog(task_id=task_id, status='new', modified_by=ambulance_user.id, note='First'))
+    db.session.commit()
+
+    detail = client.get(f'/api/tasks/{task_id}', headers=headers)
+    logs = client.get(f'/api/tasks/{task_id}/logs', headers=headers)
+    assert detail.status_code == 200 and logs.status_code == 200
+    detail_etag = detail.headers['ETag']
+    logs_etag = logs.headers['ETag']
+    assert detail_etag.startswith('W/')
+
+    assert client.get(f'/api/tasks/{task_id}', headers={**headers, 'If-None-Match': detail_etag}).status_code == 304
+    assert client.get(f'/api/tasks/{task_id}/logs', headers={**headers, 'If-None-Match': logs_etag}).status_code == 304
+
+    # Changes to other tasks keep this task's ETags valid
+    db.session.get(Task, other_task_id).status = 'in_progress'
+    db.session.commit()
+    assert client.get(f'/api/tasks/{task_id}', headers={**headers, 'If-None-Match': detail_etag}).status_code == 304
+
+    # A new log changes both ETags even without a task update
+    db.session.add(TaskLog(task_id=task_id, status='new', modified_by=ambulance_user.id, note='Second'))
+    db.session.commit()
+    response = client.get(f'/api/tasks/{task_id}', headers={**headers, 'If-None-Match': detail_etag})
+    assert response.status_code == 200
+    assert len(response.json['data']['task']['logs']) == 2
+    assert client.get(f'/api/tasks/{task_id}/logs', headers={**headers, 'If-None-Match': logs_etag}).status_code == 200
+
+    # A task update changes the detail ETag
+    detail_etag = response.headers['ETag']
+    db.session.get(Task, task_id).status = 'in_progress'
+    db.session.commit()
+    assert client.get(f'/api/tasks/{task_id}', headers={**headers, 'If-None-Match': detail_etag}).status_code == 200
+
+    # Missing tasks still return 404
+    assert client.get('/api/tasks/9999', headers={**headers, 'If-None-Match': detail_etag}).status_code == 404
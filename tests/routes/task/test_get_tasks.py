@@ -258,3 +258,98 @@ def test_get_task_details(client, add_user, login):
     assert logs[2]['status'] == 'new'
     assert logs[2]['note'] == f'Task created by ambulance {ambulance_user.id}'
 
+
+def test_task_snapshot_cache(client, add_user, login, add_task):
+    """Test task list and sync payloads are served from the version-keyed cache."""
+    from app.utils.cache import task_snapshot_cache
+
+    ambulance_user = add_user('ambulance_user', 'password123', 'ambulance')
+    headers = {'Authorization': f'Bearer {login("ambulance_user", "password123")}'}
+    task = add_task(ambulance_user.id, title='Cached Task')
+    task_id = task.id
+
+    # First request builds the payload, second request reuses the same bytes
+    first = client.get('/api/tasks', headers=headers)
+    assert first.status_code == 200
+    assert len(task_snapshot_cache) == 1
+    second = client.get('/api/tasks', headers=headers)
+    assert second.data == first.data
+    assert second.json['message'] == 'Tasks retrieved successfully'
+    assert [t['title'] for t in second.json['data']] == ['Cached Task']
+
+    # Full sync payloads are cached separately
+    response = client.get('/api/tasks/sync', headers=headers)
+    assert response.status_code == 200
+    assert len(task_snapshot_cache) == 2
+
+    # Task writes invalidate the cache and the next request sees the change
+    task = db.session.get(Task, task_id)
+    task.title = 'Renamed Task'
+    db.session.commit()
+    assert len(task_snapshot_cache) == 0
+
+    response = client.get('/api/tasks', headers=headers)
+    assert [t['title'] for t in response.json['data']] == ['Renamed Task']
+
+
+def test_versioned_cache_bounds():
+    """Test the cache evicts least recently used entries to stay in bounds."""
+    from app.utils.cache import VersionedCache
+
+    cache = VersionedCache(max_entries=2, max_bytes=10)
+    cache.put('a', b'1234')
+    cache.put('b', b'1234')
+    cache.get('a')
+    cache.put('c', b'1234')
+    assert cache.get('b') is None  # Least recently used entry evicted
+    assert cache.get('a') == b'1234'
+
+    cache.put('d', b'12345678')
+    assert len(cache) == 1  # Byte limit enforced
+    cache.put('e', b'12345678901')
+    assert cache.get('e') is None  # Oversized payloads are never cached
+
+    builds = []
+    assert cache.get_or_build('f', lambda: builds.append(1) or b'x') == b'x'
+    assert cache.get_or_build('f', lambda: builds.append(1) or b'y') == b'x'
+    assert len(builds) == 1
+
+def test_task_list_query_count(client, add_user, login, add_task):
+    """Test listing tasks uses a constant number of queries regardless of task count."""
+    from sqlalchemy import event
+    from app.utils.cache import task_snapshot_cache
+
+    ambulance_user = add_user('ambulance_user', 'password123', 'ambulance')
+    cleaning_user = add_user('cleaning_user', 'password123', 'cleaning_team')
+    headers = {'Authorization': f'Bearer {login("ambulance_user", "password123")}'}
+
+    statements = []
+    def count_queries(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    def queries_for(url):
+        task_snapshot_cache.invalidate()
+        db.session.expire_all()
+        statements.clear()
+        event.listen(db.engine, 'before_cursor_execute', count_queries)
+        try:
+            response = client.get(url, headers=headers)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', count_queries)
+        assert response.status_code == 200
+        return len(statements)
+
+    add_task(ambulance_user.id, assigned_to=cleaning_user.id)
+    list_queries = queries_for('/api/tasks')
+    sync_queries = queries_for('/api/tasks/sync')
+
+    for _ in range(5):
+        add_task(ambulance_user.id, assigned_to=cleaning_user.id)
+    assert queries_for('/api/tasks') == list_queries
+    assert queries_for('/api/tasks/sync') == sync_queries
+
+    # Serialized output still includes the user names
+    response = client.get('/api/tasks', headers=headers)
+    for task in response.json['data']:
+        assert task['created_by_username'] == 'ambulance_user'
+        assert task['assigned_to_username'] == 'cleaning_user'
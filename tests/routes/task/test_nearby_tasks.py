@@ -0,0 +1,67 @@
+from app import db
+from app.models import Task
+from app.services.task_service import TaskService
+from app.utils.geo import encode_geohash, covering_prefixes, haversine_m
+
+def test_nearby_tasks(client, add_user, login, add_task):
+    """Test the nearby task search endpoint."""
+    ambulance_user = add_user('ambulance_user', 'password123', 'ambulance')
+    headers = {'Authorization': f'Bearer {login("ambulance_user", "password123")}'}
+
+    # Tasks around Milan at increasing distances, plus one in Rome
+    center = (45.4642, 9.1900)
+    close_task = add_task(ambulance_user.id, title='Close', location_lat=45.4650, location_lon=9.1900).id
+    mid_task = add_task(ambulance_user.id, title='Mid', location_lat=45.4700, location_lon=9.1950, status='in_progress').id
+    far_task = add_task(ambulance_user.id, title='Far', location_lat=45.5100, location_lon=9.1900).id
+    add_task(ambulance_user.id, title='Rome', location_lat=41.9028, location_lon=12.4964)
+
+    # Test 1: Results within the radius, ranked by distance
+    response = client.get(f'/api/tasks/nearby?lat={center[0]}&lon={center[1]}&radius_m=1000', headers=headers)
+    assert response.status_code == 200
+    tasks = response.json['data']
+    assert [task['id'] for task in tasks] == [close_task, mid_task]
+    assert tasks[0]['distance_m'] < tasks[1]['distance_m'] <= 1000
+    assert abs(tasks[0]['distance_m'] - haversine_m(*center, 45.4650, 9.1900)) < 0.1
+
+    # Test 2: Larger radius and limit
+    response = client.get(f'/api/tasks/nearby?lat={center[0]}&lon={center[1]}&radius_m=10000&limit=3', headers=headers)
+    assert [task['id'] for task in response.json['data']] == [close_task, mid_task, far_task]
+
+    # Test 3: Status filter
+    response = client.get(f'/api/tasks/nearby?lat={center[0]}&lon={center[1]}&radius_m=10000&status=in_progress', headers=headers)
+    assert [task['id'] for task in response.json['data']] == [mid_task]
+
+    # Test 4: Moving a task updates its geohash
+    task = db.session.get(Task, far_task)
+    task.location_lat, task.location_lon = 45.4643, 9.1901
+    db.session.commit()
+    assert db.session.get(Task, far_task).geohash == encode_geohash(45.4643, 9.1901)
+    response = client.get(f'/api/tasks/nearby?lat={center[0]}&lon={center[1]}&radius_m=100', headers=headers)
+    assert [task['id'] for task in response.json['data']] == [far_task, close_task]
+
+    # Test 5: Invalid parameters
+    assert client.get('/api/tasks/nearby?lat=45.4', headers=headers).status_code == 400
+    assert client.get('/api/tasks/nearby?lat=95&lon=9', headers=headers).status_code == 400
+    assert client.get('/api/tasks/nearby?lat=45&lon=9&radius_m=-5', headers=headers).status_code == 400
+    assert client.get('/api/tasks/nearby?lat=45&lon=9&radius_m=1000000', headers=headers).status_code == 400
+
+    # Test 6: Tasks without a geohash are still found, and can be backfilled
+    Task.query.filter(Task.id.in_([close_task, mid_task])).update({'geohash': None})
+    db.session.commit()
+    response = client.get(f'/api/tasks/nearby?lat={center[0]}&lon={center[1]}&radius_m=1000', headers=headers)
+    assert [task['id'] for task in response.json['data']] == [far_task, close_task, mid_task]
+    version = db.session.get(Task, close_task).change_version
+    assert TaskService.backfill_geohashes(batch_size=1) == 2
+    assert db.session.get(Task, close_task).geohash == encode_geohash(45.4650, 9.1900)
+    assert db.session.get(Task, close_task).change_version == version
+    assert TaskService.backfill_geohashes() == 0
+
+def test_covering_prefixes_across_antimeridian():
+    """Test geohash coverage includes cells on both sides of the antimeridian."""
+    prefixes = covering_prefixes(0.0, 179.999, 500)
+    east = encode_geohash(0.001, 179.9999)
+    west = encode_geohash(-0.001, -179.9999)
+    assert any(east.startswith(prefix) for prefix in prefixes)
+    assert any(west.startswith(prefix) for prefix in prefixes)
+    assert covering_prefixes(89.99, 0.0, 5000) == []  # Polar circles scan every longitude
+
@@ -0,0 +1,87 @@
+from app import db
+from app.models import Task
+from datetime import datetime, timedelta
+from config import Config
+
+def test_paginate_tasks(client, add_user, login, add_task):
+    """Test keyset pagination of the task list."""
+    ambulance_user = add_user('ambulance_user', 'password123', 'ambulance')
+    headers = {'Authorization': f'Bearer {login("ambulance_user", "password123")}'}
+    task_ids = [add_task(ambulance_user.id, title=f'Task {i}').id for i in range(5)]
+
+    # Test 1: Walk all pages ordered by id
+    seen = []
+    cursor = None
+    while True:
+        url = '/api/tasks?limit=2' + (f'&cursor={cursor}' if cursor else '')
+        response = client.get(url, headers=headers)
+        assert response.status_code == 200
+        data = response.json['data']
+        assert len(data['tasks']) <= 2
+        seen.extend(task['id'] for task in data['tasks'])
+        cursor = data['next_cursor']
+        if not cursor:
+            break
+    assert seen == task_ids
+
+    # Test 2: Descending order
+    response = client.get('/api/tasks?limit=3&order=desc', headers=headers)
+    assert [task['id'] for task in response.json['data']['tasks']] == task_ids[::-1][:3]
+
+    # Test 3: Sorting by last change puts the updated task last
+    task = db.session.get(Task, task_ids[0])
+    task.status = 'in_progress'
+    db.session.commit()
+
+    response = client.get('/api/tasks?limit=4&sort=updated_at', headers=headers)
+    data = response.json['data']
+    assert [task['id'] for task in data['tasks']] == task_ids[1:]
+    response = client.get(f'/api/tasks?limit=4&sort=updated_at&cursor={data["next_cursor"]}', headers=headers)
+    data = response.json['data']
+    assert [task['id'] for task in data['tasks']] == [task_ids[0]]
+    assert data['next_cursor'] is None
+
+    # Test 4: Invalid parameters
+    assert client.get('/api/tasks?limit=2&cursor=garbage', headers=headers).status_code == 400
+    assert client.get('/api/tasks?limit=2&sort=title', headers=headers).status_code == 400
+    assert client.get('/api/tasks?limit=abc', headers=headers).status_code == 400
+
+def test_filter_tasks(client, add_user, login, add_task):
+    """Test server-side task list filters."""
+    ambulance_user = add_user('ambulance_user', 'password123', 'ambulance')
+    admin_user = add_user('admin_user', 'password123', 'admin')
+    cleaning_user = add_user('cleaning_user', 'password123', 'cleaning_team')
+    headers = {'Authorization': f'Bearer {login("ambulance_user", "password123")}'}
+
+    new_task = add_task(ambulance_user.id, status='new').id
+    progress_task = add_task(admin_user.id, status='in_progress', assigned_to=cleaning_user.id).id
+    issue_task = add_task(admin_user.id, status='issue_reported', assigned_to=cleaning_user.id).id
+
+    old_task = add_task(ambulance_user.id, status='completed')
+    old_task.created_at = datetime.now(Config.SERVER_TIMEZONE) - timedelta(days=10)
+    db.session.commit()
+    old_task_id = old_task.id
+
+    def ids(query):
+        response = client.get(f'/api/tasks?{query}', headers=headers)
+        assert response.status_code == 200
+        return sorted(task['id'] for task in response.json['data'])
+
+    assert ids('status=new') == [new_task]
+    assert ids('status=in_progress,issue_reported') == [progress_task, issue_task]
+    assert ids(f'assigned_to={cleaning_user.id}') == [progress_task, issue_task]
+    assert ids(f'created_by={ambulance_user.id}') == [new_task, old_task_id]
+    assert ids(f'created_by={admin_user.id}&status=issue_reported') == [issue_task]
+
+    cutoff = (datetime.now(Config.SERVER_TIMEZONE) - timedelta(days=1)).replace(tzinfo=None).isoformat()
+    assert ids(f'created_before={cutoff}') == [old_task_id]
+    assert ids(f'created_after={cutoff}') == [new_task, progress_task, issue_task]
+
+    # Filters combine with pagination
+    response = client.get(f'/api/tasks?assigned_to={cleaning_user.id}&limit=1', headers=headers)
+    data = response.json['data']
+    assert [task['id'] for task in data['tasks']] == [progress_task]
+    assert data['next_cursor'] is not None
+
+    assert client.get('/api/tasks?assigned_to=abc', headers=headers).status_code == 400
+    assert client.get('/api/tasks?created_after=yesterday', headers=headers).status_code == 400
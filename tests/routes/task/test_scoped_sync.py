@@ -0,0 +1,78 @@
+from app import db
+from app.models import Task, TaskLog
+
+def test_scoped_sync(client, add_user, login, add_task):
+    """Test scoped sync views with their own version tracking."""
+    ambulance_user = add_user('ambulance_user', 'password123', 'ambulance')
+    cleaner = add_user('cleaner', 'password123', 'cleaning_team')
+    other_cleaner = add_user('other_cleaner', 'password123', 'cleaning_team')
+    headers = {'Authorization': f'Bearer {login("cleaner", "password123")}'}
+
+    assigned = add_task(ambulance_user.id, status='in_progress', assigned_to=cleaner.id).id
+    unrelated = add_task(ambulance_user.id, status='in_progress', assigned_to=other_cleaner.id).id
+
+    # Formerly assigned task: only the task log remembers the cleaner
+    historical = add_task(ambulance_user.id, status='issue_reported', assigned_to=other_cleaner.id).id
+    db.session.add(TaskLog(task_id=historical, status='in_progress', assigned_to=cleaner.id, modified_by=cleaner.id))
+    db.session.commit()
+
+    # Test 1: 'mine' covers assigned and historically assigned tasks
+    response = client.get('/api/tasks/sync?scope=mine', headers=headers)
+    assert response.status_code == 200
+    data = response.json['data']
+    assert data['scope'] == 'mine'
+    assert sorted(task['id'] for task in data['tasks']) == [assigned, historical]
+    version = data['version']
+
+    # Test 2: Unrelated changes keep the scoped view unchanged
+    db.session.get(Task, unrelated).status = 'completed'
+    db.session.commit()
+    response = client.get(f'/api/tasks/sync?scope=mine&version={version}', headers=headers)
+    assert response.status_code == 304
+
+    # Test 3: Changes inside the scope are detected
+    db.session.get(Task, assigned).status = 'completed'
+    db.session.commit()
+    response = client.get(f'/api/tasks/sync?scope=mine&version={version}', headers=headers)
+    assert response.status_code == 200
+    assert response.json['data']['version'] != version
+
+    # Test 4: Tasks leaving a scope change its version too
+    response = client.get('/api/tasks/sync?scope=open', headers=headers)
+    data = response.json['data']
+    assert sorted(task['id'] for task in data['tasks']) == [historical]
+    db.session.get(Task, historical).status = 'completed'
+    db.session.commit()
+    response = client.get(f'/api/tasks/sync?scope=open&version={data["version"]}', headers=headers)
+    assert response.status_code == 200
+    assert response.json['data']['tasks'] == []
+
+    # Test 5: Scopes combine and apply to the task list
+    db.session.get(Task, historical).status = 'in_progress'
+    db.session.commit()
+    response = client.get('/api/tasks?scope=mine,open', headers=headers)
+    assert [task['id'] for task in response.json['data']] == [historical]
+
+    # Test 6: Invalid scope
+    assert client.get('/api/tasks/sync?scope=everything', headers=headers).status_code == 400
+
+def test_scoped_list_etag(client, add_user, login, add_task):
+    """Test scoped task list ETags are per user and ignore unrelated changes."""
+    ambulance_user = add_user('ambulance_user', 'password123', 'ambulance')
+    other_user = add_user('other_user', 'password123', 'ambulance')
+    headers = {'Authorization': f'Bearer {login("ambulance_user", "password123")}'}
+    other_headers = {'Authorization': f'Bearer {login("other_user", "password123")}'}
+
+    add_task(ambulance_user.id)
+    unrelated = add_task(other_user.id).id
+
+    response = client.get('/api/tasks?scope=mine', headers=headers)
+    etag = response.headers['ETag']
+    assert len(response.json['data']) == 1
+
+    db.session.get(Task, unrelated).status = 'in_progress'
+    db.session.commit()
+    assert client.get('/api/tasks?scope=mine', headers={**headers, 'If-None-Match': etag}).status_code == 304
+
+    # The same ETag does not match another user's view
+    assert client.get('/api/tasks?scope=mine', headers={**other_headers, 'If-None-Match': etag}).status_code == 200
@@ -0,0 +1,78 @@
+import json
+from app import db
+from app.models import Task
+from app.utils.response import ndjson_response
+
+def parse_ndjson(response):
+    """Parse an NDJSON response body into a list of documents."""
+    return [json.loads(line) for line in response.data.decode('utf-8').splitlines() if line]
+
+def test_stream_tasks(client, add_user, login, add_task):
+    """Test NDJSON streaming of the task list."""
+    ambulance_user = add_user('ambulance_user', 'password123', 'ambulance')
+    headers = {'Authorization': f'Bearer {login("ambulance_user", "password123")}'}
+    client.application.config['STREAM_BATCH_SIZE'] = 2
+    task_ids = [add_task(ambulance_user.id, title=f'Task {i}').id for i in range(5)]
+
+    # Test 1: Selected by query flag
+    response = client.get('/api/tasks?stream=1', headers=headers)
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    tasks = parse_ndjson(response)
+    assert [task['id'] for task in tasks] == task_ids
+    assert tasks[0]['created_by_username'] == 'ambulance_user'
+
+    # Test 2: Selected by Accept header, combined with filters
+    db.session.get(Task, task_ids[1]).status = 'in_progress'
+    db.session.commit()
+    response = client.get('/api/tasks?status=in_progress', headers={**headers, 'Accept': 'application/x-ndjson'})
+    assert response.mimetype == 'application/x-ndjson'
+    assert [task['id'] for task in parse_ndjson(response)] == [task_ids[1]]
+
+    # Test 3: Regular JSON stays the default
+    response = client.get('/api/tasks', headers=headers)
+    assert response.mimetype == 'application/json'
+    assert len(response.json['data']) == 5
+
+    # Test 4: Streams are passed through without being buffered
+    consumed = []
+    def records():
+        for i in range(3):
+            consumed.append(i)
+            yield {'id': i}
+    with client.application.test_request_context():
+        response = ndjson_response(records())
+        assert response.direct_passthrough
+        assert response.is_streamed
+        assert consumed == []
+
+def test_stream_sync(client, add_user, login, add_task):
+    """Test NDJSON streaming of full and delta syncs."""
+    ambulance_user = add_user('ambulance_user', 'password123', 'ambulance')
+    headers = {'Authorization': f'Bearer {login("ambulance_user", "password123")}'}
+    task_ids = [add_task(ambulance_user.id, title=f'Task {i}').id for i in range(3)]
+
+    # Test 1: Full sync streams a header line followed by every task
+    response = client.get('/api/tasks/sync?stream=1', headers=headers)
+    assert response.status_code == 200
+    lines = parse_ndjson(response)
+    header, tasks = lines[0], lines[1:]
+    assert header['mode'] == 'full'
+    assert header['needs_sync'] is True
+    assert [task['id'] for task in tasks] == task_ids
+    version = header['version']
+
+    # Test 2: Delta sync streams tombstones and changed tasks
+    db.session.delete(db.session.get(Task, task_ids[0]))
+    db.session.get(Task, task_ids[2]).status = 'in_progress'
+    db.session.commit()
+
+    response = client.get(f'/api/tasks/sync?version={version}&mode=delta&stream=1', headers=headers)
+    header, *records = parse_ndjson(response)
+    assert header['mode'] == 'delta'
+    assert records[0] == {'id': task_ids[0], 'version': records[0]['version'], 'deleted': True}
+    assert [record['id'] for record in records[1:]] == [task_ids[2]]
+
+    # Test 3: Unchanged clients still get 304
+    response = client.get(f'/api/tasks/sync?version={header["version"]}&stream=1', headers=headers)
+    assert response.status_code == 304
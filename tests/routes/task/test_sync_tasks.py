@@ -1,5 +1,5 @@
 from app import db
-from app.models import Task, GlobalCounter
+from app.models import Task, TaskChange, GlobalCounter
 
 def test_sync_tasks(client, add_user, login):
     """Test the sync_tasks route with various scenarios."""
@@ -95,4 +95,78 @@ def test_sync_tasks(client, add_user, login):
 
     # Test 7: Verify authentication requirement
     response = client.get('/api/tasks/sync')
-    assert response.status_code == 401  # Unauthorized 
\ No newline at end of file
+    assert response.status_code == 401  # Unauthorized 
+
+def test_sync_tasks_delta(client, add_user, login, add_task):
+    """Test delta sync returns only changed tasks and tombstones."""
+    ambulance_user = add_user('ambulance_user', 'password123', 'ambulance')
+    ambulance_token = login('ambulance_user', 'password123')
+    headers = {'Authorization': f'Bearer {ambulance_token}'}
+
+    task1 = add_task(ambulance_user.id, title='Task 1')
+    task2 = add_task(ambulance_user.id, title='Task 2')
+    task1_id, task2_id = task1.id, task2.id
+
+    # Test 1: First sync (version 0) always falls back to a full snapshot
+    response = client.get('/api/tasks/sync?version=0&mode=delta', headers=headers)
+    assert response.status_code == 200
+    data = response.json['data']
+    assert data['mode'] == 'full'
+    assert len(data['tasks']) == 2
+    base_version = data['version']
+
+    # Test 2: Only the updated task is returned
+    task = db.session.get(Task, task2_id)
+    task.status = 'in_progress'
+    db.session.commit()
+
+    response = client.get(f'/api/tasks/sync?version={base_version}&mode=delta', headers=headers)
+    assert response.status_code == 200
+    data = response.json['data']
+    assert data['mode'] == 'delta'
+    assert [t['id'] for t in data['tasks']] == [task2_id]
+    assert data['tasks'][0]['status'] == 'in_progress'
+    assert data['deleted'] == []
+    update_version = data['version']
+    assert update_version > base_version
+
+    # Test 3: Deleted tasks are sent as tombstones
+    db.session.delete(db.session.get(Task, task1_id))
+    db.session.commit()
+
+    response = client.get(f'/api/tasks/sync?version={update_version}&mode=delta', headers=headers)
+    assert response.status_code == 200
+    data = response.json['data']
+    assert data['mode'] == 'delta'
+    assert data['tasks'] == []
+    assert [d['id'] for d in data['deleted']] == [task1_id]
+    assert data['deleted'][0]['deleted'] is True
+
+    # Test 4: Client versions ahead of the server get a full snapshot
+    response = client.get(f'/api/tasks/sync?version={data["version"] + 100}&mode=delta', headers=headers)
+    assert response.status_code == 200
+    data = response.json['data']
+    assert data['mode'] == 'full'
+    assert [t['id'] for t in data['tasks']] == [task2_id]
+
+    # Test 5: Clients behind the retention window get a full snapshot
+    client.application.config['SYNC_DELTA_MAX_LAG'] = 1
+    response = client.get(f'/api/tasks/sync?version={base_version}&mode=delta', headers=headers)
+    assert response.status_code == 200
+    assert response.json['data']['mode'] == 'full'
+
+def test_sync_sees_commits_of_other_processes(client, add_user, login, add_task):
+    """Test that without a shared version file sync reads the version from the journal."""
+    ambulance_user = add_user('ambulance_user', 'password123', 'ambulance')
+    headers = {'Authorization': f'Bearer {login("ambulance_user", "password123")}'}
+    task_id = add_task(ambulance_user.id).id
+    version = GlobalCounter.current_value()
+    assert 'version_oracle' not in client.application.extensions
+    assert client.get(f'/api/tasks/sync?version={version}', headers=headers).status_code == 304
+
+    # A change journaled by another worker or a db_tools script, bypassing this process's session hooks
+    with db.engine.begin() as connection:
+        connection.execute(TaskChange.__table__.insert().values(task_id=task_id, op=TaskChange.UPDATE))
+    response = client.get(f'/api/tasks/sync?version={version}', headers=headers)
+    assert response.status_code == 200
+    assert response.json['data']['version'] == GlobalCounter.current_value() > version
@@ -0,0 +1,62 @@
+from sqlalchemy.dialects import postgresql
+from app import db
+from app.models import Task
+from app.services.task_service import TaskService
+from app.utils.cache import task_tile_cache
+from app.utils.geo import tile_bounds
+
+def test_task_tiles(client, add_user, login, add_task):
+    """Test the clustered map tile endpoint."""
+    ambulance_user = add_user('ambulance_user', 'password123', 'ambulance')
+    headers = {'Authorization': f'Bearer {login("ambulance_user", "password123")}'}
+
+    # Two tasks close together in Milan, one in Rome, one in New York
+    milan_1 = add_task(ambulance_user.id, location_lat=45.4642, location_lon=9.1900).id
+    add_task(ambulance_user.id, location_lat=45.4650, location_lon=9.1910, status='in_progress')
+    add_task(ambulance_user.id, location_lat=41.9028, location_lon=12.4964)
+    add_task(ambulance_user.id, location_lat=40.7128, location_lon=-74.0060)
+
+    # Test 1: The world tile clusters everything
+    response = client.get('/api/tasks/tiles/0/0/0', headers=headers)
+    assert response.status_code == 200
+    data = response.json['data']
+    assert data['grid_size'] == 8
+    assert sum(cell['count'] for cell in data['cells']) == 4
+
+    # Test 2: The tile containing Milan at zoom 5 groups the two Milan tasks
+    response = client.get('/api/tasks/tiles/5/16/11', headers=headers)
+    cells = response.json['data']['cells']
+    west, south, east, north = tile_bounds(5, 16, 11)
+    assert west <= 9.19 < east and south < 45.46 <= north
+    milan_cell = next(cell for cell in cells if cell['count'] == 2)
+    assert milan_cell['task_id'] == milan_1
+    assert 45.4642 <= milan_cell['location']['latitude'] <= 45.4650
+
+    # Test 3: Status filter
+    response = client.get('/api/tasks/tiles/0/0/0?status=in_progress', headers=headers)
+    assert [cell['count'] for cell in response.json['data']['cells']] == [1]
+
+    # Test 4: Unchanged tiles are served from cache until a task changes
+    first = client.get('/api/tasks/tiles/0/0/0', headers=headers)
+    cached_entries = len(task_tile_cache)
+    second = client.get('/api/tasks/tiles/0/0/0', headers=headers)
+    assert second.data == first.data
+    assert len(task_tile_cache) == cached_entries
+
+    task = db.session.get(Task, milan_1)
+    task.status = 'completed'
+    db.session.commit()
+    assert len(task_tile_cache) == 0
+    response = client.get('/api/tasks/tiles/0/0/0', headers=headers)
+    assert response.json['data']['version'] > first.json['data']['version']
+
+    # Test 5: Invalid tile coordinates
+    assert client.get('/api/tasks/tiles/1/2/0', headers=headers).status_code == 400
+    assert client.get('/api/tasks/tiles/23/0/0', headers=headers).status_code == 400
+
+    # Test 6: Tasks on the far edge of the last tile fall in the last cell, with a portable clamp
+    edge = add_task(ambulance_user.id, location_lat=-10.0, location_lon=180.0).id
+    response = client.get('/api/tasks/tiles/0/0/0', headers=headers)
+    assert next(cell['cell'] for cell in response.json['data']['cells'] if cell['task_id'] == edge)[0] == 7
+    clamp = str(TaskService._clamp_cell(Task.id, 8).compile(dialect=postgresql.dialect()))
+    assert 'CASE' in clamp and 'min(' not in clamp
@@ -0,0 +1,94 @@
+import pytest
+from sqlalchemy import event
+from app import create_app, db
+from app.models import Task, GlobalCounter
+from app.utils.version_oracle import VersionOracle, SharedVersionFile
+
+@pytest.fixture
+def app(tmp_path):
+    """Create an app instance sharing its task version through a file."""
+    app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
+        'JWT_SECRET_KEY': 'test-secret-key',
+        'VERSION_ORACLE_PATH': str(tmp_path / 'task_version'),
+    })
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+def test_sync_answered_from_memory(client, add_user, login, add_task):
+    """Test up-to-date sync polls are answered without database queries."""
+    ambulance_user = add_user('ambulance_user', 'password123', 'ambulance')
+    headers = {'Authorization': f'Bearer {login("ambulance_user", "password123")}'}
+    oracle = client.application.extensions['version_oracle']
+
+    task_id = add_task(ambulance_user.id).id
+    version = GlobalCounter.current_value()
+    assert oracle.current(GlobalCounter.current_value) == version
+
+    statements = []
+    def count_queries(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    # Test 1: The unchanged path runs no queries
+    event.listen(db.engine, 'before_cursor_execute', count_queries)
+    try:
+        response = client.get(f'/api/tasks/sync?version={version}', headers=headers)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', count_queries)
+    assert response.status_code == 304
+    assert statements == []
+
+    # Test 2: Commits advance the oracle, rollbacks do not
+    db.session.get(Task, task_id).status = 'in_progress'
+    db.session.flush()
+    db.session.rollback()
+    assert oracle.current(GlobalCounter.current_value) == version
+    assert client.get(f'/api/tasks/sync?version={version}', headers=headers).status_code == 304
+
+    db.session.get(Task, task_id).status = 'in_progress'
+    db.session.commit()
+    assert oracle.current(GlobalCounter.current_value) == GlobalCounter.current_value() > version
+    assert client.get(f'/api/tasks/sync?version={version}', headers=headers).status_code == 200
+
+def test_shared_version_file(tmp_path):
+    """Test workers sharing a version file see each other's commits."""
+    path = str(tmp_path / 'task_version')
+    worker1 = VersionOracle(path)
+    worker2 = VersionOracle(path)
+    worker1.seed(5)
+    worker2.seed(3)
+    assert worker2.current(lambda: 0) == 5
+
+    worker2.advance(8)
+    assert worker1.current(lambda: 0) == 8
+
+    # Versions never move back, except on an explicit reset
+    worker1.advance(6)
+    assert worker2.current(lambda: 0) == 8
+    worker1.reset()
+    assert worker2.current(lambda: 0) == 0
+
+def test_startup_resets_stale_version_file(tmp_path):
+    """Test a version file left by a recreated or restored database is reset on startup."""
+    path = str(tmp_path / 'task_version')
+    shared = SharedVersionFile(path)
+    shared.write(1000)
+    app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'restored.db'}",
+        'JWT_SECRET_KEY': 'test-secret-key',
+        'VERSION_ORACLE_PATH': path,
+    })
+    try:
+        with app.app_context():
+            assert shared.read() == GlobalCounter.current_value() == 0
+            assert app.extensions['version_oracle'].current(lambda: 1000) == 0
+            db.session.remove()
+            db.drop_all()
+    finally:
+        shared.close()
@@ -0,0 +1,110 @@
+import time
+import socketio as python_socketio
+from app import create_app, socketio
+from app.services.websocket_service import WebSocketService
+from app.utils.pubsub import LocalBroker, LocalPresenceManager
+from app.utils.session_registry import SessionRegistry
+
+def wait_for(condition, timeout=2):
+    """Wait until a condition holds, as messages are delivered by listener threads."""
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline, "Condition not met in time"
+        time.sleep(0.01)
+
+def start_worker(broker, heartbeat_interval=0, host_ttl=30):
+    """Start a Socket.IO server standing in for one worker process."""
+    manager = LocalPresenceManager(channel='test', broker=broker)
+    manager.heartbeat_interval = heartbeat_interval
+    manager.host_ttl = host_ttl
+    server = python_socketio.Server(client_manager=manager, async_mode='threading')
+    registry = SessionRegistry()
+    manager.attach_registry(registry)
+    sent = []
+    server._send_eio_packet = lambda eio_sid, packet: sent.append((eio_sid, packet.data))
+    server.manager_initialized = True
+    manager.initialize()
+    return manager, server, registry, sent
+
+def test_fan_out_between_workers():
+    """Test presence sharing and emits across servers sharing a broker."""
+    broker = LocalBroker()
+    manager_a, server_a, registry_a, _ = start_worker(broker)
+    manager_b, server_b, registry_b, sent_b = start_worker(broker)
+    managers = [manager_a, manager_b]
+    try:
+        # A session connected to worker B is visible in worker A
+        sid = manager_b.connect('eio-1', '/')
+        manager_b.publish_presence('add', registry_b.add(sid, 7, 'ambulance'))
+        wait_for(lambda: registry_a.sids_for(7) == (sid,))
+        assert registry_a.get(sid).host_id == manager_b.host_id
+        assert registry_a.get(sid).role == 'ambulance'
+        assert registry_a.local_sessions() == []
+
+        # An emit in worker A reaches the socket held by worker B
+        server_a.emit('task_notification', {'message': 'hello'}, to=sid)
+        wait_for(lambda: sent_b)
+        assert sent_b[0][0] == 'eio-1'
+        assert 'hello' in sent_b[0][1]
+
+        # A worker started later learns the existing sessions
+        manager_c, _, registry_c, _ = start_worker(broker)
+        managers.append(manager_c)
+        wait_for(lambda: registry_c.is_online(7))
+
+        # Disconnecting removes the session everywhere
+        manager_b.publish_presence('remove', registry_b.remove(sid))
+        wait_for(lambda: not registry_a.is_online(7) and not registry_c.is_online(7))
+    finally:
+        for manager in managers:
+            manager.close()
+
+def test_sessions_of_silent_workers_expire():
+    """Test that sessions of a worker that stops heartbeating are dropped."""
+    broker = LocalBroker()
+    manager_a, _, registry_a, _ = start_worker(broker, heartbeat_interval=0.05, host_ttl=0.3)
+    manager_b, _, registry_b, _ = start_worker(broker, heartbeat_interval=0.05)
+    manager_c, _, registry_c, _ = start_worker(broker)  # Never heartbeats, like a crashed worker
+    managers = [manager_a, manager_b, manager_c]
+    try:
+        sid_b = manager_b.connect('eio-1', '/')
+        manager_b.publish_presence('add', registry_b.add(sid_b, 7))
+        sid_c = manager_c.connect('eio-2', '/')
+        manager_c.publish_presence('add', registry_c.add(sid_c, 8))
+        wait_for(lambda: registry_a.is_online(7) and registry_a.is_online(8))
+
+        # The silent worker's session expires, the heartbeating worker's one stays
+        wait_for(lambda: not registry_a.is_online(8))
+        time.sleep(0.4)
+        assert registry_a.sids_for(7) == (sid_b,)
+
+        # Expired hosts are forgotten until they are heard from again
+        assert manager_a.expire_hosts() == []
+        manager_c.publish_presence('add', registry_c.get(sid_c))
+        wait_for(lambda: registry_a.is_online(8))
+    finally:
+        for manager in managers:
+            manager.close()
+
+def test_app_message_queue_config():
+    """Test that the configured message queue backs the app's Socket.IO server."""
+    create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
+        'JWT_SECRET_KEY': 'test-secret-key',
+        'SOCKETIO_MESSAGE_QUEUE': 'local://',
+        'SOCKETIO_CHANNEL': 'test-app'
+    })
+    manager = socketio.server.manager
+    assert isinstance(manager, LocalPresenceManager)
+    assert manager.channel == 'test-app'
+    assert (manager.heartbeat_interval, manager.host_ttl) == (10, 30)
+    assert manager.registry is WebSocketService.sessions
+
+    # Apps without a message queue get the in-memory manager again
+    create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
+        'JWT_SECRET_KEY': 'test-secret-key'
+    })
+    assert not isinstance(socketio.server.manager, LocalPresenceManager)
@@ -0,0 +1,84 @@
+import signal
+from app import socketio
+from app.services.websocket_service import WebSocketService
+from app.utils import notification_buffer
+from app.utils.notification_buffer import NotificationCoalescer, flush_on_shutdown
+
+def test_notification_coalescing(app, add_user, login, create_socket_client):
+    """Test that notifications to one user within a window are sent as one batch."""
+    user = add_user('coalesce_user', 'password123', 'cleaning_team')
+    client = create_socket_client(login('coalesce_user', 'password123'))
+    coalescer = NotificationCoalescer(
+        app, WebSocketService.deliver_notifications, window=0.05, max_pending=3,
+        merge_key=WebSocketService.notification_key
+    )
+    app.extensions['notification_coalescer'] = coalescer
+    try:
+        client.get_received('/')
+
+        # Test 1: A burst is delivered as one batch once the window closes
+        WebSocketService.send_notification_to_users([user.id], 'task_updated', 'Note updated: first')
+        WebSocketService.send_notification_to_users([user.id], 'task_updated', 'Note updated: first')
+        WebSocketService.send_notification_to_users([user.id], 'task_updated', 'Note updated: second')
+        assert client.get_received('/') == []
+        assert coalescer.pending_count(str(user.id)) == 2
+        socketio.sleep(0.2)
+        events = client.get_received('/')
+        assert [event['name'] for event in events] == ['task_notification_batch']
+        batch = events[0]['args'][0]
+        assert batch['user_id'] == str(user.id)
+        assert batch['count'] == 2
+        assert [n['message'] for n in batch['notifications']] == ['Note updated: first', 'Note updated: second']
+        assert [n['seq'] for n in batch['notifications']] == [2, 3]
+
+        # Test 2: A single notification keeps the task_notification event
+        WebSocketService.send_notification_to_users([user.id], 'new_task', 'New task')
+        socketio.sleep(0.2)
+        events = client.get_received('/')
+        assert [event['name'] for event in events] == ['task_notification']
+        assert events[0]['args'][0] == {'message': 'New task', 'type': 'new_task', 'seq': 4, 'user_id': str(user.id)}
+
+        # Test 3: A full buffer is sent before the window closes
+        for index in range(3):
+            WebSocketService.send_notification_to_users([user.id], 'task_updated', f'Note updated: {index}')
+        events = client.get_received('/')
+        assert events[0]['args'][0]['count'] == 3
+        assert coalescer.pending_count() == 0
+
+        # Test 4: Flushing on shutdown delivers what is buffered
+        WebSocketService.send_notification_to_users([user.id], 'task_updated', 'Status changed')
+        coalescer.flush_all()
+        assert client.get_received('/')[0]['args'][0]['message'] == 'Status changed'
+        socketio.sleep(0.1)
+        assert client.get_received('/') == []
+    finally:
+        app.extensions.pop('notification_coalescer', None)
+        client.disconnect()
+
+def test_flush_on_shutdown_signal(app, monkeypatch):
+    """Test that a stop signal flushes every coalescer once and is then handed on."""
+    monkeypatch.setattr(notification_buffer, '_shutdown_handlers', {})
+    monkeypatch.setattr(notification_buffer, '_shutdown_coalescers', notification_buffer.weakref.WeakSet())
+    stopped, delivered = [], []
+    previous = signal.signal(signal.SIGTERM, lambda signum, frame: stopped.append(signum))
+    previous_int = signal.getsignal(signal.SIGINT)
+    try:
+        coalescers = [
+            NotificationCoalescer(app, lambda recipient, batch: delivered.append((recipient, len(batch))), window=60)
+            for _ in range(2)
+        ]
+        for coalescer in coalescers:
+            flush_on_shutdown(coalescer)
+        installed = signal.getsignal(signal.SIGTERM)
+        flush_on_shutdown(coalescers[0])
+        assert signal.getsignal(signal.SIGTERM) is installed
+
+        coalescers[0].add('1', {'message': 'a'})
+        coalescers[0].add('1', {'message': 'b'})
+        coalescers[1].add('2', {'message': 'c'})
+        signal.raise_signal(signal.SIGTERM)
+        assert sorted(delivered) == [('1', 2), ('2', 1)]
+        assert stopped == [signal.SIGTERM]
+    finally:
+        signal.signal(signal.SIGTERM, previous)
+        signal.signal(signal.SIGINT, previous_int)
@@ -0,0 +1,119 @@
+from flask_socketio import SocketIOTestClient
+from app import db, socketio
+from app.models import NotificationLog
+from app.services.websocket_service import WebSocketService
+from app.utils.notification_history import NotificationHistory
+
+def test_notification_replay(app, add_user, login, create_socket_client):
+    """Test replaying notifications missed while a client was offline."""
+    user = add_user('replay_user', 'password123', 'ambulance')
+    token = login('replay_user', 'password123')
+
+    def reconnect(last_seq):
+        client = SocketIOTestClient(app=app, socketio=socketio, namespace='/', auth={'token': token, 'last_seq': last_seq})
+        events = client.get_received('/')
+        client.disconnect()
+        assert [event['name'] for event in events] == ['task_notification_replay']
+        return events[0]['args'][0]
+
+    # Test 1: Delivered notifications carry per-user sequence numbers
+    client = create_socket_client(token)
+    client.get_received('/')
+    for message in ('first', 'second'):
+        WebSocketService.send_notification_to_users([user.id], 'task_updated', message)
+    assert [event['args'][0]['seq'] for event in client.get_received('/')] == [1, 2]
+    client.disconnect()
+
+    # Test 2: Only notifications after the acknowledged one are replayed, in one batch
+    for message in ('third', 'fourth', 'fifth'):
+        WebSocketService.send_notification_to_users([user.id], 'task_updated', message)
+    replay = reconnect(2)
+    assert [n['message'] for n in replay['notifications']] == ['third', 'fourth', 'fifth']
+    assert replay['last_seq'] == 5 and replay['complete'] is True
+    assert reconnect(5)['notifications'] == []
+
+    # Test 3: Notifications beyond the buffer size are reported as lost
+    app.extensions['notification_history'] = NotificationHistory(size=2)
+    for message in ('one', 'two', 'three'):
+        WebSocketService.send_notification_to_users([user.id], 'task_updated', message)
+    replay = reconnect(0)
+    assert [n['seq'] for n in replay['notifications']] == [2, 3]
+    assert replay['complete'] is False
+
+def test_persisted_notification_replay(app, add_user):
+    """Test that stored notifications extend replay beyond the buffer and across restarts."""
+    user = add_user('persist_user', 'password123', 'cleaning_team')
+    app.config['NOTIFICATION_PERSIST'] = True
+    app.extensions['notification_history'] = NotificationHistory(size=2, seed=NotificationLog.last_seq)
+    for index in range(4):
+        WebSocketService.send_notification_to_users([user.id], 'task_updated', f'note {index}')
+    assert NotificationLog.query.filter_by(user_id=user.id).count() == 4
+
+    replay = WebSocketService.replay_notifications(user.id, 0)
+    assert [n['seq'] for n in replay['notifications']] == [1, 2, 3, 4]
+    assert replay['complete'] is True
+
+    # A restarted server continues the numbering from the database
+    app.extensions['notification_history'] = NotificationHistory(size=2, seed=NotificationLog.last_seq)
+    WebSocketService.send_notification_to_users([user.id], 'task_updated', 'after restart')
+    replay = WebSocketService.replay_notifications(user.id, 3)
+    assert [n['message'] for n in replay['notifications']] == ['note 3', 'after restart']
+    assert replay['last_seq'] == 5
+
+    # Another worker that sent none of them replays them from the database
+    app.extensions['notification_history'] = NotificationHistory(size=2)
+    replay = WebSocketService.replay_notifications(user.id, 2)
+    assert [n['seq'] for n in replay['notifications']] == [3, 4, 5]
+    assert replay['last_seq'] == 5 and replay['complete'] is True
+    NotificationLog.query.filter_by(user_id=user.id, seq=1).delete()
+    db.session.commit()
+    assert WebSocketService.replay_notifications(user.id, 0)['complete'] is False
+
+def test_notification_sequence_conflicts(app, add_user, login, create_socket_client, monkeypatch):
+    """Test that numbers stored by another worker are skipped, and unstorable notifications are not sent."""
+    user = add_user('conflict_user', 'password123', 'ambulance')
+    client = create_socket_client(login('conflict_user', 'password123'))
+    app.config['NOTIFICATION_PERSIST'] = True
+    history = app.extensions['notification_history'] = NotificationHistory(seed=NotificationLog.last_seq)
+    assert history.current(user.id) == 0
+    client.get_received('/')
+
+    def store_elsewhere(*seqs):
+        db.session.add_all([NotificationLog(user_id=user.id, seq=seq, type='task_updated', message='elsewhere') for seq in seqs])
+        db.session.commit()
+
+    try:
+        # Test 1: Storing is retried after the numbers another worker stored
+        store_elsewhere(1, 2)
+        WebSocketService.send_notification_to_users([user.id], 'task_updated', 'mine')
+        events = client.get_received('/')
+        assert [event['args'][0]['seq'] for event in events] == [3]
+        assert NotificationLog.query.filter_by(user_id=user.id, seq=3).one().message == 'mine'
+        replay = WebSocketService.replay_notifications(user.id, 0)
+        assert [n['seq'] for n in replay['notifications']] == [1, 2, 3]
+        assert replay['complete'] is True
+
+        # Test 2: A notification that cannot be stored is not sent
+        monkeypatch.setattr(WebSocketService, 'NOTIFICATION_STORE_ATTEMPTS', 1)
+        store_elsewhere(4)
+        WebSocketService.send_notification_to_users([user.id], 'task_updated', 'lost')
+        assert client.get_received('/') == []
+        assert NotificationLog.query.filter_by(message='lost').count() == 0
+        assert history.current(user.id) == 4
+    finally:
+        client.disconnect()
+
+def test_prune_notifications(app, add_user):
+    """Test that stored notifications are pruned to each user's replay window."""
+    first = add_user('prune_user', 'password123', 'ambulance')
+    second = add_user('other_user', 'password123', 'ambulance')
+    app.config.update(NOTIFICATION_PERSIST=True, NOTIFICATION_REPLAY_MAX=2)
+    app.extensions['notification_history'] = NotificationHistory(seed=NotificationLog.last_seq)
+    for index in range(5):
+        WebSocketService.send_notification_to_users([first.id], 'task_updated', f'note {index}')
+    WebSocketService.send_notification_to_users([second.id], 'task_updated', 'only')
+
+    assert WebSocketService.prune_notifications() == 3
+    assert [row.seq for row in NotificationLog.query.filter_by(user_id=first.id).order_by(NotificationLog.seq)] == [4, 5]
+    assert NotificationLog.query.filter_by(user_id=second.id).count() == 1
+    assert WebSocketService.prune_notifications() == 0
@@ -0,0 +1,58 @@
+from app.services.websocket_service import WebSocketService
+from app.utils.session_registry import SessionRegistry
+
+def test_session_registry():
+    """Test the sid and user indexes of the session registry."""
+    registry = SessionRegistry()
+    for index in range(50000):
+        registry.add(f"sid-{index}", index % 1000, 'ambulance')
+    assert len(registry) == 50000
+    assert registry.user_count() == 1000
+    assert len(registry.sids_for(7)) == 50
+
+    # Removing a session updates both indexes
+    info = registry.remove('sid-7')
+    assert info.user_id == '7' and info.role == 'ambulance'
+    assert 'sid-7' not in registry
+    assert len(registry.sids_for('7')) == 49
+    assert registry.remove('sid-7') is None
+
+    # A user's last session removes the user
+    for sid in registry.sids_for(7):
+        registry.remove(sid)
+    assert not registry.is_online(7)
+    assert registry.user_count() == 999
+
+    # Registering a known sid again moves it to the new user
+    registry.add('sid-8', 999)
+    assert 'sid-8' not in registry.sids_for(8)
+    assert registry.get('sid-8').user_id == '999'
+
+    # Removing a host drops only the sessions it holds
+    registry.add('remote-1', 5000, host_id='host-b')
+    registry.add('remote-2', 5001, host_id='host-b')
+    registry.add('remote-3', 5001, host_id='host-c')
+    assert sorted(info.sid for info in registry.remove_host('host-b')) == ['remote-1', 'remote-2']
+    assert not registry.is_online(5000)
+    assert registry.sids_for(5001) == ('remote-3',)
+
+def test_connection_metadata(app, add_user, login, create_socket_client):
+    """Test that connections are registered with their role and removed on disconnect."""
+    user = add_user('registry_user', 'password123', 'cleaning_team')
+    token = login('registry_user', 'password123')
+    first = create_socket_client(token)
+    second = create_socket_client(token)
+    try:
+        sids = WebSocketService.sessions.sids_for(user.id)
+        assert len(sids) == 2
+        info = WebSocketService.sessions.get(sids[0])
+        assert info.role == 'cleaning_team'
+        assert info.to_dict()['connected_at']
+
+        first.disconnect()
+        assert len(WebSocketService.sessions.sids_for(user.id)) == 1
+    finally:
+        for client in (first, second):
+            if client.is_connected():
+                client.disconnect()
+    assert not WebSocketService.sessions.is_online(user.id)
@@ -0,0 +1,75 @@
+from app.services.websocket_service import WebSocketService
+
+def test_task_changed_events(app, add_user, login, create_socket_client, create_task, update_task):
+    """Test structured task_changed events for subscribed clients."""
+    clients = []
+    try:
+        ambulance_user = add_user('ambulance_user', 'password123', 'ambulance')
+        cleaning_user = add_user('cleaning_user', 'password123', 'cleaning_team')
+        ambulance_token = login('ambulance_user', 'password123')
+        cleaning_token = login('cleaning_user', 'password123')
+
+        subscriber = create_socket_client(cleaning_token)
+        bystander = create_socket_client(ambulance_token)
+        clients = [subscriber, bystander]
+
+        ack = subscriber.emit('subscribe_task_changes', callback=True)
+        assert ack['subscribed'] is True
+        for client in clients:
+            client.get_received('/')
+
+        # Task creation is pushed to subscribers only
+        task_id = create_task(ambulance_token, {
+            'title': 'Pushed Task',
+            'location': {'latitude': 40.7128, 'longitude': -74.0060}
+        })
+        events = [e for e in subscriber.get_received('/') if e['name'] == 'task_changed']
+        assert len(events) == 1
+        payload = events[0]['args'][0]
+        assert payload['task']['id'] == task_id
+        assert payload['task']['title'] == 'Pushed Task'
+        created_version = payload['version']
+        assert not [e for e in bystander.get_received('/') if e['name'] == 'task_changed']
+
+        # Task updates carry the new version and task state
+        update_task(cleaning_token, task_id, {'status': 'in_progress'})
+        events = [e for e in subscriber.get_received('/') if e['name'] == 'task_changed']
+        assert len(events) == 1
+        payload = events[0]['args'][0]
+        assert payload['version'] > created_version
+        assert payload['task']['status'] == 'in_progress'
+        assert payload['task']['assigned_to'] == cleaning_user.id
+
+        # Tombstones for deleted tasks
+        with app.test_request_context():
+            WebSocketService.broadcast_task_change(version=payload['version'] + 1, task_id=task_id)
+        events = [e for e in subscriber.get_received('/') if e['name'] == 'task_changed']
+        assert events[0]['args'][0] == {'version': payload['version'] + 1, 'task_id': task_id, 'deleted': True}
+
+        # Unsubscribed clients stop receiving events
+        subscriber.emit('unsubscribe_task_changes', callback=True)
+        update_task(cleaning_token, task_id, {'status': 'completed'})
+        assert not [e for e in subscriber.get_received('/') if e['name'] == 'task_changed']
+
+    finally:
+        for client in clients:
+            if client.is_connected():
+                client.disconnect()
+
+def test_task_saved_when_publishing_fails(app, add_user, login, create_task, update_task, monkeypatch):
+    """Test that a failed task_changed push does not fail the saved change."""
+    add_user('ambulance_user', 'password123', 'ambulance')
+    add_user('cleaning_user', 'password123', 'cleaning_team')
+    ambulance_token = login('ambulance_user', 'password123')
+    cleaning_token = login('cleaning_user', 'password123')
+
+    def fail(**kwargs):
+        raise RuntimeError("message queue unavailable")
+    monkeypatch.setattr(WebSocketService, 'broadcast_task_change', fail)
+
+    task_id = create_task(ambulance_token, {
+        'title': 'Saved Task',
+        'location': {'latitude': 40.7128, 'longitude': -74.0060}
+    })
+    response = update_task(cleaning_token, task_id, {'status': 'in_progress'})
+    assert response.json['data']['task']['status'] == 'in_progress'
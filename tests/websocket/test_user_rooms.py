@@ -0,0 +1,39 @@
+from app import socketio
+from app.services.websocket_service import WebSocketService
+
+def test_user_and_role_rooms(app, add_user, login, create_socket_client, monkeypatch):
+    """Test that notifications are addressed to per-user and per-role rooms."""
+    ambulance = add_user('room_ambulance', 'password123', 'ambulance')
+    admin = add_user('room_admin', 'password123', 'admin')
+    ambulance_token = login('room_ambulance', 'password123')
+    phone = create_socket_client(ambulance_token)
+    tablet = create_socket_client(ambulance_token)
+    admin_client = create_socket_client(login('room_admin', 'password123'))
+    clients = [phone, tablet, admin_client]
+    try:
+        rooms = socketio.server.manager.rooms['/']
+        assert len(rooms[f'user:{ambulance.id}']) == 2
+        assert len(rooms['role:ambulance']) == 2
+        assert len(rooms[f'user:{admin.id}']) == 1
+        for client in clients:
+            client.get_received('/')
+
+        # One emit per recipient reaches all of the user's sessions
+        emits = []
+        original_emit = socketio.emit
+        monkeypatch.setattr(socketio, 'emit', lambda *args, **kwargs: emits.append(kwargs['to']) or original_emit(*args, **kwargs))
+        WebSocketService.send_notification_to_users([ambulance.id, admin.id], 'task_updated', 'Status changed')
+        assert emits == [f'user:{ambulance.id}', f'user:{admin.id}']
+        for client in (phone, tablet):
+            events = client.get_received('/')
+            assert [event['args'][0]['user_id'] for event in events] == [str(ambulance.id)]
+        assert admin_client.get_received('/')[0]['args'][0]['user_id'] == str(admin.id)
+
+        # Role rooms address every user with a role
+        WebSocketService.notify_role('admin', 'report_job_completed', {'id': 'job'})
+        assert [event['name'] for event in admin_client.get_received('/')] == ['report_job_completed']
+        assert phone.get_received('/') == []
+    finally:
+        for client in clients:
+            if client.is_connected():
+                client.disconnect()